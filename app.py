@@ -11,6 +11,11 @@ from src.routes.auth_routes import auth_bp
 from src.routes.book_routes import book_bp
 from src.routes.loan_routes import loan_bp
 from src.routes.admin_routes import admin_bp
+from src.metrics import init_metrics
+from src.overdue import init_overdue_sweeper
+from src.profiler import QUERIES_HEADER, TIME_HEADER, init_profiler
+from src.replicas import PRIMARY_UNTIL_HEADER, init_replicas
+from src.trigram_index import init_trigram_index
 
 
 def create_app() -> Flask:
@@ -28,7 +33,19 @@ def create_app() -> Flask:
     
     # CORS (Cross-Origin Resource Sharing) ayarları
     # Tüm kaynaklardan /api/* endpoint'lerine erişime izin ver
-    CORS(app, resources={r"/api/*": {"origins": "*"}})
+    # X-Primary-Until: Yazma sonrası okumaların birincilden yapılması için (bkz. src.replicas)
+    # X-DB-Queries / X-DB-Time: SQL profili açıkken (bkz. src.profiler)
+    CORS(
+        app,
+        resources={r"/api/*": {"origins": "*"}},
+        expose_headers=[PRIMARY_UNTIL_HEADER, QUERIES_HEADER, TIME_HEADER],
+    )
+
+    # İstek metrikleri (GET /api/metrics); süre ölçümü diğer before_request'lerden önce başlasın
+    init_metrics(app)
+
+    # İstek başına SQL profili (SQL_PROFILER_ENABLED=1 ise)
+    init_profiler(app)
 
     # API Blueprint'lerini kaydet
     # Her blueprint farklı bir modül için route'ları gruplar
@@ -37,6 +54,15 @@ def create_app() -> Flask:
     app.register_blueprint(loan_bp, url_prefix="/api/loans")     # Ödünç alma endpoint'leri
     app.register_blueprint(admin_bp, url_prefix="/api/admin")    # Admin endpoint'leri
 
+    # GET isteklerini okuma replikalarına yönlendir (DATABASE_REPLICA_URLS tanımlıysa)
+    init_replicas(app)
+
+    # Bellek içi trigram arama indeksini kur (TRIGRAM_INDEX_ENABLED açıksa)
+    init_trigram_index(app)
+
+    # Gecikmiş ödünç tarama thread'ini başlat (OVERDUE_SWEEP_SECONDS > 0 ise)
+    init_overdue_sweeper(app)
+
     # Sağlık kontrolü endpoint'i
     # Uygulamanın çalışıp çalışmadığını kontrol etmek için kullanılır
     @app.get("/api/health")
@@ -48,6 +74,7 @@ def create_app() -> Flask:
 
 if __name__ == "__main__":
     # Uygulama doğrudan çalıştırıldığında (python app.py)
+    # Sadece geliştirme içindir; üretimde wsgi.py kullanılır (gunicorn -c gunicorn.conf.py wsgi:app)
     app = create_app()
     # Debug modunda çalıştır (geliştirme için)
     app.run(debug=True)
@@ -0,0 +1,4 @@
+"""
+Performans ölçüm (benchmark) scriptleri.
+Her script doğrudan çalıştırılabilir: python -m benchmarks.<script_adı> --help
+"""
@@ -0,0 +1,179 @@
+"""
+Eşzamanlı Ödünç Alma Benchmark'ı
+
+N paralel ödünç alan thread'in tek bir "sıcak" kitabın stokunu aynı anda
+düşürmesini ölçer. Üç yöntem karşılaştırılır:
+
+    naive    : Oku, Python'da kontrol et, yaz (eski read-modify-write)
+    atomic   : Koşullu UPDATE ... WHERE available_copies > 0 (src.inventory.take_copy)
+    striped  : Stok N parçaya bölünmüş atomik sayaç (books.stock_stripes)
+
+Her yöntem için iki aşama çalışır:
+    throughput : Stok tükenmeyecek kadar büyük; saniyedeki başarılı ödünç sayısı
+    last-copy  : Stok thread sayısı kadar; verilen ödünç sayısı stoktan fazla
+                 olmamalı (naive yöntemde fazla satış / kayıp güncelleme görülür)
+
+Kullanım:
+    python -m benchmarks.bench_borrow --workers 1,4,16 --ops 200
+    DATABASE_URL=mysql+pymysql://... python -m benchmarks.bench_borrow
+
+Not: Varsayılan veritabanı geçici bir SQLite dosyasıdır. SQLite tek yazıcıya
+izin verdiği için anlamlı karşılaştırma MySQL (InnoDB) üzerinde yapılmalıdır.
+Thread sayısı bağlantı havuzu kapasitesini (SQLALCHEMY_ENGINE_OPTIONS) aşarsa
+fazla thread'ler bağlantı bekler.
+"""
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+
+# Uygulama import edilmeden önce veritabanı adresi belirlenmeli
+if not os.getenv("DATABASE_URL"):
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.gettempdir(), "bench_borrow.db")
+os.environ.setdefault("TRIGRAM_INDEX_ENABLED", "0")
+
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import OperationalError
+
+from app import create_app
+from src.db import db
+from src.inventory import set_stripes, take_copy
+from src.models import Author, Book, BookStockStripe, Category
+
+
+MODES = ("naive", "atomic", "striped")
+
+HOT_ISBN = "bench-hot-title"
+
+
+def naive_take(book_id: int) -> bool:
+    """Eski yöntem: oku, kontrol et, yaz (yarış durumuna açık)."""
+    available = db.session.execute(select(Book.available_copies).where(Book.id == book_id)).scalar_one()
+    if available <= 0:
+        return False
+    db.session.execute(update(Book).where(Book.id == book_id).values(available_copies=available - 1))
+    return True
+
+
+def prepare(copies: int, stripes: int) -> int:
+    """Sıcak kitabı oluşturur / stokunu sıfırlar ve ID'sini döndürür."""
+    db.create_all()
+    book_id = db.session.execute(select(Book.id).where(Book.isbn == HOT_ISBN)).scalar()
+    if book_id is None:
+        author = Author(name="Benchmark Yazarı")
+        category = Category(name="Benchmark")
+        db.session.add_all([author, category])
+        db.session.flush()
+        book = Book(title="Sıcak Ders Kitabı", isbn=HOT_ISBN, author_id=author.id, category_id=category.id)
+        db.session.add(book)
+        db.session.flush()
+        book_id = book.id
+    db.session.execute(
+        update(Book).where(Book.id == book_id).values(total_copies=copies, available_copies=copies, stock_stripes=0)
+    )
+    set_stripes(book_id, stripes)
+    db.session.commit()
+    return book_id
+
+
+def remaining(book_id: int, stripes: int) -> int:
+    """Kitabın gerçek kalan stokunu döndürür (parçalıysa parçaların toplamı)."""
+    if stripes:
+        return db.session.execute(
+            select(func.sum(BookStockStripe.available)).where(BookStockStripe.book_id == book_id)
+        ).scalar_one()
+    return db.session.execute(select(Book.available_copies).where(Book.id == book_id)).scalar_one()
+
+
+def run(app, mode: str, workers: int, ops: int, copies: int, stripes: int) -> dict:
+    """
+    workers thread'i başlatır; her biri ops kez ödünç almayı dener (her deneme ayrı transaction).
+
+    Returns:
+        dict: Süre, başarılı ödünç, hata ve tutarlılık bilgileri
+    """
+    with app.app_context():
+        book_id = prepare(copies, stripes if mode == "striped" else 0)
+
+    counts = {"granted": 0, "refused": 0, "errors": 0}
+    lock = threading.Lock()
+    barrier = threading.Barrier(workers + 1)
+
+    def worker() -> None:
+        granted = refused = errors = 0
+        with app.app_context():
+            barrier.wait()
+            for _ in range(ops):
+                try:
+                    if mode == "naive":
+                        ok = naive_take(book_id)
+                    else:
+                        ok = take_copy(book_id, stripes if mode == "striped" else 0)
+                    db.session.commit()
+                except OperationalError:
+                    # Kilit zaman aşımı / deadlock: işlem geri alınır
+                    db.session.rollback()
+                    errors += 1
+                    continue
+                if ok:
+                    granted += 1
+                else:
+                    refused += 1
+        with lock:
+            counts["granted"] += granted
+            counts["refused"] += refused
+            counts["errors"] += errors
+
+    threads = [threading.Thread(target=worker) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - started
+
+    with app.app_context():
+        left = remaining(book_id, stripes if mode == "striped" else 0)
+    taken = copies - left
+    return {
+        "seconds": round(seconds, 3),
+        "granted_per_second": round(counts["granted"] / seconds, 1) if seconds else None,
+        **counts,
+        # Verilen ödünç ile stoktan düşen kopya farkı: 0 değilse kayıp güncelleme / fazla satış var
+        "oversold": counts["granted"] - taken,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Eşzamanlı ödünç alma (stok sayacı) benchmark'ı")
+    parser.add_argument("--workers", default="1,4,16", help="Virgülle ayrılmış paralel thread sayıları")
+    parser.add_argument("--ops", type=int, default=200, help="Thread başına ödünç alma denemesi")
+    parser.add_argument("--stripes", type=int, default=8, help="striped yönteminde parça sayısı")
+    parser.add_argument("--modes", default=",".join(MODES), help="Virgülle ayrılmış yöntemler")
+    parser.add_argument("--output", help="Sonuçları bu JSON dosyasına yaz")
+    args = parser.parse_args()
+
+    modes = [mode for mode in args.modes.split(",") if mode in MODES]
+    app = create_app()
+    results = {"database": app.config["SQLALCHEMY_DATABASE_URI"].split(":", 1)[0], "stripes": args.stripes, "runs": []}
+    for workers in (int(value) for value in args.workers.split(",")):
+        for mode in modes:
+            throughput = run(app, mode, workers, args.ops, workers * args.ops, args.stripes)
+            last_copy = run(app, mode, workers, 3, workers, args.stripes)
+            results["runs"].append({"mode": mode, "workers": workers, "throughput": throughput, "last_copy": last_copy})
+            print(
+                f"{mode:8s} workers={workers:3d}  {throughput['granted_per_second']:>9} ödünç/sn  "
+                f"hata={throughput['errors']:<4d} fazla satış={throughput['oversold']:<4d} "
+                f"son kopya fazla satış={last_copy['oversold']}"
+            )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+"""
+Endpoint Mikro Benchmark'ı
+
+Her ölçekte (kitap / ödünç sayısı) ayrı bir veritabanını sentetik veriyle
+doldurur, create_app() üzerinden endpoint'leri test istemcisiyle çağırır ve
+her endpoint için gecikme dağılımını (min / ortalama / medyan / p95 / maks)
+ve bellek ayırmalarını (tracemalloc: istek başına tepe ve kalıcı ayırma)
+ölçer. Sonuçlar JSON olarak yazılır; --compare ile önceki bir sonuç
+dosyasına göre medyanı --max-regression oranından fazla kötüleşen endpoint
+varsa script 1 çıkış koduyla biter.
+
+Ölçülen endpoint'ler:
+    list_books (anonim / token ile, q ile / q olmadan), my_loans, my_penalties,
+    admin yazar / kategori / ceza listeleri, bekleyen istekler,
+    request_loan -> approve_loan -> return_book (her tur stoku geri bırakır)
+
+Ölçekler kitap sayısıdır (k: bin, m: milyon). Ödünç sayısı varsayılan olarak
+kitap sayısının 2 katıdır ve 10k - 1M aralığına sınırlanır (--loans ile değiştirilir).
+
+Kullanım:
+    python -m benchmarks.bench_endpoints --scales 1k,100k --output bench.json
+    python -m benchmarks.bench_endpoints --scales 1k,100k --compare bench.json
+    DATABASE_URL=mysql+pymysql://.../bench_{scale} python -m benchmarks.bench_endpoints --scales 1k,1m
+
+Not: Varsayılan veritabanı ölçek başına geçici bir SQLite dosyasıdır
+(bench_endpoints_<ölçek>.db); dolu veritabanı tekrar doldurulmaz. Birden
+fazla ölçekte DATABASE_URL içinde {scale} yer tutucusu bulunmalıdır.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+# Ölçek başına veritabanı adresi şablonu; benchmarks.explain_plans import edilmeden önce okunmalı
+# (o modül DATABASE_URL boşsa kendi varsayılanını yazar)
+DATABASE_URL_TEMPLATE = os.getenv("DATABASE_URL")
+os.environ.setdefault("TRIGRAM_INDEX_ENABLED", "0")
+# Benchmark kullanıcısı giriş yapmaz; şifre havuzu gerekmez
+os.environ.setdefault("PASSWORD_HASH_WORKERS", "0")
+
+from sqlalchemy import func, insert, select
+
+from app import create_app
+from benchmarks.explain_plans import analyze, seed
+from src.db import db
+from src.models import Book, Loan, User
+from src.security import create_access_token
+
+
+MIN_LOANS = 10_000
+MAX_LOANS = 1_000_000
+
+BENCH_EMAIL = "bench-endpoints@example.com"
+
+
+def parse_scale(value: str) -> int:
+    """"1k", "100k", "1m" biçimindeki ölçeği sayıya çevirir."""
+    value = value.strip().lower()
+    multiplier = {"k": 1_000, "m": 1_000_000}.get(value[-1:], 1)
+    return int(float(value.rstrip("km")) * multiplier)
+
+
+def database_url(template: str | None, scale: str, scale_count: int) -> str:
+    if template is None:
+        return "sqlite:///" + os.path.join(tempfile.gettempdir(), f"bench_endpoints_{scale}.db")
+    if "{scale}" not in template and scale_count > 1:
+        sys.exit("Birden fazla ölçek için DATABASE_URL içinde {scale} yer tutucusu olmalıdır")
+    return template.replace("{scale}", scale)
+
+
+def prepare(books: int, loans: int) -> dict:
+    """Veritabanını doldurur ve benchmark kullanıcılarını / kimlikleri hazırlar."""
+    seed(books, random.Random(42), loans)
+    analyze()
+    admin_id = db.session.execute(select(User.id).where(User.role == "admin").order_by(User.id).limit(1)).scalar_one()
+    # Ödünç geçmişi en uzun öğrenci (my_loans / my_penalties için en kötü durum)
+    heavy_id = db.session.execute(
+        select(Loan.user_id).join(User, User.id == Loan.user_id).where(User.role == "student")
+        .group_by(Loan.user_id).order_by(func.count().desc()).limit(1)
+    ).scalar_one()
+    # Ödünç turu için cezasız, geçmişi olmayan ayrı bir öğrenci
+    borrower_id = db.session.execute(select(User.id).where(User.email == BENCH_EMAIL)).scalar()
+    if borrower_id is None:
+        borrower_id = db.session.execute(
+            insert(User).values(full_name="Benchmark", email=BENCH_EMAIL, password_hash="-", role="student")
+        ).inserted_primary_key[0]
+    book_ids = db.session.execute(
+        select(Book.id).where(Book.available_copies > 0, Book.stock_stripes == 0).order_by(Book.id).limit(20)
+    ).scalars().all()
+    db.session.commit()
+    return {
+        "admin": {"Authorization": f"Bearer {create_access_token(admin_id, 'admin')}"},
+        "heavy": {"Authorization": f"Bearer {create_access_token(heavy_id, 'student')}"},
+        "borrower": {"Authorization": f"Bearer {create_access_token(borrower_id, 'student')}"},
+        "book_ids": book_ids,
+    }
+
+
+def read_cases(context: dict) -> list:
+    """(ad, path, başlıklar) listesi."""
+    return [
+        ("list_books", "/api/books/?limit=50", {}),
+        ("list_books_token", "/api/books/?limit=50", context["heavy"]),
+        ("list_books_q", "/api/books/?limit=50&q=Kitap%20123", {}),
+        ("list_books_q_token", "/api/books/?limit=50&q=Kitap%20123", context["heavy"]),
+        ("list_books_filtered", "/api/books/?limit=50&category_id=1&available=true&sort=title", {}),
+        ("my_loans", "/api/loans/my", context["heavy"]),
+        ("my_penalties", "/api/loans/penalties", context["heavy"]),
+        ("admin_authors", "/api/admin/authors", context["admin"]),
+        ("admin_categories", "/api/admin/categories", context["admin"]),
+        ("admin_penalties", "/api/admin/penalties", context["admin"]),
+        ("loan_requests", "/api/loans/requests?limit=50", context["admin"]),
+    ]
+
+
+def borrow_cycle(client, context: dict, index: int) -> dict:
+    """
+    Bir ödünç turu: öğrenci ister, admin onaylar, admin iade alır.
+    Her adımın süresini döndürür; tur sonunda kitabın stoku geri gelir.
+    """
+    book_id = context["book_ids"][index % len(context["book_ids"])]
+    timings = {}
+
+    started = time.perf_counter()
+    response = client.post("/api/loans/", json={"book_id": book_id}, headers=context["borrower"])
+    timings["request_loan"] = time.perf_counter() - started
+    if response.status_code != 201:
+        raise RuntimeError(f"request_loan {response.status_code}: {response.get_json()}")
+    loan_id = response.get_json()["id"]
+
+    started = time.perf_counter()
+    response = client.post(f"/api/loans/{loan_id}/approve", headers=context["admin"])
+    timings["approve_loan"] = time.perf_counter() - started
+    if response.status_code != 200:
+        raise RuntimeError(f"approve_loan {response.status_code}: {response.get_json()}")
+
+    started = time.perf_counter()
+    response = client.post(f"/api/loans/{loan_id}/return", headers=context["admin"])
+    timings["return_book"] = time.perf_counter() - started
+    if response.status_code != 200:
+        raise RuntimeError(f"return_book {response.status_code}: {response.get_json()}")
+    return timings
+
+
+def summarize(samples: list) -> dict:
+    samples = sorted(samples)
+    return {
+        "iterations": len(samples),
+        "min_ms": round(samples[0] * 1000, 3),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 3),
+        "median_ms": round(statistics.median(samples) * 1000, 3),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000, 3),
+        "max_ms": round(samples[-1] * 1000, 3),
+        "stddev_ms": round(statistics.stdev(samples) * 1000, 3) if len(samples) > 1 else 0.0,
+        "ops_per_second": round(len(samples) / sum(samples), 1),
+    }
+
+
+def measure_allocations(fn, iterations: int) -> dict:
+    """
+    fn çağrısı başına tepe (peak) ve kalıcı (net) bellek ayırmasını ölçer.
+    tracemalloc çalışmayı yavaşlattığı için süre ölçümünden ayrı yapılır.
+    """
+    peaks, retained = [], []
+    tracemalloc.start()
+    try:
+        for _ in range(iterations):
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            fn()
+            after, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+            retained.append(after - before)
+    finally:
+        tracemalloc.stop()
+    return {
+        "alloc_peak_kb": round(statistics.median(peaks) / 1024, 1),
+        "alloc_retained_kb": round(statistics.median(retained) / 1024, 1),
+    }
+
+
+def run_scale(scale: str, url: str, args) -> list:
+    books = parse_scale(scale)
+    loans = args.loans if args.loans is not None else min(max(books * 2, MIN_LOANS), MAX_LOANS)
+    os.environ["DATABASE_URL"] = url
+    app = create_app()
+    started = time.perf_counter()
+    with app.app_context():
+        context = prepare(books, loans)
+    print(f"\n== {scale}: {books} kitap, ~{loans} ödünç (hazırlık {time.perf_counter() - started:.1f} sn)")
+
+    client = app.test_client()
+    results = []
+    for name, path, headers in read_cases(context):
+        if args.cases and name not in args.cases:
+            continue
+
+        def call():
+            response = client.get(path, headers=headers)
+            if response.status_code != 200:
+                raise RuntimeError(f"{name} {response.status_code}")
+
+        for _ in range(args.warmup):
+            call()
+        samples = []
+        for _ in range(args.iterations):
+            started = time.perf_counter()
+            call()
+            samples.append(time.perf_counter() - started)
+        results.append({"scale": scale, "case": name, **summarize(samples),
+                        **measure_allocations(call, args.alloc_iterations)})
+
+    write_cases = ("request_loan", "approve_loan", "return_book")
+    if not args.cases or any(case in args.cases for case in write_cases):
+        counter = iter(range(10**9))
+        for _ in range(args.warmup):
+            borrow_cycle(client, context, next(counter))
+        samples = {case: [] for case in write_cases}
+        for _ in range(args.iterations):
+            for case, elapsed in borrow_cycle(client, context, next(counter)).items():
+                samples[case].append(elapsed)
+        allocations = measure_allocations(lambda: borrow_cycle(client, context, next(counter)), args.alloc_iterations)
+        for case in write_cases:
+            # Bellek ölçümü tüm tur içindir (üç istek)
+            results.append({"scale": scale, "case": case, **summarize(samples[case]),
+                            **{f"cycle_{key}": value for key, value in allocations.items()}})
+
+    for result in results:
+        print(f"  {result['case']:22s} medyan={result['median_ms']:9.3f} ms  p95={result['p95_ms']:9.3f} ms  "
+              f"{result['ops_per_second']:8.1f} istek/sn  "
+              f"tepe={result.get('alloc_peak_kb', result.get('cycle_alloc_peak_kb'))} KB")
+    return results
+
+
+def compare(results: list, baseline_path: str, max_regression: float) -> list:
+    """Medyanı referans sonuca göre max_regression oranından fazla artan endpoint'leri döndürür."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(r["scale"], r["case"]): r for r in json.load(f)["results"]}
+    regressions = []
+    print(f"\nKarşılaştırma ({baseline_path}):")
+    for result in results:
+        previous = baseline.get((result["scale"], result["case"]))
+        if previous is None:
+            continue
+        change = result["median_ms"] / previous["median_ms"] - 1 if previous["median_ms"] else 0.0
+        flag = "GERİLEME" if change > max_regression else "ok"
+        print(f"  {result['scale']:>5s} {result['case']:22s} {previous['median_ms']:9.3f} -> "
+              f"{result['median_ms']:9.3f} ms ({change:+.1%}) {flag}")
+        if change > max_regression:
+            regressions.append({"scale": result["scale"], "case": result["case"], "change": round(change, 3)})
+    return regressions
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Endpoint gecikme ve bellek ayırma benchmark'ı")
+    parser.add_argument("--scales", default="1k,100k", help="Virgülle ayrılmış kitap sayıları (örn: 1k,100k,1m)")
+    parser.add_argument("--loans", type=int, help="Ödünç sayısı (varsayılan: kitap x 2, 10k - 1M)")
+    parser.add_argument("--iterations", type=int, default=50, help="Endpoint başına ölçüm sayısı")
+    parser.add_argument("--warmup", type=int, default=5, help="Ölçüm öncesi ısınma çağrısı")
+    parser.add_argument("--alloc-iterations", type=int, default=5, help="tracemalloc ile ölçüm sayısı")
+    parser.add_argument("--cases", help="Sadece bu endpoint'ler (virgülle ayrılmış)")
+    parser.add_argument("--output", help="Sonuçları bu JSON dosyasına yaz")
+    parser.add_argument("--compare", help="Önceki sonuç dosyası (medyan karşılaştırması)")
+    parser.add_argument("--max-regression", type=float, default=0.25, help="İzin verilen medyan artışı (0.25: %%25)")
+    args = parser.parse_args()
+    args.cases = set(args.cases.split(",")) if args.cases else None
+
+    scales = [scale.strip().lower() for scale in args.scales.split(",") if scale.strip()]
+    template = DATABASE_URL_TEMPLATE
+    results = []
+    for scale in scales:
+        results += run_scale(scale, database_url(template, scale, len(scales)), args)
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": (template or "sqlite").split(":", 1)[0],
+            "args": {key: value for key, value in vars(args).items() if key != "cases"},
+        },
+        "results": results,
+    }
+    regressions = compare(results, args.compare, args.max_regression) if args.compare else []
+    report["regressions"] = regressions
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    if regressions:
+        print(f"\n{len(regressions)} endpoint'te gerileme")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
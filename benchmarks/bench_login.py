@@ -0,0 +1,205 @@
+"""
+Giriş Fırtınası Benchmark'ı
+
+Sabit sayıda istek thread'i olan bir sunucuya (gunicorn gthread benzeri)
+aynı anda yoğun giriş (POST /api/auth/login) ve katalog okuma
+(GET /api/books/) trafiği gönderir. İki yöntem karşılaştırılır:
+
+    inline : PBKDF2 istek thread'inde hesaplanır (PASSWORD_HASH_WORKERS=0,
+             kuyruk sınırı pratikte yok; eski davranış)
+    pool   : PBKDF2 süreç havuzunda, kuyruk sınırı aşılınca 503 + Retry-After
+
+Ölçülenler: giriş p50/p99 gecikmesi, 503 sayısı, katalog istek/sn ve p99.
+
+Kullanım:
+    python -m benchmarks.bench_login --seconds 10 --login-clients 32 --catalog-clients 8
+    DATABASE_URL=mysql+pymysql://... python -m benchmarks.bench_login
+
+Not: Varsayılan veritabanı geçici bir SQLite dosyasıdır.
+"""
+import argparse
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+# Uygulama import edilmeden önce veritabanı adresi belirlenmeli
+if not os.getenv("DATABASE_URL"):
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.gettempdir(), "bench_login.db")
+os.environ.setdefault("TRIGRAM_INDEX_ENABLED", "0")
+
+from sqlalchemy import select
+from werkzeug.serving import BaseWSGIServer
+
+from app import create_app
+from src.db import db
+from src.models import Author, Book, Category, User
+from src.password_pool import shutdown_pool
+from src.security import hash_password
+
+
+MODES = ("inline", "pool")
+
+EMAIL = "bench-login@example.com"
+PASSWORD = "bench-password"
+
+
+class PooledWSGIServer(BaseWSGIServer):
+    """İstekleri sabit boyutlu bir thread havuzunda işleyen sunucu (gunicorn --threads benzeri)."""
+
+    def __init__(self, host: str, port: int, app, threads: int):
+        super().__init__(host, port, app)
+        self.pool = ThreadPoolExecutor(max_workers=threads)
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+
+def prepare(app) -> None:
+    """Benchmark kullanıcısını ve birkaç kitabı oluşturur."""
+    with app.app_context():
+        db.create_all()
+        user = db.session.execute(select(User).where(User.email == EMAIL)).scalar()
+        if user is None:
+            user = User(full_name="Benchmark", email=EMAIL, password_hash="-", role="student")
+            db.session.add(user)
+        user.password_hash = hash_password(PASSWORD)
+        if db.session.execute(select(Book.id).limit(1)).scalar() is None:
+            author = Author(name="Benchmark Yazarı")
+            category = Category(name="Benchmark")
+            db.session.add_all([author, category])
+            db.session.flush()
+            db.session.add_all([
+                Book(title=f"Kitap {i}", isbn=f"bench-login-{i}", author_id=author.id, category_id=category.id)
+                for i in range(200)
+            ])
+        db.session.commit()
+
+
+def percentile(values: list, p: float):
+    if not values:
+        return None
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(len(values) * p))] * 1000, 1)
+
+
+def run(mode: str, args) -> dict:
+    app = create_app()
+    app.config["PASSWORD_HASH_ROUNDS"] = args.rounds
+    if mode == "inline":
+        app.config["PASSWORD_HASH_WORKERS"] = 0
+        app.config["PASSWORD_HASH_QUEUE_LIMIT"] = 1_000_000
+    else:
+        app.config["PASSWORD_HASH_WORKERS"] = args.hash_workers
+        app.config["PASSWORD_HASH_QUEUE_LIMIT"] = args.queue_limit
+    shutdown_pool()
+    prepare(app)
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)   # İstek satırlarını yazdırma
+
+    server = PooledWSGIServer("127.0.0.1", 0, app, args.threads)
+    base = f"http://127.0.0.1:{server.server_port}/api"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    login_body = json.dumps({"email": EMAIL, "password": PASSWORD}).encode()
+    results = {"login": [], "login_503": 0, "login_errors": 0, "catalog": [], "catalog_errors": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + args.seconds
+
+    def login_client():
+        while time.perf_counter() < deadline:
+            request = urllib.request.Request(
+                f"{base}/auth/login", data=login_body, headers={"Content-Type": "application/json"}
+            )
+            started = time.perf_counter()
+            try:
+                urllib.request.urlopen(request, timeout=60).read()
+                with lock:
+                    results["login"].append(time.perf_counter() - started)
+            except urllib.error.HTTPError as e:
+                with lock:
+                    if e.code == 503:
+                        results["login_503"] += 1
+                    else:
+                        results["login_errors"] += 1
+                if e.code == 503:
+                    time.sleep(float(e.headers.get("Retry-After", "1")))
+            except OSError:
+                with lock:
+                    results["login_errors"] += 1
+
+    def catalog_client():
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                urllib.request.urlopen(f"{base}/books/?limit=20", timeout=60).read()
+                with lock:
+                    results["catalog"].append(time.perf_counter() - started)
+            except OSError:
+                with lock:
+                    results["catalog_errors"] += 1
+
+    clients = [threading.Thread(target=login_client) for _ in range(args.login_clients)]
+    clients += [threading.Thread(target=catalog_client) for _ in range(args.catalog_clients)]
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+    server.shutdown()
+    server.pool.shutdown(wait=True)
+    shutdown_pool()
+
+    return {
+        "logins": len(results["login"]),
+        "login_p50_ms": percentile(results["login"], 0.50),
+        "login_p99_ms": percentile(results["login"], 0.99),
+        "login_503": results["login_503"],
+        "login_errors": results["login_errors"],
+        "catalog_per_second": round(len(results["catalog"]) / args.seconds, 1),
+        "catalog_p99_ms": percentile(results["catalog"], 0.99),
+        "catalog_errors": results["catalog_errors"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Giriş fırtınası sırasında şifre hash havuzu benchmark'ı")
+    parser.add_argument("--seconds", type=float, default=10, help="Her yöntemin süresi")
+    parser.add_argument("--threads", type=int, default=8, help="Sunucu istek thread sayısı")
+    parser.add_argument("--login-clients", type=int, default=32, help="Paralel giriş istemcisi")
+    parser.add_argument("--catalog-clients", type=int, default=8, help="Paralel katalog istemcisi")
+    parser.add_argument("--hash-workers", type=int, default=2, help="pool yönteminde süreç sayısı")
+    parser.add_argument("--queue-limit", type=int, default=4, help="pool yönteminde bekleyen iş sınırı")
+    parser.add_argument("--rounds", type=int, default=29000, help="PBKDF2 tur sayısı")
+    parser.add_argument("--modes", default=",".join(MODES), help="Virgülle ayrılmış yöntemler")
+    parser.add_argument("--output", help="Sonuçları bu JSON dosyasına yaz")
+    args = parser.parse_args()
+
+    results = {"config": vars(args), "runs": []}
+    for mode in (mode for mode in args.modes.split(",") if mode in MODES):
+        result = run(mode, args)
+        results["runs"].append({"mode": mode, **result})
+        print(
+            f"{mode:6s}  giriş={result['logins']:<5d} p50={result['login_p50_ms']} ms p99={result['login_p99_ms']} ms "
+            f"503={result['login_503']:<5d} katalog={result['catalog_per_second']} istek/sn "
+            f"p99={result['catalog_p99_ms']} ms"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
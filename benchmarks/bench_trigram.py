@@ -0,0 +1,170 @@
+"""
+Trigram İndeksi Benchmark'ı
+
+Bellek içi trigram indeksi (src.trigram_index) ile mevcut '%q%' ilike
+aramasını aynı sorgular üzerinde karşılaştırır. İndeks kurulum süresi ve
+yaklaşık bellek kullanımı da raporlanır.
+
+Kullanım:
+    python -m benchmarks.bench_trigram --books 100000
+    DATABASE_URL=mysql+pymysql://... python -m benchmarks.bench_trigram --no-seed
+
+Not: --no-seed verilmezse ve veritabanında kitap yoksa sentetik katalog eklenir.
+Varsayılan veritabanı geçici bir SQLite dosyasıdır.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+
+# Uygulama import edilmeden önce veritabanı adresi belirlenmeli
+if not os.getenv("DATABASE_URL"):
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.gettempdir(), "bench_trigram.db")
+os.environ.setdefault("TRIGRAM_INDEX_ENABLED", "0")
+
+from sqlalchemy import insert, or_
+
+from app import create_app
+from src.db import db
+from src.models import Author, Book, Category
+from src.trigram_index import TrigramIndex
+
+
+QUERIES = ["orhn pamk", "ince memed", "kirmizi sacli", "yasar kml", "harry poter", "istanbul hatrasi", "1984"]
+
+# Gerçek eserler: örnek sorgular bunları bulmalı
+KNOWN_BOOKS = [
+    ("Kırmızı Saçlı Kadın", "Orhan Pamuk", "Roman"),
+    ("Beyaz Kale", "Orhan Pamuk", "Roman"),
+    ("İnce Memed", "Yaşar Kemal", "Klasik"),
+    ("Yer Demir Gök Bakır", "Yaşar Kemal", "Klasik"),
+    ("İstanbul Hatırası", "Ahmet Ümit", "Polisiye"),
+    ("Harry Potter ve Felsefe Taşı", "J.K. Rowling", "Fantastik"),
+    ("1984", "George Orwell", "Bilim Kurgu"),
+]
+SYLLABLES = [
+    "ka", "le", "mi", "ro", "su", "ta", "ye", "dı", "ğu", "şe", "çi", "ön", "ül", "ar", "en",
+    "ba", "de", "gö", "ha", "ki", "lu", "me", "na", "pe", "ra", "sa", "tü", "va", "zi", "ya",
+]
+FIRST_NAMES = ["Ayşe", "Mehmet", "Zeynep", "Mustafa", "Elif", "Ahmet", "Fatma", "Ali", "Emine", "Hüseyin",
+               "Deniz", "Can", "Selin", "Burak", "Ece", "Kerem", "İrem", "Onur", "Derya", "Umut"]
+LAST_NAMES = ["Yılmaz", "Kaya", "Demir", "Şahin", "Çelik", "Yıldız", "Öztürk", "Aydın", "Arslan", "Doğan",
+              "Kılıç", "Aslan", "Çetin", "Kara", "Koç", "Kurt", "Özdemir", "Şimşek", "Polat", "Erdoğan"]
+CATEGORIES = ["Roman", "Polisiye", "Bilim Kurgu", "Fantastik", "Klasik", "Tarih", "Felsefe", "Şiir",
+              "Biyografi", "Deneme", "Çocuk", "Bilim"]
+
+
+def _word(rng: random.Random) -> str:
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+
+
+def seed(book_count: int, rng: random.Random) -> None:
+    """Boş veritabanına sentetik yazar, kategori ve kitap ekler (yazar başına ~20 kitap)."""
+    db.create_all()
+    if db.session.query(Book.id).first() is not None:
+        return
+    author_names = sorted({name for _, name, _ in KNOWN_BOOKS})
+    author_names += [
+        f"{rng.choice(FIRST_NAMES)} {_word(rng).title()} {rng.choice(LAST_NAMES)}"
+        for _ in range(max(1, book_count // 20))
+    ]
+    db.session.execute(insert(Author), [{"name": name} for name in author_names])
+    db.session.execute(insert(Category), [{"name": name} for name in CATEGORIES])
+    author_ids = {name: author_id for author_id, name in db.session.query(Author.id, Author.name)}
+    category_ids = {name: category_id for category_id, name in db.session.query(Category.id, Category.name)}
+
+    db.session.execute(
+        insert(Book),
+        [
+            {"title": title, "isbn": f"known-{i}", "author_id": author_ids[author],
+             "category_id": category_ids[category], "total_copies": 1, "available_copies": 1}
+            for i, (title, author, category) in enumerate(KNOWN_BOOKS)
+        ],
+    )
+    all_authors = list(author_ids.values())
+    all_categories = list(category_ids.values())
+    for start in range(0, book_count, 10000):
+        db.session.execute(
+            insert(Book),
+            [
+                {
+                    "title": " ".join(_word(rng) for _ in range(rng.randint(1, 4))).title(),
+                    "isbn": f"bench-{i}",
+                    "author_id": rng.choice(all_authors),
+                    "category_id": rng.choice(all_categories),
+                    "total_copies": 1,
+                    "available_copies": 1,
+                }
+                for i in range(start, min(start + 10000, book_count))
+            ],
+        )
+    db.session.commit()
+
+
+def timed(fn, repeat: int) -> dict:
+    """Fonksiyonu repeat kez çalıştırıp milisaniye cinsinden p50/p99 döndürür."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        "p50_ms": round(statistics.median(samples), 3),
+        "p99_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.99))], 3),
+    }
+
+
+def ilike_search(q: str, limit: int) -> list:
+    """list_books'un mode=like yolu ile aynı sorgu."""
+    like = f"%{q}%"
+    return (
+        db.session.query(Book.id)
+        .join(Author, Author.id == Book.author_id)
+        .join(Category, Category.id == Book.category_id)
+        .filter(or_(Book.title.ilike(like), Author.name.ilike(like), Category.name.ilike(like)))
+        .order_by(Book.id)
+        .limit(limit)
+        .all()
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Trigram indeksi vs ilike arama benchmark'ı")
+    parser.add_argument("--books", type=int, default=100000, help="Sentetik kitap sayısı (boş veritabanında)")
+    parser.add_argument("--repeat", type=int, default=50, help="Sorgu başına tekrar sayısı")
+    parser.add_argument("--limit", type=int, default=50, help="Sorgu başına sonuç sayısı")
+    parser.add_argument("--no-seed", action="store_true", help="Veritabanına sentetik veri ekleme")
+    parser.add_argument("--output", help="Sonuçları bu JSON dosyasına yaz")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        if not args.no_seed:
+            seed(args.books, random.Random(42))
+
+        index = TrigramIndex()
+        started = time.perf_counter()
+        index.build_from_db()
+        build_seconds = time.perf_counter() - started
+
+        results = {"build_seconds": round(build_seconds, 2), "index": index.stats(), "queries": {}}
+        for q in QUERIES:
+            results["queries"][q] = {
+                "trigram": timed(lambda: index.search(q, limit=args.limit), args.repeat),
+                "ilike": timed(lambda: ilike_search(q, args.limit), max(1, args.repeat // 10)),
+                "trigram_hits": len(index.search(q, limit=args.limit)),
+                "ilike_hits": len(ilike_search(q, args.limit)),
+            }
+
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+"""
+Sorgu Planı (EXPLAIN) Kontrolü
+
+Büyük bir sentetik veri kümesi üzerinde her endpoint'i çağırır, çalışan SQL
+ifadelerini yakalar ve her birini EXPLAIN eder. Büyük bir tabloda tam tablo
+taraması yapan ifade bulunursa script 1 çıkış koduyla biter; böylece plan
+gerilemesi üretimde değil, CI'da fark edilir.
+
+Tam tarama sayılanlar:
+    MySQL  : type = ALL veya index (tam indeks taraması)
+    SQLite : "SCAN <tablo>" (EXPLAIN QUERY PLAN)
+İstisnalar:
+    - SMALL_TABLE_ROWS'tan küçük tablolar (örn: categories)
+    - ORDER BY ... LIMIT ile indeks sırasında okunup erken biten taramalar
+      (keyset sayfalama; ek sıralama / filesort yoksa)
+    - ALLOWED_SCANS: Tasarım gereği tüm tabloyu döndüren endpoint'ler
+
+Kullanım:
+    python -m benchmarks.explain_plans --books 50000
+    DATABASE_URL=mysql+pymysql://.../smart_library_explain python -m benchmarks.explain_plans
+
+Not: --no-seed verilmezse ve veritabanında kitap yoksa sentetik veri eklenir.
+Varsayılan veritabanı geçici bir SQLite dosyasıdır.
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+from datetime import date, datetime, timedelta
+
+# Uygulama import edilmeden önce veritabanı adresi belirlenmeli
+if not os.getenv("DATABASE_URL"):
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.gettempdir(), "explain_plans.db")
+os.environ.setdefault("TRIGRAM_INDEX_ENABLED", "0")
+
+from sqlalchemy import event, func, insert, select
+
+from app import create_app
+from src.db import db
+from src.models import Author, Book, Category, Loan, Penalty, User
+from src.security import create_access_token
+from src.search import refresh_book_search
+
+
+# Bu sayıdan az satırı olan tablolarda tarama sorun sayılmaz
+SMALL_TABLE_ROWS = 1000
+
+# Tasarım gereği tüm tabloyu okuyan endpoint'ler: {endpoint: {tablo: gerekçe}}
+ALLOWED_SCANS = {
+    "GET /api/admin/authors": {"authors": "Tüm yazarları döndürür (sayfalama yok)"},
+    "GET /api/admin/penalties": {"penalties": "Tüm cezaları döndürür (sayfalama yok)"},
+}
+
+# Yazma senaryolarında onaylanan istek sayısı (toplu onay + 1 tekli onay)
+WRITE_LOANS = 20
+
+STATUSES = ["returned"] * 6 + ["borrowed"] * 2 + ["requested", "rejected", "late"]
+
+
+def seed(book_count: int, rng: random.Random, loan_count: int | None = None) -> None:
+    """Boş veritabanına kitap, kullanıcı, ödünç (varsayılan: kitap sayısının 2 katı) ve ceza verisi ekler."""
+    db.create_all()
+    if db.session.query(Book.id).first() is not None:
+        return
+    user_count = max(100, book_count // 10)
+    if loan_count is None:
+        loan_count = book_count * 2
+
+    db.session.execute(insert(Category), [{"name": f"Kategori {i}"} for i in range(12)])
+    db.session.execute(insert(Author), [{"name": f"Yazar {i}"} for i in range(max(1, book_count // 20))])
+    author_ids = db.session.execute(select(Author.id)).scalars().all()
+    category_ids = db.session.execute(select(Category.id)).scalars().all()
+    now = datetime.utcnow()
+    for start in range(0, book_count, 10000):
+        db.session.execute(insert(Book), [
+            {
+                "title": f"Kitap {i}",
+                "isbn": f"explain-{i}",
+                "author_id": rng.choice(author_ids),
+                "category_id": rng.choice(category_ids),
+                "total_copies": 3,
+                "available_copies": rng.randint(0, 3),
+                "created_at": now - timedelta(minutes=i),
+            }
+            for i in range(start, min(start + 10000, book_count))
+        ])
+    db.session.execute(insert(User), [
+        {"full_name": f"Kullanıcı {i}", "email": f"user{i}@explain.test", "password_hash": "-",
+         "role": "admin" if i == 0 else "student"}
+        for i in range(user_count)
+    ])
+    user_ids = db.session.execute(select(User.id)).scalars().all()
+    book_ids = db.session.execute(select(Book.id)).scalars().all()
+    today = date.today()
+    for start in range(0, loan_count, 10000):
+        rows = []
+        for _ in range(start, min(start + 10000, loan_count)):
+            loan_date = today - timedelta(days=rng.randint(0, 365))
+            status = rng.choice(STATUSES)
+            rows.append({
+                "user_id": rng.choice(user_ids),
+                "book_id": rng.choice(book_ids),
+                "loan_date": loan_date,
+                "due_date": loan_date + timedelta(days=14),
+                "return_date": loan_date + timedelta(days=rng.randint(1, 30)) if status in ("returned", "late") else None,
+                "status": status,
+                "created_at": datetime.combine(loan_date, datetime.min.time()),
+            })
+        db.session.execute(insert(Loan), rows)
+    late = db.session.execute(select(Loan.id, Loan.user_id).where(Loan.status == "late")).all()
+    db.session.execute(insert(Penalty), [
+        {"loan_id": loan_id, "user_id": user_id, "days_late": 3, "penalty_end_date": today + timedelta(days=rng.randint(-60, 30))}
+        for loan_id, user_id in late
+    ])
+    refresh_book_search()
+    db.session.commit()
+
+
+def analyze() -> None:
+    """Planlayıcı istatistiklerini günceller."""
+    if db.engine.dialect.name == "mysql":
+        for table in db.metadata.tables:
+            db.session.connection().exec_driver_sql(f"ANALYZE TABLE {table}")
+    else:
+        db.session.connection().exec_driver_sql("ANALYZE")
+    db.session.commit()
+
+
+def table_sizes() -> dict:
+    return {
+        name: db.session.execute(select(func.count()).select_from(table)).scalar_one()
+        for name, table in db.metadata.tables.items()
+    }
+
+
+def explain(statement: str, parameters) -> list:
+    """
+    İfadenin planını döndürür.
+
+    Returns:
+        list: [(tablo, tam_tarama_mı, açıklama), ...]
+    """
+    connection = db.session.connection()
+    if db.engine.dialect.name == "mysql":
+        result = connection.exec_driver_sql("EXPLAIN " + statement, parameters)
+        columns = list(result.keys())
+        plan = []
+        for values in result:
+            row = dict(zip(columns, values))
+            extra = row.get("Extra") or ""
+            full = row.get("type") in ("ALL", "index")
+            plan.append((row.get("table"), full, f"type={row.get('type')} key={row.get('key')} rows={row.get('rows')} {extra}", extra))
+        return plan
+
+    plan = []
+    for row in connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters):
+        detail = row[-1]
+        match = re.match(r"SCAN (\w+)", detail)
+        plan.append((match.group(1) if match else None, bool(match), detail, detail))
+    return plan
+
+
+def check_statement(endpoint: str, statement: str, parameters, sizes: dict) -> list:
+    """İfadenin planındaki büyük tablo taramalarını döndürür."""
+    plan = explain(statement, parameters)
+    details = " | ".join(item[2] for item in plan)
+    has_limit = re.search(r"\bLIMIT\b", statement, re.IGNORECASE) is not None
+    # Ek sıralama yoksa ORDER BY ... LIMIT taraması indeks sırasında erken biter
+    sorts = any("TEMP B-TREE FOR ORDER BY" in item[3] or "filesort" in item[3] for item in plan)
+    problems = []
+    for table, full, description, _ in plan:
+        if not full or table not in sizes or sizes[table] < SMALL_TABLE_ROWS:
+            continue
+        if has_limit and not sorts:
+            continue
+        if table in ALLOWED_SCANS.get(endpoint, {}):
+            continue
+        problems.append({"endpoint": endpoint, "table": table, "plan": description, "full_plan": details,
+                         "sql": " ".join(statement.split())})
+    return problems
+
+
+def is_successful_write(method: str, status_code: int) -> bool:
+    """Okuma senaryoları için her zaman True; yazma senaryoları 2xx dönmelidir."""
+    return method == "GET" or 200 <= status_code < 300
+
+
+def scenario_ids() -> dict:
+    """
+    Senaryolarda kullanılan kayıt ID'lerini seçer.
+
+    Onaylanacak istekler müsait kopyası olan farklı kitaplardandır; böylece
+    toplu onay tekli onayın kopyasını tüketmez ve yazma senaryoları başarılı
+    yoldan (2xx) geçer.
+
+    Returns:
+        dict: {"admin_id", "student_id", "loan_ids", "book_id"}
+    """
+    first_request = (
+        select(func.min(Loan.id))
+        .join(Book, Book.id == Loan.book_id)
+        .where(Loan.status == "requested", Book.available_copies > 0)
+        .group_by(Loan.book_id)
+    )
+    loan_ids = db.session.execute(
+        select(Loan.id).where(Loan.id.in_(first_request)).order_by(Loan.id).limit(WRITE_LOANS)
+    ).scalars().all()
+    student_id = db.session.execute(select(Loan.user_id).where(Loan.id == loan_ids[0])).scalar_one()
+    return {
+        "admin_id": db.session.execute(select(User.id).where(User.role == "admin").limit(1)).scalar_one(),
+        "student_id": student_id,
+        "loan_ids": loan_ids,
+        "book_id": db.session.execute(select(Book.id).where(Book.available_copies > 0).limit(1)).scalar_one(),
+    }
+
+
+def scenarios(student_id: int, loan_ids: list, book_id: int):
+    """
+    (açıklama, method, path, json, rol) listesi. Yazma işlemleri en sonda çalışır.
+
+    loan_ids: Bekleyen istekler; sonuncusu tekli onay / iade, diğerleri toplu onay içindir.
+    """
+    batch_ids, single_id = loan_ids[:-1], loan_ids[-1]
+    return [
+        ("GET /api/books", "GET", "/api/books/?limit=50", None, None),
+        ("GET /api/books", "GET", "/api/books/?limit=50&sort=title", None, "student"),
+        ("GET /api/books", "GET", "/api/books/?limit=50&sort=created_at&order=desc", None, "student"),
+        ("GET /api/books", "GET", "/api/books/?limit=50&category_id=1&available=true&facets=1", None, "student"),
+        ("GET /api/books", "GET", "/api/books/?limit=50&author_id=1", None, None),
+        ("GET /api/loans/my", "GET", "/api/loans/my", None, "student"),
+        ("GET /api/loans/my", "GET", "/api/loans/my?scope=history&status=returned,late&from=2020-01-01", None, "student"),
+        ("GET /api/loans/penalties", "GET", "/api/loans/penalties", None, "student"),
+        ("GET /api/loans/penalties", "GET", "/api/loans/penalties?scope=active", None, "student"),
+        ("GET /api/loans/requests", "GET", "/api/loans/requests?limit=50", None, "admin"),
+        ("GET /api/loans/requests", "GET", f"/api/loans/requests?limit=50&user_id={student_id}", None, "admin"),
+        ("GET /api/admin/authors", "GET", "/api/admin/authors", None, "admin"),
+        ("GET /api/admin/categories", "GET", "/api/admin/categories", None, "admin"),
+        ("GET /api/admin/penalties", "GET", "/api/admin/penalties", None, "admin"),
+        ("POST /api/loans", "POST", "/api/loans/", {"book_id": book_id}, "student"),
+        ("POST /api/loans/requests/batch", "POST", "/api/loans/requests/batch", {"ids": batch_ids, "action": "approve"}, "admin"),
+        ("POST /api/loans/<id>/approve", "POST", f"/api/loans/{single_id}/approve", None, "admin"),
+        ("POST /api/loans/<id>/return", "POST", f"/api/loans/{single_id}/return", None, "admin"),
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Endpoint SQL'lerini EXPLAIN ile tam tarama için kontrol eder")
+    parser.add_argument("--books", type=int, default=50000, help="Sentetik kitap sayısı (boş veritabanında)")
+    parser.add_argument("--no-seed", action="store_true", help="Veritabanına sentetik veri ekleme")
+    parser.add_argument("--verbose", action="store_true", help="Tüm ifadeleri ve planları yazdır")
+    parser.add_argument("--output", help="Sonuçları bu JSON dosyasına yaz")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        if not args.no_seed:
+            seed(args.books, random.Random(42))
+        analyze()
+        sizes = table_sizes()
+        ids = scenario_ids()
+        tokens = {
+            "admin": create_access_token(ids["admin_id"], "admin"),
+            "student": create_access_token(ids["student_id"], "student"),
+        }
+        engine = db.engine
+
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and re.match(r"\s*(SELECT|UPDATE|DELETE)\b", statement, re.IGNORECASE):
+            captured.append((statement, parameters))
+
+    client = app.test_client()
+    problems = []
+    failed_writes = []
+    report = {"database": engine.dialect.name, "table_rows": sizes, "endpoints": []}
+    for name, method, path, body, role in scenarios(ids["student_id"], ids["loan_ids"], ids["book_id"]):
+        headers = {"Authorization": f"Bearer {tokens[role]}"} if role else {}
+        captured.clear()
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            response = client.open(path, method=method, json=body, headers=headers)
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+        with app.app_context():
+            found = []
+            for statement, parameters in captured:
+                found += check_statement(name, statement, parameters, sizes)
+                if args.verbose:
+                    print(f"{name}: {' '.join(statement.split())[:160]}")
+                    for _, _, description, _ in explain(statement, parameters):
+                        print(f"    {description}")
+            db.session.rollback()
+        problems += found
+        # Reddedilen yazma isteği başarılı yolun planını denetlemez
+        if not is_successful_write(method, response.status_code):
+            failed_writes.append(f"{method} {path} -> {response.status_code}: {response.get_data(as_text=True)[:200]}")
+        report["endpoints"].append({"endpoint": name, "path": path, "status": response.status_code,
+                                    "statements": len(captured), "full_scans": len(found)})
+        print(f"[{'OK' if not found else 'SCAN'}] {method} {path} -> {response.status_code}, {len(captured)} ifade")
+
+    report["problems"] = problems
+    report["failed_writes"] = failed_writes
+    for problem in problems:
+        print(f"\n[FULL SCAN] {problem['endpoint']} tablo={problem['table']}\n  {problem['plan']}\n  SQL: {problem['sql'][:300]}")
+    for failure in failed_writes:
+        print(f"\n[YAZMA BAŞARISIZ] {failure}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False, default=str)
+    print(f"\n{len(problems)} tam tarama bulundu")
+    sys.exit(1 if problems or failed_writes else 0)
+
+
+if __name__ == "__main__":
+    main()
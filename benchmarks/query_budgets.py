@@ -0,0 +1,91 @@
+"""
+Sorgu Bütçesi Kontrolü
+
+Sentetik veri kümesi üzerinde her endpoint'i çağırır ve çalışan SQL
+ifadelerini sayar (src.profiler.assert_max_queries). Bir endpoint route
+üzerinde bildirilen bütçeyi (@query_budget, yoksa SQL_QUERY_BUDGET) aşarsa
+veya aynı şekilli ifadeyi --n-plus-one kez çalıştırırsa script 1 çıkış
+koduyla biter; böylece N+1 gerilemesi CI'da fark edilir. Yazma senaryosu
+2xx dönmezse de (bütçe erken ret yolunda ölçülmüş olur) script başarısızdır.
+
+Senaryolar ve veri kümesi benchmarks.explain_plans ile aynıdır.
+
+Kullanım:
+    python -m benchmarks.query_budgets --books 5000
+    DATABASE_URL=mysql+pymysql://.../smart_library_budgets python -m benchmarks.query_budgets
+
+Not: --no-seed verilmezse ve veritabanında kitap yoksa sentetik veri eklenir.
+Varsayılan veritabanı geçici bir SQLite dosyasıdır.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+
+# Uygulama import edilmeden önce veritabanı adresi belirlenmeli
+if not os.getenv("DATABASE_URL"):
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.gettempdir(), "query_budgets.db")
+os.environ.setdefault("TRIGRAM_INDEX_ENABLED", "0")
+
+from app import create_app
+from benchmarks.explain_plans import is_successful_write, scenario_ids, scenarios, seed
+from src.profiler import assert_max_queries, endpoint_budget
+from src.security import create_access_token
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Endpoint başına SQL ifadesi sayısını bütçeye göre kontrol eder")
+    parser.add_argument("--books", type=int, default=5000, help="Sentetik kitap sayısı (boş veritabanında)")
+    parser.add_argument("--no-seed", action="store_true", help="Veritabanına sentetik veri ekleme")
+    parser.add_argument("--n-plus-one", type=int, default=5, help="Aynı şekilli ifade için tekrar sınırı")
+    parser.add_argument("--output", help="Sonuçları bu JSON dosyasına yaz")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        if not args.no_seed:
+            seed(args.books, random.Random(42))
+        ids = scenario_ids()
+        tokens = {
+            "admin": create_access_token(ids["admin_id"], "admin"),
+            "student": create_access_token(ids["student_id"], "student"),
+        }
+
+    client = app.test_client()
+    adapter = app.url_map.bind("localhost")
+    failures = []
+    report = {"endpoints": []}
+    for name, method, path, body, role in scenarios(ids["student_id"], ids["loan_ids"], ids["book_id"]):
+        headers = {"Authorization": f"Bearer {tokens[role]}"} if role else {}
+        endpoint, _ = adapter.match(path.split("?")[0], method=method)
+        budget = endpoint_budget(app, endpoint)
+        error = None
+        try:
+            with assert_max_queries(budget, args.n_plus_one) as collector:
+                response = client.open(path, method=method, json=body, headers=headers)
+        except AssertionError as e:
+            error = str(e)
+            failures.append({"endpoint": name, "path": path, "error": error})
+        # Reddedilen yazma isteği erken döner; bütçe başarılı yolda ölçülmelidir
+        if error is None and not is_successful_write(method, response.status_code):
+            error = f"Yazma isteği başarısız ({response.status_code}): {response.get_data(as_text=True)[:200]}"
+            failures.append({"endpoint": name, "path": path, "error": error})
+        report["endpoints"].append({"endpoint": name, "path": path, "status": response.status_code,
+                                    "statements": collector.count, "budget": budget})
+        print(f"[{'OK' if error is None else 'FAIL'}] {method} {path} -> {response.status_code}, "
+              f"{collector.count}/{budget} ifade")
+
+    for failure in failures:
+        print(f"\n[BÜTÇE AŞILDI] {failure['endpoint']} ({failure['path']})\n{failure['error']}")
+    report["failures"] = failures
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\n{len(failures)} endpoint bütçeyi aştı")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,11 +4,20 @@
 -- 
 -- Bu dosya, kütüphane yönetim sistemi için gerekli tüm veritabanı yapısını içerir:
 --   - Tablolar (users, authors, categories, books, loans, penalties)
+--   - Yardımcı tablolar (book_search, book_stock_stripes, cache_versions,
+--     overdue_sweep_stats, schema_migrations)
 --   - Foreign key ilişkileri
 --   - Indexler (performans için)
 --   - Stored procedure'ler (sp_borrow_book, sp_return_book)
 --   - Trigger'lar (trg_create_penalty_after_return)
 --
+-- Şema güncel haldedir: update_loan_system.sql, update_penalty_system.sql ve
+-- migrations/ klasöründeki 0001-0012 migration'ları bu dosyaya işlenmiştir.
+-- Bu migration'lar schema_migrations tablosuna uygulandı olarak yazılır;
+-- sonradan eklenen migration'lar için kurulumdan sonra `python migrate.py`
+-- çalıştırılmalıdır. Yeni bir migration eklendiğinde bu dosya da
+-- güncellenmeli ve sürümü schema_migrations kayıtlarına eklenmelidir.
+--
 -- Referans: `proje2025-2026.pdf` (Akıllı Kütüphane Yönetim Sistemi)
 --
 -- Kullanım:
@@ -39,6 +48,7 @@ CREATE TABLE users (
     password_hash VARCHAR(255)    NOT NULL,
     role         ENUM('student','staff','admin') NOT NULL DEFAULT 'student',
     is_active    TINYINT(1)       NOT NULL DEFAULT 1,
+    blocked_until DATE            NULL,             -- Etkin ceza bitiş tarihi (cezası yoksa NULL)
     created_at   DATETIME         NOT NULL DEFAULT CURRENT_TIMESTAMP
 );
 
@@ -68,7 +78,8 @@ CREATE TABLE books (
     author_id     INT          NOT NULL,           -- Yazar ID (foreign key)
     category_id   INT          NOT NULL,           -- Kategori ID (foreign key)
     total_copies  INT          NOT NULL DEFAULT 1,  -- Toplam kopya sayısı
-    available_copies INT       NOT NULL DEFAULT 1,  -- Mevcut kopya sayısı
+    available_copies INT       NOT NULL DEFAULT 1,  -- Mevcut kopya sayısı (parçalıysa parçaların toplamı)
+    stock_stripes SMALLINT     NOT NULL DEFAULT 0,  -- Stok parça sayısı (0: parçasız)
     created_at    DATETIME     NOT NULL DEFAULT CURRENT_TIMESTAMP,  -- Kayıt tarihi
     CONSTRAINT fk_books_author
       FOREIGN KEY (author_id) REFERENCES authors(id)
@@ -80,8 +91,9 @@ CREATE TABLE books (
 
 -- Ödünç Alma Tablosu
 -- Kullanıcıların kitapları ödünç alma işlemlerini içerir
--- Durumlar: borrowed (ödünç alındı), returned (iade edildi), late (geç iade)
--- Not: Bu tablo daha sonra 'requested', 'approved', 'rejected' durumları eklenmiştir
+-- Durumlar: requested (istek gönderildi), approved (admin onayladı),
+--          borrowed (ödünç alındı), returned (iade edildi), late (gecikmiş / geç iade),
+--          rejected (istek reddedildi)
 CREATE TABLE loans (
     id             INT AUTO_INCREMENT PRIMARY KEY,
     user_id        INT          NOT NULL,          -- Kullanıcı ID (foreign key)
@@ -89,7 +101,8 @@ CREATE TABLE loans (
     loan_date      DATE         NOT NULL,          -- Ödünç alma tarihi
     due_date       DATE         NOT NULL,          -- İade tarihi
     return_date    DATE         NULL,              -- Gerçek iade tarihi (opsiyonel)
-    status         ENUM('borrowed','returned','late') NOT NULL DEFAULT 'borrowed',  -- Durum
+    status         ENUM('requested','approved','borrowed','returned','late','rejected')
+                   NOT NULL DEFAULT 'requested',  -- Durum
     created_at     DATETIME     NOT NULL DEFAULT CURRENT_TIMESTAMP,  -- Kayıt tarihi
     CONSTRAINT fk_loans_user
       FOREIGN KEY (user_id) REFERENCES users(id)
@@ -100,16 +113,16 @@ CREATE TABLE loans (
 );
 
 -- Cezalar Tablosu
--- Gecikmiş kitap iadeleri için otomatik olarak oluşturulan cezaları içerir
+-- Gecikmiş kitap iadeleri için oluşturulan cezaları içerir
+-- Ceza para değil, penalty_end_date'e kadar kitap alamamadır (1 ay = 30 gün)
 -- Trigger (trg_create_penalty_after_return) ile otomatik oluşturulur
 CREATE TABLE penalties (
     id           INT AUTO_INCREMENT PRIMARY KEY,
     loan_id      INT          NOT NULL UNIQUE,     -- Ödünç kaydı ID (benzersiz, foreign key)
     user_id      INT          NOT NULL,            -- Kullanıcı ID (foreign key)
-    amount       DECIMAL(10,2) NOT NULL,          -- Ceza tutarı (10,2 formatında)
     days_late    INT          NOT NULL,           -- Gecikme gün sayısı
+    penalty_end_date DATE     NOT NULL DEFAULT (DATE_ADD(CURDATE(), INTERVAL 30 DAY)),  -- Ceza bitiş tarihi
     created_at   DATETIME     NOT NULL DEFAULT CURRENT_TIMESTAMP,  -- Ceza oluşturulma tarihi
-    is_paid      TINYINT(1)   NOT NULL DEFAULT 0,  -- Ceza ödendi mi? (0: hayır, 1: evet)
     CONSTRAINT fk_penalties_loan
       FOREIGN KEY (loan_id) REFERENCES loans(id)
       ON DELETE CASCADE ON UPDATE CASCADE,
@@ -118,16 +131,93 @@ CREATE TABLE penalties (
       ON DELETE CASCADE ON UPDATE CASCADE
 );
 
+-- Kitap Arama Tablosu (migration 0002)
+-- Kitap başlığı + yazar + kategori adlarının Türkçe harf katlamalı birleşimi
+-- GET /api/books?q=... FULLTEXT araması bu tablodan yapılır
+-- Doldurmak / yeniden kurmak için: python rebuild_search_index.py
+CREATE TABLE book_search (
+    book_id      INT  NOT NULL PRIMARY KEY,       -- Kitap ID (foreign key)
+    search_text  TEXT NOT NULL,                   -- Katlanmış arama metni
+    FULLTEXT KEY ft_book_search_text (search_text) WITH PARSER ngram,
+    CONSTRAINT fk_book_search_book
+      FOREIGN KEY (book_id) REFERENCES books(id)
+      ON DELETE CASCADE ON UPDATE CASCADE
+) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci;
+
+-- Parçalı Stok Tablosu (migration 0006)
+-- Çok talep gören kitapların stoku N satıra bölünür (books.stock_stripes > 0)
+CREATE TABLE book_stock_stripes (
+    book_id    INT       NOT NULL,              -- Kitap ID
+    stripe     SMALLINT  NOT NULL,              -- Parça numarası (0..N-1)
+    available  INT       NOT NULL DEFAULT 0,    -- Bu parçadaki müsait kopya
+    PRIMARY KEY (book_id, stripe),
+    FOREIGN KEY (book_id) REFERENCES books(id) ON DELETE CASCADE
+);
+
+-- Önbellek Sürümleri Tablosu (migration 0003)
+-- ETag üretimi için kapsam başına (catalog, user:<id>) sürüm sayacı
+CREATE TABLE cache_versions (
+    scope    VARCHAR(64) NOT NULL PRIMARY KEY,   -- Kapsam adı (catalog, user:<id>)
+    version  BIGINT      NOT NULL DEFAULT 0      -- Sürüm sayacı
+);
+
+-- Gecikmiş Ödünç Tarama İstatistikleri (migration 0011)
+-- Tek satırlık tablo; tüm worker'lar ve sweep_overdue.py aynı satırı günceller
+CREATE TABLE overdue_sweep_stats (
+    id                      SMALLINT NOT NULL PRIMARY KEY,   -- Her zaman 1
+    runs                    INT      NOT NULL DEFAULT 0,     -- Tamamlanan tarama sayısı
+    errors                  INT      NOT NULL DEFAULT 0,     -- Hatayla biten tarama sayısı
+    marked_total            BIGINT   NOT NULL DEFAULT 0,     -- Toplam "late" yapılan ödünç
+    last_run_at             DATETIME NULL,                   -- Son taramanın başlangıcı
+    last_seconds            DOUBLE   NULL,                   -- Son taramanın süresi
+    last_marked             INT      NULL,                   -- Son taramada "late" yapılan ödünç
+    last_chunks             INT      NULL,                   -- Son taramadaki parça sayısı
+    last_max_chunk_seconds  DOUBLE   NULL,                   -- Son taramadaki en uzun parça
+    last_error              TEXT     NULL,                   -- Son hata mesajı
+    scheduler_pid           INT      NULL,                   -- Zamanlayıcıyı çalıştıran süreç
+    scheduler_heartbeat_at  DATETIME NULL                    -- Zamanlayıcının son tur zamanı
+);
+
+INSERT INTO overdue_sweep_stats (id) VALUES (1);
+
+-- Uygulanan Migration'lar Tablosu (migrate.py)
+-- Bu dosyaya işlenmiş migration'lar uygulandı olarak kaydedilir
+CREATE TABLE schema_migrations (
+    version     VARCHAR(4)   NOT NULL PRIMARY KEY,   -- Migration sürümü (örn: 0005)
+    name        VARCHAR(200) NOT NULL,               -- Migration adı
+    applied_at  DATETIME     NOT NULL                -- Uygulanma zamanı
+);
+
+INSERT INTO schema_migrations (version, name, applied_at)
+VALUES
+('0001', 'books_pagination_index', CURRENT_TIMESTAMP),
+('0002', 'book_search_fulltext', CURRENT_TIMESTAMP),
+('0003', 'cache_versions', CURRENT_TIMESTAMP),
+('0004', 'loans_active_lookup_index', CURRENT_TIMESTAMP),
+('0005', 'books_facet_indexes', CURRENT_TIMESTAMP),
+('0006', 'book_stock_stripes', CURRENT_TIMESTAMP),
+('0007', 'loans_status_created_index', CURRENT_TIMESTAMP),
+('0008', 'users_blocked_until', CURRENT_TIMESTAMP),
+('0009', 'hot_query_indexes', CURRENT_TIMESTAMP),
+('0010', 'loans_status_due_index', CURRENT_TIMESTAMP),
+('0011', 'overdue_sweep_stats', CURRENT_TIMESTAMP),
+('0012', 'loans_active_lookup_return_date', CURRENT_TIMESTAMP);
+
 -- ============================================================================
 -- İNDEKSLER (Performans İyileştirmeleri)
 -- ============================================================================
 -- Arama ve sorgu performansını artırmak için oluşturulan indeksler
 
 CREATE INDEX idx_books_title ON books(title);  -- Kitap başlığına göre arama
-CREATE INDEX idx_books_author ON books(author_id);
-CREATE INDEX idx_books_category ON books(category_id);
-CREATE INDEX idx_loans_user ON loans(user_id);
+CREATE INDEX idx_books_created ON books(created_at);  -- Tarihe göre sayfalama
+CREATE INDEX idx_books_category_available ON books(category_id, available_copies);  -- Kategori filtresi / facet
+CREATE INDEX idx_books_author_available ON books(author_id, available_copies);      -- Yazar filtresi / facet
 CREATE INDEX idx_loans_book ON loans(book_id);
+CREATE INDEX idx_loans_user_created ON loans(user_id, created_at);  -- Kullanıcının ödünç geçmişi
+CREATE INDEX idx_loans_user_status_book ON loans(user_id, status, book_id, return_date);  -- Kitap listesindeki anti-join
+CREATE INDEX idx_loans_status_created ON loans(status, created_at);  -- Bekleyen istekler kuyruğu
+CREATE INDEX idx_loans_status_due ON loans(status, due_date);  -- Gecikmiş ödünç taraması
+CREATE INDEX idx_penalties_user_end ON penalties(user_id, penalty_end_date);  -- Kullanıcının cezaları
 
 -- ============================================================================
 -- STORED PROCEDURE'LER
@@ -222,7 +312,7 @@ DELIMITER ;
 -- Mantık:
 --   - return_date > due_date ise (geç iade)
 --   - Gecikme gün sayısı hesaplanır
---   - Günlük 5 birim ceza uygulanır (days_late * 5.00)
+--   - Ceza bitiş tarihi iade tarihinden 1 ay (30 gün) sonrasıdır
 --   - penalties tablosuna yeni kayıt eklenir
 --   - Eğer ceza zaten varsa tekrar eklenmez
 DELIMITER $$
@@ -231,19 +321,21 @@ AFTER UPDATE ON loans
 FOR EACH ROW
 BEGIN
     DECLARE v_days_late INT;
+    DECLARE v_penalty_end_date DATE;
 
     IF NEW.return_date IS NOT NULL
        AND NEW.return_date > NEW.due_date
     THEN
         SET v_days_late = DATEDIFF(NEW.return_date, NEW.due_date);
+        SET v_penalty_end_date = DATE_ADD(NEW.return_date, INTERVAL 30 DAY); -- 1 ay = 30 gün
 
         IF NOT EXISTS (SELECT 1 FROM penalties WHERE loan_id = NEW.id) THEN
-            INSERT INTO penalties(loan_id, user_id, amount, days_late)
+            INSERT INTO penalties(loan_id, user_id, days_late, penalty_end_date)
             VALUES (
                 NEW.id,
                 NEW.user_id,
-                v_days_late * 5.00, -- günlük 5 birim ceza
-                v_days_late
+                v_days_late,
+                v_penalty_end_date
             );
         END IF;
     END IF;
@@ -0,0 +1,407 @@
+"""
+Yük Testi Verisi Üretme Scripti
+
+Boş bir veritabanına yük / kapasite testi için büyük ve gerçekçi sentetik veri
+ekler. Aynı --seed ve parametrelerle her çalıştırmada aynı veri üretilir
+(parçalar paralel yüklense bile: her parçanın rastgele sayı üreteci
+(seed, tablo, parça no) ile başlatılır). Tarihler çalıştırma gününe göredir.
+
+Üretilen veri:
+    - Kategoriler, yazarlar (az sayıda üretken yazar çok kitaba sahip)
+    - Kullanıcılar: 1 admin (admin@load.test), ~%3 personel, geri kalanı öğrenci;
+      hepsinin şifresi --password
+    - Kitaplar: Zipf dağılımlı popülerlik; popüler kitapların kopya sayısı fazla
+    - Ödünç geçmişi (Loan / Penalty durum makinesine uygun):
+        rejected          : Reddedilen istek
+        returned          : Zamanında iade
+        late + return_date: Geç iade; her birinin cezası var
+                            (days_late = iade - son tarih, ceza bitişi = iade + 30 gün)
+    - Güncel durum (kitap başına, stokla tutarlı):
+        borrowed / late   : Hâlâ dışarıda (son tarihi geçmişse late, bkz. src/overdue.py)
+        requested         : Onay bekleyen istek
+      books.available_copies = total_copies - dışarıdaki kopya sayısı
+    - users.blocked_until: Kullanıcının cezalarının en geç bitiş tarihi
+      (bkz. src/eligibility.py); book_search arama indeksi yeniden kurulur
+
+Ödünç alan kullanıcılar da Zipf dağılımlıdır (az sayıda kullanıcının çok uzun
+geçmişi olur). Satırlar ID aralıklarıyla parçalara bölünür; her parça çok
+satırlı INSERT ile ayrı bir süreçte yüklenir (SQLite tek yazıcıya izin
+verdiği için orada tek süreç kullanılır). MySQL'de yükleme sırasında
+oturum bazında foreign_key_checks / unique_checks kapatılır (veri yapı gereği
+tutarlıdır).
+
+Kullanım:
+    python generate_load_data.py --books 1000000 --users 200000 --loans 8000000
+    python generate_load_data.py --books 10000 --users 2000 --loans 50000 --seed 7
+    DATABASE_URL=sqlite:///load.db python generate_load_data.py --books 100000
+
+Not: Veritabanında kitap, kullanıcı veya ödünç varsa script çalışmaz.
+"""
+import argparse
+import math
+import multiprocessing
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import create_engine, func, insert, select, text, update
+
+from app import create_app
+from src.db import db
+from src.models import Author, Book, Category, Loan, Penalty, User
+from src.search import refresh_book_search
+from src.security import hash_password
+
+
+LOAN_DAYS = 14              # Varsayılan ödünç süresi (POST /api/loans ile aynı)
+PENALTY_DAYS = 30           # Ceza süresi (return_book ile aynı)
+MAX_COPIES = 6              # Kitap başına en fazla kopya
+MAX_PENDING = 2             # Kitap başına en fazla bekleyen istek
+# Güncel ödünç / istekler için kitap başına ayrılan ID aralığı (geçmiş ödünçlerden sonra)
+LOAN_SLOTS_PER_BOOK = MAX_COPIES + MAX_PENDING
+
+CATEGORY_NAMES = [
+    "Roman", "Bilim Kurgu", "Fantastik", "Polisiye", "Tarih", "Felsefe", "Psikoloji", "Şiir",
+    "Biyografi", "Çocuk", "Gençlik", "Bilim", "Matematik", "Fizik", "Kimya", "Biyoloji",
+    "Bilgisayar", "Mühendislik", "Ekonomi", "Hukuk", "Sanat", "Müzik", "Sinema", "Gezi",
+    "Yemek", "Sağlık", "Spor", "Din", "Sosyoloji", "Siyaset", "Eğitim", "Dil", "Edebiyat Kuramı",
+    "Deneme", "Öykü", "Tiyatro", "Mizah", "Çizgi Roman", "Klasikler", "Başvuru",
+]
+FIRST_NAMES = [
+    "Ahmet", "Mehmet", "Ayşe", "Fatma", "Elif", "Zeynep", "Can", "Deniz", "Emre", "Selin",
+    "Murat", "Gül", "Kemal", "Leyla", "Orhan", "Şule", "İsmail", "Ömer", "Özge", "Çağla",
+    "Barış", "Ece", "Hakan", "Merve", "Yusuf", "Derya", "Burak", "İrem", "Serkan", "Nazlı",
+]
+LAST_NAMES = [
+    "Yılmaz", "Kaya", "Demir", "Şahin", "Çelik", "Yıldız", "Yıldırım", "Öztürk", "Aydın", "Özdemir",
+    "Arslan", "Doğan", "Kılıç", "Aslan", "Çetin", "Kara", "Koç", "Kurt", "Özkan", "Şimşek",
+    "Polat", "Erdoğan", "Güneş", "Aksoy", "Tekin", "Uçar", "Bulut", "Kaplan", "Avcı", "Ateş",
+]
+TITLE_WORDS = [
+    "Sessiz", "Gece", "Deniz", "Kırmızı", "Rüzgâr", "Şehir", "Son", "Yolculuk", "Kayıp", "Zaman",
+    "Gölge", "Işık", "Bahçe", "Ayna", "Ses", "Kuş", "Dağ", "Sır", "Ateş", "Kar", "Yağmur",
+    "Harita", "Köprü", "Mektup", "Saat", "Rüya", "Yıldız", "Ada", "Kapı", "Orman", "Nehir",
+    "Çığlık", "Hafıza", "Düş", "Sokak", "İstanbul", "Ankara", "Mavi", "Beyaz", "Uzak", "Eski",
+]
+
+
+def chunk_rng(seed: int, table: str, chunk: int) -> random.Random:
+    """Parça başına deterministik rastgele sayı üreteci (paralel yüklemede de aynı veri)."""
+    return random.Random(f"{seed}:{table}:{chunk}")
+
+
+class ZipfPermutation:
+    """
+    1..n arasında Zipf dağılımlı ID üretir. Popülerlik sırası ID sırası değildir:
+    sıra -> ID eşlemesi n ile aralarında asal bir çarpanla yapılan permütasyondur.
+    """
+
+    def __init__(self, n: int, exponent: float, salt: int):
+        self.n = n
+        self.exponent = exponent
+        multiplier = (2654435761 + salt) % n or 1
+        while math.gcd(multiplier, n) != 1:
+            multiplier += 1
+        self.multiplier = multiplier
+        self.inverse = pow(multiplier, -1, n) if n > 1 else 0
+
+    def sample_rank(self, rng: random.Random) -> int:
+        # Sürekli Zipf dağılımının ters CDF'i (O(1) bellek; milyonlarca ID için tablo gerekmez)
+        u = rng.random()
+        if abs(self.exponent - 1.0) < 1e-9:
+            rank = self.n ** u
+        else:
+            power = 1.0 - self.exponent
+            rank = (1.0 + u * ((self.n + 1) ** power - 1.0)) ** (1.0 / power)
+        return min(max(int(rank), 1), self.n)
+
+    def id_for_rank(self, rank: int) -> int:
+        return (rank - 1) * self.multiplier % self.n + 1
+
+    def rank_for_id(self, item_id: int) -> int:
+        return (item_id - 1) * self.inverse % self.n + 1
+
+    def sample(self, rng: random.Random) -> int:
+        return self.id_for_rank(self.sample_rank(rng))
+
+
+def isbn13(book_id: int) -> str:
+    digits = f"978{book_id:09d}"
+    check = (10 - sum(int(d) * (1 if i % 2 == 0 else 3) for i, d in enumerate(digits)) % 10) % 10
+    return digits + str(check)
+
+
+class Plan:
+    """Tüm parçaların paylaştığı üretim parametreleri (alt süreçlere kopyalanır)."""
+
+    def __init__(self, args, password_hash: str):
+        self.seed = args.seed
+        self.books = args.books
+        self.users = args.users
+        self.authors = args.authors or max(1, args.books // 20)
+        self.categories = args.categories
+        self.loans = args.loans
+        self.days = args.days
+        self.late_rate = args.late_rate
+        self.reject_rate = args.reject_rate
+        self.password_hash = password_hash
+        self.today = date.today()
+        self.now = datetime.utcnow()
+        self.book_popularity = ZipfPermutation(args.books, args.zipf, salt=1)
+        self.author_popularity = ZipfPermutation(self.authors, args.zipf, salt=2)
+        # Admin (ID 1) ödünç almaz; ödünç alanlar 2..users
+        self.borrower_activity = ZipfPermutation(max(args.users - 1, 1), args.zipf, salt=3)
+
+    def borrower(self, rng: random.Random, exclude: set | None = None) -> int:
+        """Zipf dağılımlı ödünç alan; exclude verilirse o kümede olmayan biri seçilir ve kümeye eklenir."""
+        user_id = self.borrower_activity.sample(rng) + 1
+        if exclude is not None:
+            while user_id in exclude and len(exclude) < self.users - 1:
+                user_id = self.borrower_activity.sample(rng) + 1
+            exclude.add(user_id)
+        return user_id
+
+
+# ---------- Parça üreticileri: (plan, başlangıç ID, bitiş ID, rng) -> {tablo: satırlar} ----------
+
+def author_rows(plan: Plan, start: int, end: int, rng: random.Random) -> dict:
+    return {"authors": [
+        {"id": i, "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}", "bio": None}
+        for i in range(start, end)
+    ]}
+
+
+def user_rows(plan: Plan, start: int, end: int, rng: random.Random) -> dict:
+    rows = []
+    for i in range(start, end):
+        role = "admin" if i == 1 else ("staff" if rng.random() < 0.03 else "student")
+        rows.append({
+            "id": i,
+            "full_name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "email": "admin@load.test" if i == 1 else f"user{i}@load.test",
+            "password_hash": plan.password_hash,
+            "role": role,
+            "is_active": True,
+            "created_at": plan.now - timedelta(days=rng.randint(plan.days, plan.days + 365), seconds=rng.randint(0, 86399)),
+        })
+    return {"users": rows}
+
+
+def book_rows(plan: Plan, start: int, end: int, rng: random.Random) -> dict:
+    """Kitaplar ve kitaba bağlı güncel durum (dışarıdaki kopyalar, bekleyen istekler)."""
+    books, loans = [], []
+    for book_id in range(start, end):
+        rank = plan.book_popularity.rank_for_id(book_id)
+        share = rank / plan.books
+        copies = 1 + (share <= 0.01) * 2 + (share <= 0.001) * 2 + (rng.random() < 0.3)
+        # Popüler kitapların kopyaları çoğunlukla dışarıda
+        out_probability = max(0.02, min(0.95, 3.0 / math.sqrt(rank)))
+        out = sum(rng.random() < out_probability for _ in range(copies))
+        slot = plan.loans + (book_id - 1) * LOAN_SLOTS_PER_BOOK
+        # Aynı kitapta bir kullanıcının tek güncel ödüncü / isteği olur
+        holders = set()
+        for k in range(out):
+            loan_date = plan.today - timedelta(days=rng.randint(0, 2 * LOAN_DAYS))
+            due_date = loan_date + timedelta(days=LOAN_DAYS)
+            loans.append({
+                "id": slot + k + 1, "user_id": plan.borrower(rng, holders), "book_id": book_id,
+                "loan_date": loan_date, "due_date": due_date, "return_date": None,
+                "status": "late" if due_date < plan.today else "borrowed",
+                "created_at": datetime.combine(loan_date, datetime.min.time()) - timedelta(hours=rng.randint(1, 48)),
+            })
+        for k in range(MAX_PENDING):
+            if rng.random() < out_probability * 0.3:
+                requested = plan.now - timedelta(minutes=rng.randint(1, 7 * 24 * 60))
+                loans.append({
+                    "id": slot + MAX_COPIES + k + 1, "user_id": plan.borrower(rng, holders), "book_id": book_id,
+                    "loan_date": requested.date(), "due_date": requested.date() + timedelta(days=LOAN_DAYS),
+                    "return_date": None, "status": "requested", "created_at": requested,
+                })
+        books.append({
+            "id": book_id,
+            "title": " ".join(rng.sample(TITLE_WORDS, rng.randint(1, 3))) + f" {book_id}",
+            "isbn": isbn13(book_id),
+            "author_id": plan.author_popularity.sample(rng),
+            "category_id": rng.randint(1, plan.categories),
+            "total_copies": copies,
+            "available_copies": copies - out,
+            "stock_stripes": 0,
+            "created_at": plan.now - timedelta(days=plan.days + 365) + timedelta(seconds=book_id),
+        })
+    return {"books": books, "loans": loans}
+
+
+def history_rows(plan: Plan, start: int, end: int, rng: random.Random) -> dict:
+    """Kapanmış ödünçler (reddedilen, zamanında / geç iade edilen) ve geç iadelerin cezaları."""
+    loans, penalties = [], []
+    # En geç iade tarihi bugünü geçmesin: son tarih + en fazla 30 gün gecikme
+    newest = 2 * LOAN_DAYS + PENALTY_DAYS
+    for loan_id in range(start, end):
+        loan_date = plan.today - timedelta(days=rng.randint(newest, max(plan.days, newest)))
+        due_date = loan_date + timedelta(days=LOAN_DAYS)
+        created_at = datetime.combine(loan_date, datetime.min.time()) - timedelta(hours=rng.randint(1, 48))
+        row = {"id": loan_id, "user_id": plan.borrower(rng), "book_id": plan.book_popularity.sample(rng),
+               "loan_date": loan_date, "due_date": due_date, "created_at": created_at}
+        roll = rng.random()
+        if roll < plan.reject_rate:
+            row.update(return_date=None, status="rejected")
+        elif roll < plan.reject_rate + plan.late_rate:
+            return_date = due_date + timedelta(days=min(int(rng.expovariate(1 / 5)) + 1, PENALTY_DAYS))
+            row.update(return_date=return_date, status="late")
+            penalties.append({
+                "id": loan_id, "loan_id": loan_id, "user_id": row["user_id"],
+                "days_late": (return_date - due_date).days,
+                "penalty_end_date": return_date + timedelta(days=PENALTY_DAYS),
+                "created_at": datetime.combine(return_date, datetime.min.time()),
+            })
+        else:
+            row.update(return_date=loan_date + timedelta(days=rng.randint(1, LOAN_DAYS)), status="returned")
+        loans.append(row)
+    return {"loans": loans, "penalties": penalties}
+
+
+PHASES = [
+    # (tablo adı, üretici, satır sayısı fonksiyonu)
+    ("authors", author_rows, lambda plan: plan.authors),
+    ("users", user_rows, lambda plan: plan.users),
+    ("books", book_rows, lambda plan: plan.books),
+    ("history", history_rows, lambda plan: plan.loans),
+]
+
+TABLES = {
+    "authors": Author.__table__, "users": User.__table__, "books": Book.__table__,
+    "loans": Loan.__table__, "penalties": Penalty.__table__,
+}
+
+
+# ---------- Yükleme ----------
+
+_engine = None
+_plan = None
+
+
+def _init_worker(url: str, plan: Plan) -> None:
+    global _engine, _plan
+    _engine = create_engine(url, pool_size=1, max_overflow=0)
+    _plan = plan
+
+
+def _load_chunk(task: tuple) -> dict:
+    phase, chunk, start, end = task
+    generator = dict((name, fn) for name, fn, _ in PHASES)[phase]
+    tables = generator(_plan, start, end, chunk_rng(_plan.seed, phase, chunk))
+    with _engine.begin() as connection:
+        if connection.dialect.name == "mysql":
+            connection.exec_driver_sql("SET SESSION foreign_key_checks = 0, unique_checks = 0")
+        # Sözlük sırası yabancı anahtar sırasıdır (kitaplar -> ödünçler -> cezalar)
+        for table, rows in tables.items():
+            if rows:
+                connection.execute(insert(TABLES[table]), rows)
+    return {table: len(rows) for table, rows in tables.items()}
+
+
+def run_phase(phase: str, total: int, args, pool) -> dict:
+    tasks = [
+        (phase, chunk, start + 1, min(start + args.chunk_size, total) + 1)
+        for chunk, start in enumerate(range(0, total, args.chunk_size))
+    ]
+    counts = {}
+    started = time.perf_counter()
+    results = pool.imap_unordered(_load_chunk, tasks) if pool else map(_load_chunk, tasks)
+    for done, result in enumerate(results, 1):
+        for table, count in result.items():
+            counts[table] = counts.get(table, 0) + count
+        if done % max(1, len(tasks) // 10) == 0 or done == len(tasks):
+            elapsed = time.perf_counter() - started
+            rows = sum(counts.values())
+            print(f"  {phase:8s} {done}/{len(tasks)} parça, {rows} satır ({rows / max(elapsed, 1e-9):,.0f} satır/sn)")
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Yük testi için deterministik sentetik veri üretir")
+    parser.add_argument("--books", type=int, default=100_000, help="Kitap sayısı")
+    parser.add_argument("--users", type=int, default=20_000, help="Kullanıcı sayısı (ID 1 admin)")
+    parser.add_argument("--loans", type=int, default=500_000, help="Kapanmış (geçmiş) ödünç sayısı")
+    parser.add_argument("--authors", type=int, help="Yazar sayısı (varsayılan: kitap / 20)")
+    parser.add_argument("--categories", type=int, default=len(CATEGORY_NAMES), help="Kategori sayısı")
+    parser.add_argument("--days", type=int, default=730, help="Ödünç geçmişinin kapsadığı gün sayısı")
+    parser.add_argument("--late-rate", type=float, default=0.12, help="Geç iade (cezalı) oranı")
+    parser.add_argument("--reject-rate", type=float, default=0.05, help="Reddedilen istek oranı")
+    parser.add_argument("--zipf", type=float, default=1.1, help="Popülerlik dağılımının Zipf üssü")
+    parser.add_argument("--seed", type=int, default=42, help="Rastgele sayı tohumu")
+    parser.add_argument("--password", default="loadtest123", help="Tüm kullanıcıların şifresi")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Paralel yükleme süreci")
+    parser.add_argument("--chunk-size", type=int, default=10_000, help="Parça (transaction) başına satır")
+    args = parser.parse_args()
+    if args.books < 1 or args.users < 2:
+        print("[ERROR] En az 1 kitap ve 2 kullanıcı gerekir")
+        sys.exit(1)
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        for model in (Book, User, Loan):
+            if db.session.execute(select(func.count()).select_from(model)).scalar_one():
+                print(f"[ERROR] {model.__tablename__} tablosu boş değil; boş bir veritabanında çalıştırın")
+                sys.exit(1)
+        url = db.engine.url.render_as_string(hide_password=False)
+        dialect = db.engine.dialect.name
+        password_hash = hash_password(args.password)
+        plan = Plan(args, password_hash)
+        names = [
+            CATEGORY_NAMES[i] if i < len(CATEGORY_NAMES) else f"{CATEGORY_NAMES[i % len(CATEGORY_NAMES)]} {i}"
+            for i in range(args.categories)
+        ]
+        db.session.execute(insert(Category), [{"id": i + 1, "name": name} for i, name in enumerate(names)])
+        db.session.commit()
+        # Dosya veritabanı bağlantıları alt süreçlere devredilmesin
+        db.engine.dispose()
+
+    workers = 1 if dialect == "sqlite" else max(1, args.workers)
+    print("=" * 50)
+    print(f"Yük verisi üretiliyor ({dialect}, {workers} süreç, seed={args.seed})")
+    print("=" * 50)
+    started = time.perf_counter()
+    totals = {}
+    pool = None
+    if workers > 1:
+        pool = multiprocessing.get_context("spawn").Pool(workers, initializer=_init_worker, initargs=(url, plan))
+    else:
+        _init_worker(url, plan)
+    try:
+        for phase, _, total in PHASES:
+            for table, count in run_phase(phase, total(plan), args, pool).items():
+                totals[table] = totals.get(table, 0) + count
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+
+    with app.app_context():
+        print("  Ceza tarihleri ve arama indeksi güncelleniyor...")
+        latest_end = (
+            select(func.max(Penalty.penalty_end_date)).where(Penalty.user_id == User.id).scalar_subquery()
+        )
+        db.session.execute(update(User).values(blocked_until=latest_end), execution_options={"synchronize_session": False})
+        refresh_book_search()
+        db.session.commit()
+        if dialect == "mysql":
+            for table in db.metadata.tables:
+                db.session.connection().exec_driver_sql(f"ANALYZE TABLE {table}")
+        else:
+            db.session.execute(text("ANALYZE"))
+        db.session.commit()
+
+    elapsed = time.perf_counter() - started
+    rows = sum(totals.values())
+    print(f"[SUCCESS] {rows:,} satır {elapsed:.1f} sn içinde yüklendi ({rows / elapsed:,.0f} satır/sn)")
+    for table, count in sorted(totals.items()):
+        print(f"  {table:10s} {count:,}")
+    print(f"  Giriş: admin@load.test / user<ID>@load.test, şifre: {args.password}")
+
+
+if __name__ == "__main__":
+    main()
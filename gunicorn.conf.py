@@ -0,0 +1,94 @@
+"""
+Gunicorn Yapılandırması
+
+Kullanım:
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Ortam değişkenleri:
+    WEB_BIND         : Dinlenecek adres (varsayılan: 0.0.0.0:5000)
+    WEB_CONCURRENCY  : Worker süreç sayısı (varsayılan: CPU çekirdeği sayısı)
+    WEB_THREADS      : Worker başına istek thread'i (varsayılan: 8)
+    WEB_TIMEOUT      : İstek zaman aşımı, saniye (varsayılan: 30)
+    WEB_ACCESS_LOG   : Erişim günlüğü dosyası ("-": stdout, boş: kapalı)
+    METRICS_DIR      : Worker metrik dosyalarının dizini (varsayılan: her başlatmada yeni geçici dizin)
+
+Uygulama master süreçte bir kez yüklenir (preload_app); worker'lar fork
+edildikten sonra master'ın veritabanı bağlantılarını bırakır, kendi
+bağlantı havuzunu ısıtır ve ancak ondan sonra trafik kabul eder. Master'da
+arka plan thread'i çalışmaz; gecikme taraması tek bir worker'da başlatılır.
+"""
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+
+bind = os.getenv("WEB_BIND", "0.0.0.0:5000")
+workers = int(os.getenv("WEB_CONCURRENCY", str(multiprocessing.cpu_count())))
+threads = int(os.getenv("WEB_THREADS", "8"))
+worker_class = "gthread"
+timeout = int(os.getenv("WEB_TIMEOUT", "30"))
+graceful_timeout = 30
+keepalive = 5
+
+# create_app() master'da bir kez çalışır; trigram indeksi gibi salt okunur
+# yapılar worker'lar arasında copy-on-write ile paylaşılır
+preload_app = True
+
+# Uzun süre çalışan worker'larda bellek parçalanmasına karşı (rastgele kaydırmalı yeniden başlatma)
+max_requests = int(os.getenv("WEB_MAX_REQUESTS", "10000"))
+max_requests_jitter = max_requests // 10
+
+# Boş bırakılırsa erişim günlüğü kapanır
+accesslog = os.getenv("WEB_ACCESS_LOG", "-") or None
+
+
+# Worker'ların /api/metrics ölçümleri bu dizinde birleştirilir (bkz. src.metrics).
+# create_app() master'da çalışmadan önce belirlenmeli; worker'lar ortamı devralır.
+_created_metrics_dir = None
+if not os.getenv("METRICS_DIR"):
+    _created_metrics_dir = os.environ["METRICS_DIR"] = tempfile.mkdtemp(prefix="smart_library_metrics_")
+
+
+def pre_fork(server, worker):
+    """
+    Master'da, worker fork edilmeden önce çalışır. Gecikme taraması
+    (OVERDUE_SWEEP_SECONDS) tam olarak bir worker'da çalışır: çalıştıran
+    worker yoksa (ilk başlatma veya o worker sonlandıysa) yeni worker'a verilir.
+    """
+    worker.runs_overdue_sweeper = not any(
+        getattr(alive, "runs_overdue_sweeper", False) for alive in server.WORKERS.values()
+    )
+
+
+def post_fork(server, worker):
+    """Worker fork edildikten sonra, trafik kabul etmeden önce çalışır."""
+    from src.overdue import start_overdue_sweeper
+    from src.serving import after_fork, warm_up
+    from wsgi import app
+
+    after_fork(app)
+    report = warm_up(app, threads)
+    server.log.info("Worker %s ısındı: %s", worker.pid, report)
+    if worker.runs_overdue_sweeper and start_overdue_sweeper(app):
+        server.log.info("Worker %s gecikme taramasını çalıştırıyor", worker.pid)
+
+
+def worker_exit(server, worker):
+    """Worker sonlanırken son ölçümlerini diske yazar."""
+    from src.metrics import flush
+
+    flush(os.environ["METRICS_DIR"])
+
+
+def child_exit(server, worker):
+    """Sonlanan worker'ın ölçümleri master'da arşive eklenir (sayaçlar geriye gitmez)."""
+    from src.metrics import archive_worker
+
+    archive_worker(os.environ["METRICS_DIR"], worker.pid)
+
+
+def on_exit(server):
+    """Bu başlatmada oluşturulan geçici metrik dizinini siler."""
+    if _created_metrics_dir:
+        shutil.rmtree(_created_metrics_dir, ignore_errors=True)
@@ -0,0 +1,159 @@
+"""
+Veritabanı Migration Scripti
+
+migrations/ klasöründeki NNNN_ad.sql dosyalarını sürüm sırasıyla uygular.
+Uygulanan sürümler schema_migrations tablosunda tutulur; her migration
+yalnızca bir kez çalışır.
+
+Kullanım:
+    python migrate.py                 # Bekleyen migration'ları uygula
+    python migrate.py --status        # Uygulanan / bekleyen migration'ları listele
+    python migrate.py --baseline 0005 # 0005 ve öncesini (elle uygulanmış) uygulandı olarak işaretle
+
+Not: db_schema.sql güncel şemayı kurar ve içerdiği migration'ları
+schema_migrations tablosuna yazar; yeni kurulumda sadece sonradan eklenen
+migration'lar uygulanır. Eski bir db_schema.sql ile kurulmuş ve migration'ları
+elle uygulanmış bir veritabanında ilk kez çalıştırılırken --baseline kullanın.
+"""
+import argparse
+import os
+import re
+import sys
+import time
+from typing import Iterator, List, Set, Tuple
+
+from sqlalchemy import text
+
+from app import create_app
+from src.db import db
+
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+
+# Dosya adı: 0001_books_pagination_index.sql
+MIGRATION_FILE = re.compile(r"^(\d{4})_(\w+)\.sql$")
+
+
+def discover() -> List[Tuple[str, str, str]]:
+    """
+    migrations/ klasöründeki migration dosyalarını bulur.
+
+    Returns:
+        List[Tuple[str, str, str]]: Sürüm sırasıyla (sürüm, ad, dosya yolu) üçlüleri
+            (örn: ("0001", "books_pagination_index", ".../0001_books_pagination_index.sql"))
+    """
+    found = []
+    for filename in sorted(os.listdir(MIGRATIONS_DIR)):
+        match = MIGRATION_FILE.match(filename)
+        if match:
+            found.append((match.group(1), match.group(2), os.path.join(MIGRATIONS_DIR, filename)))
+    return found
+
+
+def statements(path: str) -> Iterator[str]:
+    """
+    SQL dosyasını tek tek çalıştırılacak ifadelere böler.
+    Yorum satırları ve USE ifadeleri atlanır (bağlantı zaten doğru veritabanındadır).
+
+    Args:
+        path: Migration dosyasının yolu
+
+    Returns:
+        Iterator[str]: Sondaki ";" olmadan, dosyadaki sırasıyla SQL ifadeleri
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        lines = [line for line in f if not line.lstrip().startswith("--")]
+    for statement in "".join(lines).split(";"):
+        statement = statement.strip()
+        if statement and not statement.upper().startswith("USE "):
+            yield statement
+
+
+def ensure_table() -> None:
+    """schema_migrations tablosu yoksa oluşturur (commit eder)."""
+    db.session.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        " version VARCHAR(4) NOT NULL PRIMARY KEY,"
+        " name VARCHAR(200) NOT NULL,"
+        " applied_at DATETIME NOT NULL)"
+    ))
+    db.session.commit()
+
+
+def applied_versions() -> Set[str]:
+    """
+    Uygulanmış migration sürümlerini döndürür.
+
+    Returns:
+        Set[str]: schema_migrations tablosundaki sürümler (örn: {"0001", "0002"})
+    """
+    return {row[0] for row in db.session.execute(text("SELECT version FROM schema_migrations"))}
+
+
+def record(version: str, name: str) -> None:
+    """
+    Migration'ı uygulandı olarak kaydeder (commit eder).
+
+    Args:
+        version: Migration sürümü (örn: "0005")
+        name: Migration adı (dosya adındaki sürümden sonraki kısım)
+    """
+    db.session.execute(
+        text("INSERT INTO schema_migrations (version, name, applied_at) VALUES (:version, :name, CURRENT_TIMESTAMP)"),
+        {"version": version, "name": name},
+    )
+    db.session.commit()
+
+
+def migrate() -> None:
+    """Komut satırı argümanlarına göre durumu listeler, baseline işaretler veya bekleyen migration'ları uygular."""
+    parser = argparse.ArgumentParser(description="Sürümlü veritabanı migration'larını uygular")
+    parser.add_argument("--status", action="store_true", help="Sadece durumu listele")
+    parser.add_argument("--baseline", metavar="SÜRÜM", help="Bu sürüm ve öncesini çalıştırmadan uygulandı işaretle")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        if db.engine.dialect.name != "mysql":
+            print("[ERROR] Migration dosyaları MySQL içindir. SQLite geliştirme veritabanı db.create_all() ile kurulur.")
+            sys.exit(1)
+
+        ensure_table()
+        done = applied_versions()
+        migrations = discover()
+
+        if args.status:
+            for version, name, _ in migrations:
+                print(f"  [{'OK' if version in done else 'BEKLIYOR'}] {version}_{name}")
+            return
+
+        if args.baseline:
+            for version, name, _ in migrations:
+                if version <= args.baseline and version not in done:
+                    record(version, name)
+                    print(f"  [BASELINE] {version}_{name}")
+            return
+
+        pending = [m for m in migrations if m[0] not in done]
+        if not pending:
+            print("[INFO] Bekleyen migration yok")
+            return
+
+        for version, name, path in pending:
+            started = time.perf_counter()
+            try:
+                # MySQL'de DDL ifadeleri örtük commit yapar; bu yüzden bir migration
+                # yarıda kalırsa kalan ifadeler elle tamamlanmalıdır
+                for statement in statements(path):
+                    db.session.connection().exec_driver_sql(statement)
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                print(f"  [ERROR] {version}_{name}: {e}")
+                sys.exit(1)
+            record(version, name)
+            print(f"  [OK] {version}_{name} ({time.perf_counter() - started:.1f} sn)")
+
+
+if __name__ == "__main__":
+    migrate()
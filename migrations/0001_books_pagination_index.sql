@@ -0,0 +1,17 @@
+-- ============================================================================
+-- Migration 0001: Kitap Listesi Sayfalama İndeksi
+-- ============================================================================
+--
+-- GET /api/books artık keyset (cursor) sayfalama kullanır. Sıralama anahtarları:
+--   - id          : PRIMARY KEY
+--   - title       : idx_books_title (InnoDB ikincil indeksleri PK'yı içerir,
+--                   bu yüzden (title, id) sıralaması da bu indeksten okunur)
+--   - created_at  : idx_books_created (bu migration ile eklenir)
+--
+-- Kullanım:
+--   mysql -u root -p smart_library < migrations/0001_books_pagination_index.sql
+-- ============================================================================
+
+USE smart_library;
+
+CREATE INDEX idx_books_created ON books(created_at);
@@ -0,0 +1,27 @@
+-- ============================================================================
+-- Migration 0002: Katalog FULLTEXT Arama Tablosu
+-- ============================================================================
+--
+-- GET /api/books?q=... artık '%q%' ile üç tabloyu taramak yerine book_search
+-- tablosundaki FULLTEXT (ngram parser) indeksini kullanır.
+--
+-- book_search.search_text: başlık + yazar adı + kategori adı, uygulama
+-- tarafından Türkçe uyumlu katlanmış halde (İ/ı/I/i -> i, ş -> s, ...).
+-- Satırlar kitap/yazar/kategori yazma işlemlerinde uygulama tarafından
+-- güncellenir; katlama SQL'de yapılamadığı için ilk doldurma Python ile yapılır.
+--
+-- Kullanım:
+--   mysql -u root -p smart_library < migrations/0002_book_search_fulltext.sql
+--   python rebuild_search_index.py
+-- ============================================================================
+
+USE smart_library;
+
+CREATE TABLE book_search (
+    book_id      INT  NOT NULL PRIMARY KEY,       -- Kitap ID (foreign key)
+    search_text  TEXT NOT NULL,                   -- Katlanmış arama metni
+    FULLTEXT KEY ft_book_search_text (search_text) WITH PARSER ngram,
+    CONSTRAINT fk_book_search_book
+      FOREIGN KEY (book_id) REFERENCES books(id)
+      ON DELETE CASCADE ON UPDATE CASCADE
+) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci;
@@ -0,0 +1,22 @@
+-- ============================================================================
+-- Migration 0003: ETag Sürüm Sayaçları
+-- ============================================================================
+--
+-- GET /api/books, /api/loans/my ve /api/loans/penalties yanıtları, bu
+-- tablodaki sürüm sayaçlarından üretilen ETag'ler taşır. If-None-Match
+-- eşleşirse liste sorguları çalıştırılmadan 304 Not Modified döner.
+--
+-- Kapsamlar:
+--   - catalog   : Kitap/yazar/kategori yazma işlemleri ve kopya sayısı değişimleri
+--   - user:<id> : Kullanıcının ödünç ve ceza kayıtlarındaki değişiklikler
+--
+-- Kullanım:
+--   mysql -u root -p smart_library < migrations/0003_cache_versions.sql
+-- ============================================================================
+
+USE smart_library;
+
+CREATE TABLE cache_versions (
+    scope    VARCHAR(64) NOT NULL PRIMARY KEY,   -- Kapsam adı (catalog, user:<id>)
+    version  BIGINT      NOT NULL DEFAULT 0      -- Sürüm sayacı
+);
@@ -0,0 +1,24 @@
+-- ============================================================================
+-- Migration 0004: Aktif Ödünç Anti-Join İndeksi
+-- ============================================================================
+--
+-- GET /api/books, giriş yapmış kullanıcının aktif (borrowed, requested,
+-- approved) ödüncü olan kitapları NOT EXISTS anti-join ile eler:
+--
+--   NOT EXISTS (SELECT 1 FROM loans
+--               WHERE loans.book_id = books.id
+--                 AND loans.user_id = ?
+--                 AND loans.status IN ('borrowed','requested','approved'))
+--
+-- (user_id, status, book_id) indeksi ile her kitap için alt sorgu tek bir
+-- indeks aramasıdır. Not: Sonradan eklenen "late" + return_date IS NULL
+-- koşulu bu indekste olmadığı için eşleşmelerde tablo satırı okunur;
+-- return_date 0012 ile indekse eklendi.
+--
+-- Kullanım:
+--   mysql -u root -p smart_library < migrations/0004_loans_active_lookup_index.sql
+-- ============================================================================
+
+USE smart_library;
+
+CREATE INDEX idx_loans_user_status_book ON loans(user_id, status, book_id);
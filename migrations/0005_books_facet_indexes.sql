@@ -0,0 +1,24 @@
+-- ============================================================================
+-- Migration 0005: Katalog Filtre / Facet İndeksleri
+-- ============================================================================
+--
+-- GET /api/books artık category_id, author_id ve available filtrelerini ve
+-- facets=1 ile kategori/yazar/müsaitlik sayılarını destekler. Bu sorgular
+-- (category_id, available_copies) ve (author_id, available_copies) üzerinden
+-- indeksten okunur.
+--
+-- Bileşik indeksler tek sütunlu idx_books_author / idx_books_category
+-- indekslerini kapsadığı için eskileri kaldırılır. Yabancı anahtarlar indeks
+-- gerektirdiğinden önce yeni indeksler oluşturulur.
+--
+-- Kullanım:
+--   mysql -u root -p smart_library < migrations/0005_books_facet_indexes.sql
+-- ============================================================================
+
+USE smart_library;
+
+CREATE INDEX idx_books_category_available ON books(category_id, available_copies);
+CREATE INDEX idx_books_author_available ON books(author_id, available_copies);
+
+DROP INDEX idx_books_category ON books;
+DROP INDEX idx_books_author ON books;
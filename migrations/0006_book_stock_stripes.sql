@@ -0,0 +1,29 @@
+-- ============================================================================
+-- Migration 0006: Atomik Stok Sayaçları ve Parçalı Stok
+-- ============================================================================
+--
+-- Ödünç verme/onaylama artık müsait kopyayı tek bir koşullu UPDATE ile düşer
+-- (UPDATE books SET available_copies = available_copies - 1
+--  WHERE id = ? AND available_copies > 0). Bu migration şema değişikliği
+-- gerektirmez; aşağıdakiler isteğe bağlı parçalı (striped) stok içindir.
+--
+-- Çok talep gören kitapların stoku book_stock_stripes tablosunda N satıra
+-- bölünebilir (PUT /api/admin/books/<id>/stripes). Bu kitaplarda
+-- books.available_copies parçaların toplamının anlık görüntüsüdür.
+--
+-- Kullanım:
+--   mysql -u root -p smart_library < migrations/0006_book_stock_stripes.sql
+-- ============================================================================
+
+USE smart_library;
+
+ALTER TABLE books
+    ADD COLUMN stock_stripes SMALLINT NOT NULL DEFAULT 0;   -- Stok parça sayısı (0: parçasız)
+
+CREATE TABLE book_stock_stripes (
+    book_id    INT       NOT NULL,              -- Kitap ID
+    stripe     SMALLINT  NOT NULL,              -- Parça numarası (0..N-1)
+    available  INT       NOT NULL DEFAULT 0,    -- Bu parçadaki müsait kopya
+    PRIMARY KEY (book_id, stripe),
+    FOREIGN KEY (book_id) REFERENCES books(id) ON DELETE CASCADE
+);
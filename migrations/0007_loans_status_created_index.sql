@@ -0,0 +1,18 @@
+-- ============================================================================
+-- Migration 0007: Ödünç İstek Kuyruğu İndeksi
+-- ============================================================================
+--
+-- GET /api/loans/requests artık bekleyen istekleri (created_at, id) üzerinden
+-- keyset sayfalama ile döndürür:
+--   WHERE status = 'requested' AND (created_at, id) > (:son_tarih, :son_id)
+--   ORDER BY created_at, id LIMIT :n
+-- Bu indeks sayesinde on binlerce bekleyen istek olsa da her sayfa sıralama
+-- yapılmadan indeksten okunur (InnoDB ikincil indeksleri PK'yı içerir).
+--
+-- Kullanım:
+--   mysql -u root -p smart_library < migrations/0007_loans_status_created_index.sql
+-- ============================================================================
+
+USE smart_library;
+
+CREATE INDEX idx_loans_status_created ON loans(status, created_at);
@@ -0,0 +1,27 @@
+-- ============================================================================
+-- Migration 0008: Kullanıcı Ceza Bitiş Tarihi (users.blocked_until)
+-- ============================================================================
+--
+-- Ödünç alma ve onaylama, ceza geçmişini taramak yerine kullanıcının
+-- blocked_until değerini birincil anahtar ile okur. Değer, kullanıcının tüm
+-- cezalarının en geç bitiş tarihidir ve uygulama tarafından (iade ve ceza
+-- kaldırma sırasında) güncel tutulur. trg_create_penalty_after_return
+-- trigger'ı ile oluşan cezalar da iade isteği içinde yeniden hesaplanır.
+--
+-- Kullanım:
+--   mysql -u root -p smart_library < migrations/0008_users_blocked_until.sql
+-- ============================================================================
+
+USE smart_library;
+
+ALTER TABLE users
+    ADD COLUMN blocked_until DATE NULL;   -- Etkin ceza bitiş tarihi
+
+-- Mevcut cezalardan doldur
+UPDATE users u
+JOIN (
+    SELECT user_id, MAX(penalty_end_date) AS latest_end
+    FROM penalties
+    GROUP BY user_id
+) p ON p.user_id = u.id
+SET u.blocked_until = p.latest_end;
@@ -0,0 +1,30 @@
+-- ============================================================================
+-- Migration 0009: Sık Kullanılan Sorgular İçin Bileşik İndeksler
+-- ============================================================================
+--
+-- Her endpoint'in SQL'i "python -m benchmarks.explain_plans" ile EXPLAIN
+-- edilerek doğrulanır (büyük sentetik veri üzerinde tam tablo taraması
+-- yapılmamalı). Bu migration ile eksik kalan indeksler:
+--
+--   loans(user_id, created_at)            : GET /api/loans/my (en yeni önce)
+--   penalties(user_id, penalty_end_date)  : GET /api/loans/penalties ve
+--                                           users.blocked_until hesabı (MAX)
+--
+-- Daha önce eklenenler: loans(user_id, status, book_id) [0004],
+-- books(category_id|author_id, available_copies) [0005],
+-- loans(status, created_at) [0007].
+--
+-- idx_loans_user (user_id) artık (user_id, status, book_id) ve
+-- (user_id, created_at) indekslerinin ön eki olduğu için kaldırılır.
+--
+-- Kullanım:
+--   python migrate.py
+--   (veya: mysql -u root -p smart_library < migrations/0009_hot_query_indexes.sql)
+-- ============================================================================
+
+USE smart_library;
+
+CREATE INDEX idx_loans_user_created ON loans(user_id, created_at);
+CREATE INDEX idx_penalties_user_end ON penalties(user_id, penalty_end_date);
+
+DROP INDEX idx_loans_user ON loans;
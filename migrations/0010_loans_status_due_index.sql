@@ -0,0 +1,21 @@
+-- ============================================================================
+-- Migration 0010: Gecikmiş Ödünç Taraması İndeksi
+-- ============================================================================
+--
+-- Gecikmiş ödünç taraması (src/overdue.py, python sweep_overdue.py)
+-- status='borrowed' AND due_date < CURDATE() koşulunu parça parça okur.
+-- (status, due_date) indeksi ile her parça bir aralık araması olur; tarama
+-- sonrası gecikmiş ödünç sorguları da (status='late') indeksten okunur.
+--
+-- Mevcut gecikmiş ödünçler bu migration'da tek bir büyük UPDATE ile
+-- güncellenmez (loans tablosunda uzun kilit tutmamak için); migration'dan
+-- sonra "python sweep_overdue.py" bir kez çalıştırılmalıdır.
+--
+-- Kullanım:
+--   python migrate.py
+--   python sweep_overdue.py
+-- ============================================================================
+
+USE smart_library;
+
+CREATE INDEX idx_loans_status_due ON loans(status, due_date);
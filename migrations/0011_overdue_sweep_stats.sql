@@ -0,0 +1,31 @@
+-- ============================================================================
+-- Migration 0011: Gecikme Taraması Ölçümleri
+-- ============================================================================
+--
+-- Gecikmiş ödünç taramasının ölçümleri (GET /api/admin/overdue-sweep) süreç
+-- belleğinde tutuluyordu; gunicorn altında her worker kendi (boş) sayaçlarını
+-- gösteriyordu. Ölçümler artık bu tek satırlı tabloda tutulur: taramayı
+-- çalıştıran worker, admin isteği veya cron ile CLI aynı satırı günceller.
+--
+-- Kullanım:
+--   python migrate.py
+-- ============================================================================
+
+USE smart_library;
+
+CREATE TABLE overdue_sweep_stats (
+    id                      SMALLINT NOT NULL PRIMARY KEY,   -- Her zaman 1
+    runs                    INT      NOT NULL DEFAULT 0,     -- Tamamlanan tarama sayısı
+    errors                  INT      NOT NULL DEFAULT 0,     -- Hatayla biten tarama sayısı
+    marked_total            BIGINT   NOT NULL DEFAULT 0,     -- Toplam "late" yapılan ödünç
+    last_run_at             DATETIME NULL,                   -- Son taramanın başlangıcı
+    last_seconds            DOUBLE   NULL,                   -- Son taramanın süresi
+    last_marked             INT      NULL,                   -- Son taramada "late" yapılan ödünç
+    last_chunks             INT      NULL,                   -- Son taramadaki parça sayısı
+    last_max_chunk_seconds  DOUBLE   NULL,                   -- Son taramadaki en uzun parça
+    last_error              TEXT     NULL,                   -- Son hata mesajı
+    scheduler_pid           INT      NULL,                   -- Zamanlayıcıyı çalıştıran süreç
+    scheduler_heartbeat_at  DATETIME NULL                    -- Zamanlayıcının son tur zamanı
+);
+
+INSERT INTO overdue_sweep_stats (id) VALUES (1);
@@ -0,0 +1,24 @@
+-- ============================================================================
+-- Migration 0012: Aktif Ödünç Anti-Join İndeksine return_date
+-- ============================================================================
+--
+-- GET /api/books anti-join'i "late" ödünçlerden sadece iade edilmemiş
+-- olanları aktif sayar (return_date IS NULL). 0004'teki
+-- (user_id, status, book_id) indeksinde return_date olmadığı için her
+-- eşleşmede tablo satırı okunuyordu. return_date indekse eklenir; alt
+-- sorgu artık tablo satırına gitmeden sadece indeksten cevaplanır:
+--
+--   NOT EXISTS (SELECT 1 FROM loans
+--               WHERE loans.book_id = books.id
+--                 AND loans.user_id = ?
+--                 AND loans.status IN ('borrowed','late','requested','approved')
+--                 AND loans.return_date IS NULL)
+--
+-- Kullanım:
+--   python migrate.py
+-- ============================================================================
+
+USE smart_library;
+
+DROP INDEX idx_loans_user_status_book ON loans;
+CREATE INDEX idx_loans_user_status_book ON loans(user_id, status, book_id, return_date);
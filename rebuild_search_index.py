@@ -0,0 +1,42 @@
+"""
+Arama İndeksi Yeniden Oluşturma Scripti
+
+Bu script, book_search tablosunu (katalog FULLTEXT araması) tüm kitaplar için
+yeniden doldurur. Migration 0002 uygulandıktan sonra bir kez çalıştırılmalıdır.
+Sonrasında tablo, kitap/yazar/kategori yazma işlemlerinde otomatik güncellenir.
+
+Kullanım:
+    python rebuild_search_index.py
+"""
+import sys
+import time
+
+from app import create_app
+from src.db import db
+from src.search import refresh_book_search
+
+
+def rebuild_search_index():
+    app = create_app()
+
+    with app.app_context():
+        try:
+            print("=" * 50)
+            print("Arama Indeksi Yeniden Olusturuluyor...")
+            print("=" * 50)
+
+            started = time.perf_counter()
+            count = refresh_book_search()
+            db.session.commit()
+
+            print(f"[SUCCESS] {count} kitap indekslendi ({time.perf_counter() - started:.1f} sn)")
+        except Exception as e:
+            print(f"\n[ERROR] Hata: {e}")
+            import traceback
+            traceback.print_exc()
+            db.session.rollback()
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    rebuild_search_index()
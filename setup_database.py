@@ -85,6 +85,10 @@ def setup_database():
             print("   - books (kitaplar)")
             print("   - loans (ödünç işlemleri)")
             print("   - penalties (cezalar)")
+            print("   - book_search, book_stock_stripes, cache_versions, overdue_sweep_stats")
+            print("   - schema_migrations (uygulanan migration'lar)")
+            print()
+            print("🔄 Sonradan eklenen migration'lar için: python migrate.py")
             print()
             print("🎉 Kurulum tamamlandı! Artık Flask uygulamanızı çalıştırabilirsiniz.")
             return True
@@ -0,0 +1,382 @@
+"""
+Toplu Kitap İçe Aktarma Modülü
+CSV veya NDJSON kaynağından çok sayıda kitabı parça parça (chunk) içe aktarır.
+
+Her parça için:
+    1. Satırlar doğrulanır; hatalı satırlar rapora yazılır ve atlanır
+    2. Yazar ve kategori adları tek sorguyla çözülür, eksikler toplu eklenir
+    3. Kitaplar ISBN'e göre tek bir executemany upsert ile yazılır
+       (MySQL: INSERT ... ON DUPLICATE KEY UPDATE); parçalı stoklu mevcut
+       kitapların parçaları yeni kopya sayısına göre yeniden dağıtılır
+    4. book_search satırları yenilenir, katalog sürümü artırılır ve commit edilir
+
+Böylece satır başına ayrı SELECT/flush yapılmaz; yüz binlerce satırlık
+dosyalar dakikalar içinde yüklenir ve bellekte sadece bir parça tutulur.
+"""
+
+import csv
+import io
+import json
+from typing import IO, Dict, Iterable, Iterator, List, Tuple
+
+from sqlalchemy import case, insert, select, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.db import db
+from src.etag import CATALOG_SCOPE, bump_versions
+from src.inventory import collapse_stripes, set_stripes
+from src.models import Author, Book, Category
+from src.search import refresh_book_search
+from src.trigram_index import book_index
+
+
+# Varsayılan parça (commit) boyutu
+DEFAULT_CHUNK_SIZE = 1000
+
+# Raporda ayrıntısı döndürülen en fazla hata sayısı (toplam sayı her zaman döner)
+MAX_REPORTED_ERRORS = 1000
+
+# Bellek içi trigram indeksinin satır satır güncellendiği en fazla kitap sayısı;
+# daha büyük içe aktarmalarda indeks eskimiş işaretlenir ve arka planda yeniden kurulur
+INDEX_SYNC_LIMIT = 5000
+
+# Desteklenen giriş biçimleri
+FORMATS = ("csv", "ndjson")
+
+
+class ImportRowError(ValueError):
+    """Satır doğrulanamadığında fırlatılır (mesaj rapora yazılır)."""
+
+
+def read_rows(source: IO[bytes], fmt: str) -> Iterator[Tuple[int, object]]:
+    """
+    Kaynağı satır satır okur; dosyanın tamamı belleğe alınmaz.
+
+    Args:
+        source: İkili (binary) akış (örn: request.stream)
+        fmt: "csv" (başlık satırlı) veya "ndjson"
+
+    Yields:
+        Tuple[int, object]: (satır numarası, sözlük veya ImportRowError)
+    """
+    text = io.TextIOWrapper(source, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        for record in reader:
+            # Başlık 1. satırdır; çok satırlı alanlarda gerçek satır numarası kullanılır
+            yield reader.line_num, record
+        return
+
+    for line_no, line in enumerate(text, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_no, ImportRowError(f"Geçersiz JSON: {e}")
+            continue
+        if not isinstance(record, dict):
+            yield line_no, ImportRowError("Satır bir JSON nesnesi olmalıdır")
+            continue
+        yield line_no, record
+
+
+def _text(record: dict, key: str, max_length: int, required: bool = True) -> str | None:
+    value = record.get(key)
+    value = str(value).strip() if value is not None else ""
+    if not value:
+        if required:
+            raise ImportRowError(f"{key} zorunludur")
+        return None
+    if len(value) > max_length:
+        raise ImportRowError(f"{key} en fazla {max_length} karakter olabilir")
+    return value
+
+
+def _int(record: dict, key: str, default: int | None = None) -> int | None:
+    value = record.get(key)
+    if value is None or value == "":
+        return default
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        raise ImportRowError(f"{key} bir tam sayı olmalıdır") from None
+    if number < 0:
+        raise ImportRowError(f"{key} negatif olamaz")
+    return number
+
+
+def validate_row(record: dict) -> dict:
+    """
+    Ham satırı doğrular ve normalize eder.
+
+    Kabul edilen alanlar: title, isbn, author (ad) veya author_id,
+    category (ad) veya category_id, total_copies (varsayılan 1),
+    available_copies (varsayılan total_copies).
+
+    Args:
+        record: CSV/NDJSON satırı
+
+    Returns:
+        dict: Normalize edilmiş satır
+
+    Raises:
+        ImportRowError: Satır geçersizse
+    """
+    row = {
+        "title": _text(record, "title", 200),
+        "isbn": _text(record, "isbn", 20),
+        "author_id": _int(record, "author_id"),
+        "author": _text(record, "author", 120, required=False),
+        "category_id": _int(record, "category_id"),
+        "category": _text(record, "category", 80, required=False),
+        "total_copies": _int(record, "total_copies", 1),
+    }
+    row["available_copies"] = _int(record, "available_copies", row["total_copies"])
+    if row["author_id"] is None and row["author"] is None:
+        raise ImportRowError("author veya author_id zorunludur")
+    if row["category_id"] is None and row["category"] is None:
+        raise ImportRowError("category veya category_id zorunludur")
+    if row["available_copies"] > row["total_copies"]:
+        raise ImportRowError("available_copies total_copies'tan büyük olamaz")
+    return row
+
+
+def _shifted_available(new_total):
+    """
+    Güncellenen kitabın yeni müsait kopya sayısı: ödünçteki kopyalar korunur,
+    mevcut sayı toplamdaki değişim kadar kaydırılır (0'ın altına inmez).
+
+    Args:
+        new_total: Yeni toplam kopya sayısı (değer veya upsert'teki yeni satır sütunu)
+
+    Returns:
+        SQL ifadesi (eski available_copies / total_copies değerlerini kullanır)
+    """
+    shifted = Book.available_copies + new_total - Book.total_copies
+    return case((shifted < 0, 0), else_=shifted)
+
+
+class BookImporter:
+    """
+    Toplu kitap içe aktarma işlemi.
+
+    Yazar/kategori ad -> ID eşlemeleri işlem boyunca önbellekte tutulur; aynı
+    yazar için veritabanına sadece bir kez gidilir.
+    """
+
+    def __init__(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+        self.chunk_size = chunk_size
+        self._authors: Dict[str, int] = {}
+        self._categories: Dict[str, int] = {}
+        self._indexed = 0
+        self.report = {
+            "processed": 0,     # Okunan satır sayısı
+            "inserted": 0,      # Yeni eklenen kitap sayısı
+            "updated": 0,       # ISBN'i zaten kayıtlı olup güncellenen kitap sayısı
+            "duplicates": 0,    # Aynı parçada sonraki bir satırla ezilen satır sayısı
+            "failed": 0,        # Hatalı satır sayısı
+            "chunks": 0,        # Commit edilen parça sayısı
+            "errors": [],
+        }
+
+    # ---------- Rapor ----------
+
+    def _fail(self, line_no: int, isbn: str | None, message: str) -> None:
+        self.report["failed"] += 1
+        if len(self.report["errors"]) < MAX_REPORTED_ERRORS:
+            self.report["errors"].append({"row": line_no, "isbn": isbn, "message": message})
+
+    # ---------- Ad -> ID çözümleme ----------
+
+    def _resolve(self, model, cache: Dict[str, int], names: Iterable[str]) -> List[Tuple[int, str]]:
+        """
+        Adları ID'ye çevirir; veritabanında olmayanları toplu ekler.
+
+        Returns:
+            List[Tuple[int, str]]: Yeni oluşturulan (id, ad) çiftleri
+        """
+        missing = {name for name in names if name not in cache}
+        if not missing:
+            return []
+        # Aynı adlı birden fazla yazar varsa en eski kayıt kullanılır
+        for row_id, name in db.session.execute(
+            select(model.id, model.name).where(model.name.in_(missing)).order_by(model.id.desc())
+        ):
+            cache[name] = row_id
+        new_names = sorted(name for name in missing if name not in cache)
+        if not new_names:
+            return []
+        db.session.execute(insert(model), [{"name": name} for name in new_names])
+        created = db.session.execute(
+            select(model.id, model.name).where(model.name.in_(new_names)).order_by(model.id.desc())
+        ).all()
+        for row_id, name in created:
+            cache[name] = row_id
+        return [(row_id, name) for row_id, name in created]
+
+    # ---------- Upsert ----------
+
+    def _upsert_statement(self):
+        """ISBN çakışmasında kitabı güncelleyen, veritabanına uygun upsert ifadesi."""
+        dialect = db.session.get_bind().dialect.name
+        if dialect == "mysql":
+            stmt = mysql_insert(Book)
+            new = stmt.inserted
+        elif dialect == "sqlite":
+            stmt = sqlite_insert(Book)
+            new = stmt.excluded
+        else:
+            return None
+        # MySQL atamaları soldan sağa uyguladığı için available_copies,
+        # total_copies'tan önce atanır (eski değeri görür)
+        values = [
+            ("title", new.title),
+            ("author_id", new.author_id),
+            ("category_id", new.category_id),
+            ("available_copies", _shifted_available(new.total_copies)),
+            ("total_copies", new.total_copies),
+        ]
+        if dialect == "mysql":
+            return stmt.on_duplicate_key_update(values)
+        return stmt.on_conflict_do_update(index_elements=[Book.isbn], set_=dict(values))
+
+    def _write_books(self, rows: List[dict], existing: Dict[str, int]) -> None:
+        stmt = self._upsert_statement()
+        if stmt is not None:
+            db.session.execute(stmt, rows)
+            return
+        # Upsert desteklemeyen veritabanları: mevcutlar güncellenir, yeniler eklenir
+        new_rows = [row for row in rows if row["isbn"] not in existing]
+        if new_rows:
+            db.session.execute(insert(Book), new_rows)
+        for row in rows:
+            if row["isbn"] in existing:
+                db.session.execute(
+                    update(Book).where(Book.id == existing[row["isbn"]]).values(
+                        title=row["title"],
+                        author_id=row["author_id"],
+                        category_id=row["category_id"],
+                        available_copies=_shifted_available(row["total_copies"]),
+                        total_copies=row["total_copies"],
+                    )
+                )
+
+    # ---------- Parça işleme ----------
+
+    def _drop_unknown_ids(self, by_isbn: Dict[str, Tuple[int, dict]]) -> None:
+        """author_id/category_id ile verilen ama veritabanında olmayan satırları rapora yazar."""
+        for key, model in (("author_id", Author), ("category_id", Category)):
+            ids = {row[key] for _, row in by_isbn.values() if row[key] is not None}
+            if not ids:
+                continue
+            known = set(db.session.execute(select(model.id).where(model.id.in_(ids))).scalars())
+            for isbn, (line_no, row) in list(by_isbn.items()):
+                if row[key] is not None and row[key] not in known:
+                    self._fail(line_no, isbn, f"{key} bulunamadı: {row[key]}")
+                    del by_isbn[isbn]
+
+    def _flush_chunk(self, chunk: List[Tuple[int, dict]]) -> None:
+        if not chunk:
+            return
+        self.report["chunks"] += 1
+
+        # Dosyada aynı ISBN birden fazla kez geçerse son satır geçerlidir
+        by_isbn = {row["isbn"]: (line_no, row) for line_no, row in chunk}
+        self.report["duplicates"] += len(chunk) - len(by_isbn)
+        try:
+            self._drop_unknown_ids(by_isbn)
+            if not by_isbn:
+                return
+            new_authors = self._resolve(
+                Author, self._authors, {row["author"] for _, row in by_isbn.values() if row["author_id"] is None}
+            )
+            new_categories = self._resolve(
+                Category, self._categories, {row["category"] for _, row in by_isbn.values() if row["category_id"] is None}
+            )
+
+            rows = [
+                {
+                    "title": row["title"],
+                    "isbn": isbn,
+                    "author_id": row["author_id"] if row["author_id"] is not None else self._authors[row["author"]],
+                    "category_id": (
+                        row["category_id"] if row["category_id"] is not None else self._categories[row["category"]]
+                    ),
+                    "total_copies": row["total_copies"],
+                    "available_copies": row["available_copies"],
+                }
+                for isbn, (_, row) in by_isbn.items()
+            ]
+
+            isbns = list(by_isbn)
+            existing = dict(db.session.execute(select(Book.isbn, Book.id).where(Book.isbn.in_(isbns))).all())
+            # Parçalı stoklu kitaplarda kopya sayıları parçalarda tutulur: önce parçalar
+            # kilitlenip books satırında toplanır, yazmadan sonra aynı sayıda parçaya bölünür
+            striped = collapse_stripes(existing.values()) if existing else {}
+            self._write_books(rows, existing)
+            for book_id, stripes in striped.items():
+                set_stripes(book_id, stripes)
+
+            book_ids = dict(db.session.execute(select(Book.isbn, Book.id).where(Book.isbn.in_(isbns))).all())
+            refresh_book_search(book_ids.values())
+            bump_versions(CATALOG_SCOPE)
+            db.session.commit()
+        except SQLAlchemyError as e:
+            # Parçanın tamamı geri alınır; satırlar hata olarak raporlanır
+            db.session.rollback()
+            # Geri alınan yeni yazar/kategori ID'leri önbellekten çıkarılır
+            self._authors = {}
+            self._categories = {}
+            message = f"Veritabanı hatası: {getattr(e, 'orig', e)}"
+            for isbn, (line_no, _) in by_isbn.items():
+                self._fail(line_no, isbn, message)
+            return
+
+        self.report["updated"] += len(existing)
+        self.report["inserted"] += len(by_isbn) - len(existing)
+
+        # Worker'ın bellek içi trigram indeksini güncelle
+        self._indexed += len(rows)
+        if self._indexed > INDEX_SYNC_LIMIT:
+            book_index.mark_stale()
+            return
+        for author_id, name in new_authors:
+            book_index.put_author(author_id, name)
+        for category_id, name in new_categories:
+            book_index.put_category(category_id, name)
+        for row in rows:
+            book_index.put_book(book_ids[row["isbn"]], row["title"], row["author_id"], row["category_id"])
+
+    def run(self, records: Iterable[Tuple[int, object]]) -> dict:
+        """
+        Satırları doğrulayıp parça parça içe aktarır.
+
+        Args:
+            records: read_rows çıktısı
+
+        Returns:
+            dict: {"processed", "inserted", "updated", "duplicates", "failed",
+                   "chunks", "errors": [{"row", "isbn", "message"}, ...],
+                   "errors_truncated"}
+        """
+        chunk: List[Tuple[int, dict]] = []
+        for line_no, record in records:
+            self.report["processed"] += 1
+            if isinstance(record, ImportRowError):
+                self._fail(line_no, None, str(record))
+                continue
+            try:
+                chunk.append((line_no, validate_row(record)))
+            except ImportRowError as e:
+                self._fail(line_no, record.get("isbn"), str(e))
+                continue
+            if len(chunk) >= self.chunk_size:
+                self._flush_chunk(chunk)
+                chunk = []
+        self._flush_chunk(chunk)
+        self.report["errors_truncated"] = self.report["failed"] > len(self.report["errors"])
+        return self.report
@@ -1,27 +1,216 @@
 """
 Veritabanı Modülü
-SQLAlchemy veritabanı nesnesini ve başlatma fonksiyonunu içerir.
+SQLAlchemy veritabanı nesnesini, başlatma fonksiyonunu, okuma replikası
+yönlendiren session'ı ve bağlantı havuzu ölçümlerini içerir.
 """
 
-from flask import Flask
+import os
+import threading
+import time
+
+from flask import Flask, g, has_app_context
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.sql import Select
+
+
+class RoutingSession(Session):
+    """
+    İstek bir okuma replikasına yönlendirildiyse (g.db_replica, bkz. src.replicas)
+    SELECT ifadelerini o replikanın engine'ine gönderen session. Yazmalar,
+    SELECT ... FOR UPDATE ve flush her zaman birincil veritabanına gider.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and isinstance(clause, Select) and clause._for_update_arg is None:
+            # Uygulama bağlamı dışında / replika seçilmemiş isteklerde birincil kullanılır
+            replica = g.get("db_replica") if has_app_context() else None
+            if replica is not None:
+                return self._db.engines[replica]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
 
 
 # SQLAlchemy veritabanı nesnesi
 # Tüm modeller bu nesneyi kullanarak tanımlanır
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 
 
-def init_db(app: Flask) -> None:
+class PoolTelemetry:
+    """Bir bağlantı havuzunun worker içi sayaçları."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self.lock:
+            self.checkouts = 0              # Havuzdan alınan bağlantı
+            self.checkins = 0               # Havuza geri verilen bağlantı
+            self.connects = 0               # Açılan yeni DBAPI bağlantısı
+            self.invalidations = 0          # Geçersiz kılınan bağlantı (kopma, pre-ping hatası)
+            self.soft_invalidations = 0
+            self.timeouts = 0               # pool_timeout içinde bağlantı alınamadı
+            self.wait_seconds_total = 0.0   # Bağlantı bekleme süresi toplamı
+            self.wait_seconds_max = 0.0
+            self.peak_checked_out = 0       # Aynı anda kullanılan en fazla bağlantı
+            self.peak_overflow = 0          # pool_size üstünde açılan en fazla bağlantı
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "soft_invalidations": self.soft_invalidations,
+                "timeouts": self.timeouts,
+                "wait_ms_avg": round(self.wait_seconds_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "wait_ms_max": round(self.wait_seconds_max * 1000, 3),
+                "peak_checked_out": self.peak_checked_out,
+                "peak_overflow": self.peak_overflow,
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
     """
-    SQLAlchemy veritabanı nesnesini Flask uygulamasına bağlar.
-    
+    Bağlantı alma bekleme süresini, taşma (overflow) kullanımını ve zaman
+    aşımlarını ölçen QueuePool. Ölçümler dispose() sonrası yeniden oluşturulan
+    havuza aktarılır.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.telemetry = PoolTelemetry()
+
+    def recreate(self) -> "InstrumentedQueuePool":
+        pool = super().recreate()
+        pool.telemetry = self.telemetry
+        return pool
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except PoolTimeoutError:
+            with self.telemetry.lock:
+                self.telemetry.timeouts += 1
+            raise
+        waited = time.perf_counter() - started
+        checked_out, overflow = self.checkedout(), self.overflow()
+        telemetry = self.telemetry
+        with telemetry.lock:
+            telemetry.checkouts += 1
+            telemetry.wait_seconds_total += waited
+            telemetry.wait_seconds_max = max(telemetry.wait_seconds_max, waited)
+            telemetry.peak_checked_out = max(telemetry.peak_checked_out, checked_out)
+            telemetry.peak_overflow = max(telemetry.peak_overflow, overflow)
+        return record
+
+    def _do_return_conn(self, record) -> None:
+        super()._do_return_conn(record)
+        with self.telemetry.lock:
+            self.telemetry.checkins += 1
+
+    def _create_connection(self):
+        with self.telemetry.lock:
+            self.telemetry.connects += 1
+        return super()._create_connection()
+
+
+def engine_options(database_uri: str) -> dict:
+    """
+    Bağlantı havuzu ayarlarını ortam değişkenlerinden oluşturur.
+
+    Ortam değişkenleri:
+        DB_POOL_SIZE      : Kalıcı bağlantı sayısı (worker başına, varsayılan: 5)
+        DB_MAX_OVERFLOW   : Yoğunlukta pool_size üstünde açılabilecek bağlantı (varsayılan: 10)
+        DB_POOL_TIMEOUT   : Boş bağlantı bekleme süresi, saniye (varsayılan: 30)
+        DB_POOL_RECYCLE   : Bu süreden eski bağlantılar yenilenir, saniye (varsayılan: 280)
+        DB_POOL_PRE_PING  : "pessimistic" (varsayılan): her alışta SELECT 1 ile canlılık kontrolü;
+                            "optimistic": kontrol yok, kopan bağlantı ilk hatada havuzdan atılır
+
+    Worker başına en fazla pool_size + max_overflow bağlantı açılır; toplam
+    (worker sayısı x bu değer) MySQL max_connections değerinin altında kalmalıdır.
+
     Args:
-        app: Flask uygulama nesnesi
+        database_uri: SQLAlchemy veritabanı URI'si
+
+    Returns:
+        dict: SQLALCHEMY_ENGINE_OPTIONS
     """
-    db.init_app(app)
+    options = {
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "pessimistic") != "optimistic",
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "280")),
+    }
+    # Bellek içi SQLite tek bağlantılı havuz kullanır; boyut ayarları uygulanmaz
+    if database_uri.startswith("sqlite") and (database_uri in ("sqlite://", "sqlite:///") or ":memory:" in database_uri):
+        return options
+    options.update(
+        poolclass=InstrumentedQueuePool,
+        pool_size=int(os.getenv("DB_POOL_SIZE", "5")),
+        max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        pool_timeout=int(os.getenv("DB_POOL_TIMEOUT", "30")),
+    )
+    return options
+
 
+def _count_invalidation(engine, attribute: str):
+    def listener(dbapi_connection, connection_record, exception):
+        telemetry = getattr(engine.pool, "telemetry", None)
+        if telemetry is not None:
+            with telemetry.lock:
+                setattr(telemetry, attribute, getattr(telemetry, attribute) + 1)
+    return listener
 
 
+def pool_stats() -> dict:
+    """
+    Bu worker'daki bağlantı havuzlarının anlık durumunu ve sayaçlarını döndürür.
+
+    Returns:
+        dict: {bind adı: {size, max_overflow, checked_out, overflow, ... sayaçlar}}
+    """
+    stats = {}
+    for bind, engine in db.engines.items():
+        pool = engine.pool
+        telemetry = getattr(pool, "telemetry", None)
+        if telemetry is None:
+            stats[bind or "default"] = {"pool": type(pool).__name__}
+            continue
+        stats[bind or "default"] = {
+            "pool": type(pool).__name__,
+            "size": pool.size(),
+            "max_overflow": pool._max_overflow,
+            "timeout": pool.timeout(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            **telemetry.snapshot(),
+        }
+    return stats
 
 
+def reset_pool_stats() -> None:
+    """Havuz sayaçlarını sıfırlar (örn: fork edilen worker'da master'ın sayaçları)."""
+    for engine in db.engines.values():
+        telemetry = getattr(engine.pool, "telemetry", None)
+        if telemetry is not None:
+            telemetry.reset()
+
+
+def init_db(app: Flask) -> None:
+    """
+    SQLAlchemy veritabanı nesnesini Flask uygulamasına bağlar.
+
+    Args:
+        app: Flask uygulama nesnesi
+    """
+    db.init_app(app)
+    with app.app_context():
+        for engine in db.engines.values():
+            # Havuz olayları engine'e bir kez bağlanır; dispose() sonrası yeni havuza da aktarılır
+            event.listen(engine, "invalidate", _count_invalidation(engine, "invalidations"))
+            event.listen(engine, "soft_invalidate", _count_invalidation(engine, "soft_invalidations"))
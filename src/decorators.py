@@ -5,12 +5,11 @@ API endpoint'lerini korumak için JWT tabanlı authentication decorator'ları i
 
 from functools import wraps
 from typing import Callable, Any
-import os
 
-from flask import request, jsonify, g, current_app
-from jwt import InvalidTokenError, ExpiredSignatureError, decode as jwt_decode
+from flask import request, jsonify, g
+from jwt import InvalidTokenError, ExpiredSignatureError
 
-from src.security import decode_access_token
+from src.security import verify_access_token
 
 
 def jwt_required(role: str | None = None) -> Callable:
@@ -50,21 +49,9 @@ def jwt_required(role: str | None = None) -> Callable:
             if len(parts) != 2 or parts[0].lower() != "bearer":
                 return jsonify({"message": "Missing or invalid Authorization header"}), 401
 
-            token = parts[1]
-            
-            # Secret key'i al (current_app context'i varsa oradan, yoksa env'den)
-            try:
-                secret_key = current_app.config.get("SECRET_KEY")
-            except RuntimeError:
-                secret_key = os.getenv("SECRET_KEY", "dev-secret-change-me")
-            
-            if not secret_key:
-                secret_key = os.getenv("SECRET_KEY", "dev-secret-change-me")
-            
             try:
-                # Token'ı decode et
-                # Direkt jwt.decode kullan (daha güvenilir)
-                payload = jwt_decode(token, secret_key, algorithms=["HS256"])
+                # Token'ı doğrula (daha önce doğrulanmış token'lar önbellekten döner)
+                user_id, token_role = verify_access_token(parts[1])
             except ExpiredSignatureError:
                 # Token süresi dolmuş
                 return jsonify({"message": "Token expired"}), 401
@@ -76,14 +63,12 @@ def jwt_required(role: str | None = None) -> Callable:
                 return jsonify({"message": f"Token decode error: {str(e)}"}), 401
 
             # Rol kontrolü (eğer belirtilmişse)
-            if role is not None and payload.get("role") != role:
+            if role is not None and token_role != role:
                 return jsonify({"message": "Insufficient permissions"}), 403
 
             # Kullanıcı bilgilerini Flask g nesnesine ekle
-            # sub string olabilir, user_id integer olarak da saklanabilir
-            user_id = payload.get("user_id") or int(payload.get("sub", 0))
             g.current_user_id = user_id              # Mevcut kullanıcının ID'si
-            g.current_user_role = payload.get("role")  # Mevcut kullanıcının rolü
+            g.current_user_role = token_role         # Mevcut kullanıcının rolü
             
             # Orijinal fonksiyonu çalıştır
             return fn(*args, **kwargs)
@@ -93,4 +78,21 @@ def jwt_required(role: str | None = None) -> Callable:
     return decorator
 
 
+def optional_jwt_user_id() -> int | None:
+    """
+    Authorization header'ında geçerli bir token varsa kullanıcı ID'sini döndürür.
+
+    Token zorunlu olmayan endpoint'ler içindir (örn: kitap listesi). Token
+    jwt_required ile aynı şekilde (doğrulanmış token önbelleği üzerinden)
+    doğrulanır; header yoksa veya token geçersiz/süresi dolmuşsa None döner.
 
+    Returns:
+        int | None: Kullanıcı ID'si veya None
+    """
+    parts = request.headers.get("Authorization", "").split()
+    if len(parts) != 2 or parts[0].lower() != "bearer":
+        return None
+    try:
+        return verify_access_token(parts[1])[0]
+    except (InvalidTokenError, ValueError, TypeError):
+        return None
@@ -0,0 +1,95 @@
+"""
+Ödünç Uygunluk Modülü
+Kullanıcının ceza nedeniyle kitap alıp alamayacağını kontrol eden yardımcıları içerir.
+
+Kullanıcının etkin cezası users.blocked_until sütununda (tüm cezalarının en
+geç bitiş tarihi) tutulur. Böylece her ödünç denemesinde ceza geçmişi
+taranmaz; kontrol tek bir birincil anahtar okumasıdır. Değer ceza
+oluşturulduğunda (return_book) ve kısaltıldığında (remove_penalty)
+refresh_blocked_until ile yeniden hesaplanır.
+
+Okunan değerler worker başına PENALTY_CACHE_SECONDS süreyle önbellekte
+tutulur (0: önbellek kapalı). Aynı worker'daki yazmalar önbelleği hemen
+temizler; diğer worker'lar en geç bu süre sonunda güncel değeri görür.
+"""
+
+import threading
+import time
+from datetime import date
+from typing import Dict, Tuple
+
+from flask import current_app
+from sqlalchemy import func, select, update
+
+from src.db import db
+from src.models import Penalty, User
+
+
+# Kullanıcı ID -> (blocked_until, önbelleğe alınma zamanı)
+_cache: Dict[int, Tuple[date | None, float]] = {}
+_cache_lock = threading.Lock()
+
+
+def invalidate(user_id: int) -> None:
+    """Kullanıcının önbellekteki blocked_until değerini siler."""
+    with _cache_lock:
+        _cache.pop(user_id, None)
+
+
+def refresh_blocked_until(user_id: int) -> None:
+    """
+    users.blocked_until değerini kullanıcının cezalarından yeniden hesaplar
+    (commit etmez).
+
+    Ceza veritabanı trigger'ı ile oluşturulmuş olsa da doğru sonuç verir.
+
+    Args:
+        user_id: Kullanıcı ID
+    """
+    latest_end = (
+        select(func.max(Penalty.penalty_end_date)).where(Penalty.user_id == user_id).scalar_subquery()
+    )
+    db.session.execute(
+        update(User).where(User.id == user_id).values(blocked_until=latest_end),
+        execution_options={"synchronize_session": False},
+    )
+    invalidate(user_id)
+
+
+def blocked_until(user_id: int) -> date | None:
+    """
+    Kullanıcının ceza bitiş tarihini döndürür (birincil anahtar okuması, önbellekli).
+
+    Args:
+        user_id: Kullanıcı ID
+
+    Returns:
+        date | None: Ceza bitiş tarihi; hiç cezası yoksa None
+    """
+    ttl = current_app.config.get("PENALTY_CACHE_SECONDS", 0)
+    now = time.monotonic()
+    if ttl:
+        with _cache_lock:
+            cached = _cache.get(user_id)
+        if cached is not None and now - cached[1] < ttl:
+            return cached[0]
+
+    value = db.session.execute(select(User.blocked_until).where(User.id == user_id)).scalar()
+    if ttl:
+        with _cache_lock:
+            _cache[user_id] = (value, now)
+    return value
+
+
+def active_block(user_id: int) -> date | None:
+    """
+    Kullanıcının cezası hâlâ sürüyorsa bitiş tarihini döndürür.
+
+    Args:
+        user_id: Kullanıcı ID
+
+    Returns:
+        date | None: Ceza bugünden sonra bitiyorsa bitiş tarihi, yoksa None
+    """
+    until = blocked_until(user_id)
+    return until if until is not None and until > date.today() else None
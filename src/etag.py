@@ -0,0 +1,154 @@
+"""
+ETag Modülü
+Liste endpoint'leri için sürüm sayacı tabanlı koşullu yanıt (ETag /
+If-None-Match) yardımcılarını içerir.
+
+İşleyiş:
+    - Yazma işlemleri, commit etmeden önce ilgili kapsamın sayacını artırır
+      (bump_versions). Sayaç aynı transaction içinde güncellendiği için veri
+      ile sürüm hiçbir zaman birbirinden kopmaz.
+    - Listeleme endpoint'i önce tek bir PK sorgusuyla sürümleri okur ve ETag'i
+      hesaplar. İstemcinin If-None-Match başlığı eşleşirse liste sorguları hiç
+      çalıştırılmadan 304 Not Modified döner.
+
+Örnek:
+    etag = compute_etag([CATALOG_SCOPE])
+    if etag_matches(etag):
+        return not_modified(etag)
+    ...
+    return with_etag(jsonify(result), etag)
+"""
+
+import hashlib
+from datetime import date
+from typing import Iterable
+
+from flask import Response, request
+from sqlalchemy import update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from src.db import db
+from src.models import CacheVersion
+
+
+# Kitap, yazar ve kategori listelerinin kapsamı
+CATALOG_SCOPE = "catalog"
+
+
+def user_scope(user_id: int) -> str:
+    """
+    Kullanıcıya özel kapsam adını döndürür (ödünçler, cezalar).
+
+    Args:
+        user_id: Kullanıcı ID
+
+    Returns:
+        str: Kapsam adı (örn: "user:42")
+    """
+    return f"user:{user_id}"
+
+
+def bump_versions(*scopes: str) -> None:
+    """
+    Verilen kapsamların sürüm sayaçlarını artırır (commit etmez).
+
+    Yazma işlemiyle aynı transaction içinde, commit'ten önce çağrılmalıdır.
+
+    Args:
+        scopes: Artırılacak kapsamlar (örn: CATALOG_SCOPE, user_scope(5))
+    """
+    # Sabit sırada kilitlenir (eşzamanlı yazmalar arasında deadlock olmasın)
+    scopes = sorted(set(scopes))
+    if not scopes:
+        return
+    dialect = db.session.get_bind().dialect.name
+    rows = [{"scope": scope, "version": 1} for scope in scopes]
+    # MySQL / SQLite: Tüm kapsamlar tek bir çok satırlı upsert ile artırılır
+    if dialect == "mysql":
+        stmt = mysql_insert(CacheVersion).values(rows)
+        db.session.execute(stmt.on_duplicate_key_update(version=CacheVersion.version + 1))
+        return
+    if dialect == "sqlite":
+        stmt = sqlite_insert(CacheVersion).values(rows)
+        db.session.execute(stmt.on_conflict_do_update(
+            index_elements=[CacheVersion.scope], set_={"version": CacheVersion.version + 1}
+        ))
+        return
+    for scope in scopes:
+        result = db.session.execute(
+            update(CacheVersion)
+            .where(CacheVersion.scope == scope)
+            .values(version=CacheVersion.version + 1)
+        )
+        if not result.rowcount:
+            db.session.add(CacheVersion(scope=scope, version=1))
+
+
+def compute_etag(scopes: Iterable[str], *extra: object) -> str:
+    """
+    Kapsam sürümlerinden ve isteğin parametrelerinden güçlü bir ETag üretir.
+
+    Sürümler tek bir sorguyla okunur. İstek yolu + query string ve bugünün
+    tarihi de ETag'e dahil edilir (ceza kalan gün sayısı gibi tarihe bağlı
+    alanlar gün değişince yenilenir).
+
+    Args:
+        scopes: Yanıtın bağlı olduğu kapsamlar
+        extra: ETag'e katılacak ek değerler (örn: kullanıcı ID)
+
+    Returns:
+        str: Tırnaksız ETag değeri
+    """
+    scopes = sorted(set(scopes))
+    versions = dict(
+        db.session.query(CacheVersion.scope, CacheVersion.version).filter(CacheVersion.scope.in_(scopes))
+    )
+    parts = [f"{scope}={versions.get(scope, 0)}" for scope in scopes]
+    parts += [request.full_path, date.today().isoformat(), *map(str, extra)]
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()[:20]
+
+
+def etag_matches(etag: str) -> bool:
+    """
+    İstemcinin If-None-Match başlığının bu ETag ile eşleşip eşleşmediğini döndürür.
+
+    Args:
+        etag: compute_etag ile üretilen değer
+
+    Returns:
+        bool: Eşleşiyorsa True (304 dönülebilir)
+    """
+    return request.if_none_match.contains(etag)
+
+
+def with_etag(response: Response, etag: str) -> Response:
+    """
+    Yanıta ETag ve yeniden doğrulama zorunlu Cache-Control başlıklarını ekler.
+
+    "private, no-cache": Tarayıcı yanıtı saklar ama her kullanımda sunucuya
+    If-None-Match ile sorar; değişiklik yoksa 304 ile saklanan yanıtı kullanır.
+
+    Args:
+        response: Flask yanıtı
+        etag: compute_etag ile üretilen değer
+
+    Returns:
+        Response: Başlıkları eklenmiş yanıt
+    """
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
+def not_modified(etag: str) -> Response:
+    """
+    Gövdesiz 304 Not Modified yanıtı döndürür.
+
+    Args:
+        etag: compute_etag ile üretilen değer
+
+    Returns:
+        Response: 304 yanıtı
+    """
+    return with_etag(Response(status=304), etag)
@@ -0,0 +1,328 @@
+"""
+Kitap Stok Modülü
+Kitapların müsait kopya sayısını yarış durumu (race condition) olmadan
+değiştiren atomik sayaç yardımcılarını içerir.
+
+Müsait kopya kontrolü ve azaltma tek bir koşullu UPDATE ile yapılır:
+
+    UPDATE books SET available_copies = available_copies - 1
+    WHERE id = :id AND available_copies > 0
+
+Etkilenen satır sayısı 1 ise kopya alınmıştır, 0 ise kopya kalmamıştır. Önce
+okuyup Python'da kontrol edip sonra yazmak (read-modify-write) iki eşzamanlı
+isteğin son kopyayı birlikte almasına yol açar; koşullu UPDATE bunu veritabanı
+seviyesinde engeller.
+
+Parçalı (striped) sayaç:
+    Dönem başında çok talep gören kitaplarda tüm yazmalar tek bir satırın
+    kilidinde sıraya girer. Bu kitaplar için stok, book_stock_stripes
+    tablosunda N satıra bölünebilir; her istek rastgele bir parçadan başlar ve
+    yazmalar N satıra dağılır. books.available_copies bu kitaplar için
+    parçaların toplamının anlık görüntüsüdür.
+
+    Anlık görüntü ödünç / iade transaction'ı içinde güncellenmez (aksi halde
+    parçalamayla kaçınılan books satırı kilidi her ödünçte yeniden alınır ve
+    parça kilitleriyle deadlock oluşabilir). Değişen kitaplar işaretlenir; worker
+    başına bir arka plan thread'i STRIPE_SYNC_SECONDS aralıkla bunları ayrı ve
+    kısa bir transaction'da sync_all_striped ile günceller. Anlık görüntü
+    değiştiyse aynı transaction'da katalog sürümü de artırılır; aksi halde
+    ödünç ile senkronizasyon arasında alınan ETag eski sayıyla 304 döndürmeye
+    devam ederdi.
+"""
+
+import os
+import random
+import threading
+import time
+from typing import Dict, Iterable, Set
+
+from flask import Flask, current_app
+from sqlalchemy import delete, event, func, insert, select, update
+
+from src.db import RoutingSession, db
+from src.etag import CATALOG_SCOPE, bump_versions
+from src.models import Book, BookStockStripe
+
+
+# Bir kitap için izin verilen en fazla parça sayısı
+MAX_STRIPES = 64
+
+# Parçalı kitaplarda books.available_copies anlık görüntüsünün güncellenme aralığı (saniye)
+STRIPE_SYNC_SECONDS = 1.0
+
+# Bu worker'da stoku değişen (commit edilmiş), anlık görüntüsü güncellenecek parçalı kitaplar
+_pending: Set[int] = set()
+# Henüz commit edilmemiş değişiklikler session.info'da bu anahtarla tutulur
+_SESSION_KEY = "stripes_changed"
+_sync_lock = threading.Lock()
+_syncer = None
+_syncer_pid = None
+
+
+def _mark_changed(book_id: int) -> None:
+    """Parçalı kitabı, bu transaction commit edilince anlık görüntüsü güncellenmek üzere işaretler."""
+    db.session.info.setdefault(_SESSION_KEY, set()).add(book_id)
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _queue_changed(session) -> None:
+    global _syncer, _syncer_pid
+    book_ids = session.info.pop(_SESSION_KEY, None)
+    if not book_ids:
+        return
+    with _sync_lock:
+        _pending.update(book_ids)
+        # Thread'ler fork ile kopyalanmaz: her worker kendi thread'ini ilk kullanımda başlatır
+        if _syncer is None or _syncer_pid != os.getpid() or not _syncer.is_alive():
+            _syncer = threading.Thread(
+                target=_sync_loop, args=(current_app._get_current_object(),), name="stripe-sync", daemon=True
+            )
+            _syncer_pid = os.getpid()
+            _syncer.start()
+
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _discard_changed(session) -> None:
+    session.info.pop(_SESSION_KEY, None)
+
+
+def _sync_loop(app: Flask) -> None:
+    while True:
+        time.sleep(STRIPE_SYNC_SECONDS)
+        try:
+            sync_pending(app)
+        except Exception as e:
+            print(f"⚠️ Parçalı stok anlık görüntüsü güncellenemedi: {e}")
+
+
+def sync_pending(app: Flask) -> int:
+    """
+    Bu worker'da stoku değişmiş parçalı kitapların anlık görüntüsünü kendi
+    transaction'ında günceller (commit eder). Anlık görüntü değiştiyse katalog
+    sürümü de aynı transaction'da artırılır.
+
+    Args:
+        app: Flask uygulama nesnesi
+
+    Returns:
+        int: Anlık görüntüsü değişen kitap sayısı
+
+    Raises:
+        Exception: Veritabanı hatası (kitaplar bir sonraki turda tekrar denenir)
+    """
+    with _sync_lock:
+        book_ids = sorted(_pending)
+        _pending.clear()
+    if not book_ids:
+        return 0
+    try:
+        with app.app_context():
+            changed = sync_all_striped(book_ids)
+            if changed:
+                bump_versions(CATALOG_SCOPE)
+            db.session.commit()
+    except Exception:
+        with _sync_lock:
+            _pending.update(book_ids)
+        raise
+    return changed
+
+
+def _stripe_total(book_id: int):
+    return (
+        select(func.coalesce(func.sum(BookStockStripe.available), 0))
+        .where(BookStockStripe.book_id == book_id)
+        .scalar_subquery()
+    )
+
+
+def take_copy(book_id: int, stripes: int = 0) -> bool:
+    """
+    Kitaptan bir kopyayı atomik olarak düşer (commit etmez).
+
+    Args:
+        book_id: Kitap ID
+        stripes: Kitabın parça sayısı (books.stock_stripes; 0 ise parçasız)
+
+    Returns:
+        bool: Kopya alındıysa True, müsait kopya yoksa False
+
+    Not:
+        Parçalı kitapta sadece parça satırları yazılır; books satırına
+        dokunulmaz (anlık görüntü commit sonrası ayrı transaction'da güncellenir).
+    """
+    if not stripes:
+        result = db.session.execute(
+            update(Book)
+            .where(Book.id == book_id, Book.available_copies > 0)
+            .values(available_copies=Book.available_copies - 1),
+            execution_options={"synchronize_session": False},
+        )
+        return result.rowcount == 1
+
+    # Rastgele bir parçadan başla; boşsa sıradakine geç
+    start = random.randrange(stripes)
+    for offset in range(stripes):
+        result = db.session.execute(
+            update(BookStockStripe)
+            .where(
+                BookStockStripe.book_id == book_id,
+                BookStockStripe.stripe == (start + offset) % stripes,
+                BookStockStripe.available > 0,
+            )
+            .values(available=BookStockStripe.available - 1)
+        )
+        if result.rowcount == 1:
+            _mark_changed(book_id)
+            return True
+    # Tüm parçalar boş: anlık görüntü "müsait" gösteriyorsa bir sonraki turda düzelir
+    _mark_changed(book_id)
+    return False
+
+
+def return_copy(book_id: int, stripes: int = 0) -> None:
+    """
+    Kitaba bir kopya iade eder (commit etmez).
+
+    Args:
+        book_id: Kitap ID
+        stripes: Kitabın parça sayısı (books.stock_stripes; 0 ise parçasız)
+    """
+    if not stripes:
+        db.session.execute(
+            update(Book)
+            .where(Book.id == book_id)
+            .values(available_copies=Book.available_copies + 1),
+            execution_options={"synchronize_session": False},
+        )
+        return
+
+    db.session.execute(
+        update(BookStockStripe)
+        .where(BookStockStripe.book_id == book_id, BookStockStripe.stripe == random.randrange(stripes))
+        .values(available=BookStockStripe.available + 1)
+    )
+    _mark_changed(book_id)
+
+
+def set_stripes(book_id: int, stripes: int) -> int:
+    """
+    Kitabın stokunu verilen sayıda parçaya böler veya parçalamayı kapatır
+    (commit etmez).
+
+    Kitap satırı kilitlenir (SELECT ... FOR UPDATE); mevcut stok önce tek
+    sayıda toplanır, sonra parçalara eşit dağıtılır. Kitap parçasız
+    işaretliyse (stock_stripes = 0) books.available_copies esas alınır.
+
+    Args:
+        book_id: Kitap ID
+        stripes: Parça sayısı (0: parçalama kapalı, en fazla MAX_STRIPES)
+
+    Returns:
+        int: Kitabın güncel müsait kopya sayısı
+
+    Raises:
+        ValueError: Parça sayısı geçersizse veya kitap yoksa
+    """
+    if not 0 <= stripes <= MAX_STRIPES:
+        raise ValueError(f"stripes 0 ile {MAX_STRIPES} arasında olmalıdır")
+    row = db.session.execute(
+        select(Book.available_copies, Book.stock_stripes).where(Book.id == book_id).with_for_update()
+    ).first()
+    if row is None:
+        raise ValueError("Kitap bulunamadı")
+
+    available = row.available_copies
+    if row.stock_stripes:
+        available = db.session.execute(select(_stripe_total(book_id))).scalar_one()
+    db.session.execute(delete(BookStockStripe).where(BookStockStripe.book_id == book_id))
+
+    if stripes:
+        share, extra = divmod(available, stripes)
+        db.session.execute(
+            insert(BookStockStripe),
+            [
+                {"book_id": book_id, "stripe": stripe, "available": share + (1 if stripe < extra else 0)}
+                for stripe in range(stripes)
+            ],
+        )
+    db.session.execute(
+        update(Book).where(Book.id == book_id).values(available_copies=available, stock_stripes=stripes)
+    )
+    return available
+
+
+def sync_all_striped(book_ids: Iterable[int] | None = None) -> int:
+    """
+    Parçalı kitapların anlık görüntüsünü parçaların toplamına eşitler (commit etmez).
+
+    Toplamlar kilitsiz tek bir SELECT ile okunur (parça satırlarında paylaşımlı
+    kilit alınmaz); books satırları ID sırasıyla, sadece değer değiştiyse
+    güncellenir. Ödünç / iade transaction'larının dışında, kendi kısa
+    transaction'ında çağrılmalıdır. Sonuç 0'dan büyükse çağıran katalog
+    sürümünü artırmalıdır (bump_versions(CATALOG_SCOPE)).
+
+    Args:
+        book_ids: Sadece bu kitaplar (varsayılan: tüm parçalı kitaplar)
+
+    Returns:
+        int: Anlık görüntüsü değişen kitap sayısı
+    """
+    query = (
+        select(Book.id, func.coalesce(func.sum(BookStockStripe.available), 0))
+        .join(BookStockStripe, BookStockStripe.book_id == Book.id, isouter=True)
+        .where(Book.stock_stripes > 0)
+        .group_by(Book.id)
+    )
+    if book_ids is not None:
+        query = query.where(Book.id.in_(list(book_ids)))
+    changed = 0
+    for book_id, total in sorted(db.session.execute(query).all()):
+        result = db.session.execute(
+            update(Book)
+            .where(Book.id == book_id, Book.stock_stripes > 0, Book.available_copies != total)
+            .values(available_copies=total),
+            execution_options={"synchronize_session": False},
+        )
+        changed += result.rowcount
+    return changed
+
+
+def collapse_stripes(book_ids: Iterable[int]) -> Dict[int, int]:
+    """
+    Parçalı kitapların parçalarını kilitler, toplamlarını books.available_copies'e
+    yazar ve parçalamayı kapatır (commit etmez).
+
+    Kitabın stok sütunları toplu olarak değiştirilecekse (içe aktarma) önce
+    çağrılır; değişiklikten sonra set_stripes ile aynı parça sayısına geri
+    dönülür. Parçalar transaction sonuna kadar kilitli kaldığı için arada
+    yapılan ödünç / iade kaybolmaz.
+
+    Args:
+        book_ids: Kitap ID'leri (parçasız olanlar atlanır)
+
+    Returns:
+        Dict[int, int]: Parçalı kitaplar için {kitap ID: parça sayısı}
+    """
+    striped = dict(db.session.execute(
+        select(Book.id, Book.stock_stripes)
+        .where(Book.id.in_(list(book_ids)), Book.stock_stripes > 0)
+        .order_by(Book.id)
+        .with_for_update()
+    ).all())
+    if not striped:
+        return {}
+    totals = dict.fromkeys(striped, 0)
+    for book_id, available in db.session.execute(
+        select(BookStockStripe.book_id, BookStockStripe.available)
+        .where(BookStockStripe.book_id.in_(list(striped)))
+        .order_by(BookStockStripe.book_id, BookStockStripe.stripe)
+        .with_for_update()
+    ):
+        totals[book_id] += available
+    for book_id, total in totals.items():
+        db.session.execute(
+            update(Book).where(Book.id == book_id).values(available_copies=total, stock_stripes=0),
+            execution_options={"synchronize_session": False},
+        )
+    return striped
@@ -0,0 +1,362 @@
+"""
+İstek Metrikleri Modülü
+Her isteğin süresini, veritabanında geçen süresini, durum kodunu ve yanıt
+boyutunu endpoint bazında ölçer; GET /api/metrics Prometheus metin
+formatında (text exposition format 0.0.4) sunar.
+
+Metrikler:
+    http_requests_total                  : İstek sayısı (blueprint, endpoint, method, status)
+    http_request_duration_seconds        : Toplam süre histogramı (blueprint, endpoint, method;
+                                           akış yanıtlarında gövdenin tamamı gönderilene kadar)
+    http_request_db_seconds              : SQL ifadelerinde geçen süre histogramı
+    http_request_python_seconds          : Toplam süre - veritabanı süresi histogramı
+    http_response_size_bytes             : Yanıt gövdesi boyutu histogramı (akış yanıtları hariç)
+    http_requests_in_flight              : Şu an işlenen istek sayısı (canlı worker'ların toplamı)
+
+Çok worker'lı kurulum (gunicorn): Her worker ölçümlerini en fazla
+METRICS_FLUSH_SECONDS aralıkla METRICS_DIR/metrics_<pid>.json dosyasına
+yazar; /api/metrics isteğini karşılayan worker tüm dosyaları toplar.
+Sonlanan worker'ın dosyası master tarafından metrics_archive.json içine
+eklenir (sayaçlar worker yeniden başlatılınca geriye gitmez).
+METRICS_DIR boşsa ölçümler sadece bu sürecin belleğindedir.
+"""
+
+import json
+import os
+import threading
+import time
+
+from flask import Flask, Response, g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+# Süre histogramı sınırları (saniye)
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Yanıt boyutu histogramı sınırları (bayt)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# Metrik adı -> (tip, açıklama, histogram sınırları)
+METRICS = {
+    "http_requests_total": ("counter", "HTTP istek sayısı", None),
+    "http_request_duration_seconds": ("histogram", "İstek süresi (saniye)", DURATION_BUCKETS),
+    "http_request_db_seconds": ("histogram", "İstek içinde SQL ifadelerinde geçen süre (saniye)", DURATION_BUCKETS),
+    "http_request_python_seconds": ("histogram", "İstek süresinin veritabanı dışında kalan kısmı (saniye)", DURATION_BUCKETS),
+    "http_response_size_bytes": ("histogram", "Yanıt gövdesi boyutu (bayt)", SIZE_BUCKETS),
+    "http_requests_in_flight": ("gauge", "İşlenmekte olan istek sayısı", None),
+}
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+ARCHIVE_FILE = "metrics_archive.json"
+
+_lock = threading.Lock()
+# (metrik adı, etiketler) -> değer; histogramlar için [kova sayıları..., toplam, adet]
+_values = {}
+_in_flight = 0
+_last_flush = 0.0
+# İstek thread'inin veritabanı süresi (istek dışı sorgular sayılmaz)
+_request_local = threading.local()
+
+
+def _observe(name: str, labels: tuple, value: float) -> None:
+    buckets = METRICS[name][2]
+    key = (name, labels)
+    series = _values.get(key)
+    if series is None:
+        series = _values[key] = [0] * (len(buckets) + 1) + [0.0, 0]
+    for index, bound in enumerate(buckets):
+        if value <= bound:
+            series[index] += 1
+            break
+    else:
+        series[len(buckets)] += 1
+    series[-2] += value
+    series[-1] += 1
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if getattr(_request_local, "db_seconds", None) is not None:
+        conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("metrics_started")
+    if started and getattr(_request_local, "db_seconds", None) is not None:
+        _request_local.db_seconds += time.perf_counter() - started.pop()
+
+
+def _handle_error(context):
+    # Hata veren ifadenin başlangıç zamanı yığında kalmasın
+    started = context.connection.info.get("metrics_started") if context.connection is not None else None
+    if started:
+        started.pop()
+
+
+def _endpoint_labels() -> tuple:
+    # Eşleşmeyen URL'ler (404) tek bir etikette toplanır; etiket sayısı sınırlı kalır
+    return (request.blueprint or "", request.endpoint or "unmatched", request.method)
+
+
+def _snapshot() -> dict:
+    with _lock:
+        return {
+            "pid": os.getpid(),
+            "in_flight": _in_flight,
+            "values": [
+                [name, list(labels), value[:] if isinstance(value, list) else value]
+                for (name, labels), value in _values.items()
+            ],
+        }
+
+
+def _write_json(path: str, data: dict) -> None:
+    # Yarım yazılmış dosya okunmasın: geçici dosyaya yaz, sonra yer değiştir
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(temporary, path)
+
+
+def flush(directory: str) -> None:
+    """
+    Bu worker'ın ölçümlerini METRICS_DIR/metrics_<pid>.json dosyasına yazar.
+
+    Args:
+        directory: Metrik dizini
+    """
+    global _last_flush
+    _last_flush = time.monotonic()
+    _write_json(os.path.join(directory, f"metrics_{os.getpid()}.json"), _snapshot())
+
+
+def _read_json(path: str) -> dict | None:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _pid_alive(pid: int) -> bool:
+    # Windows'ta os.kill süreci sonlandırır; orada tek süreç çalışır (waitress)
+    if os.name == "nt":
+        return pid == os.getpid()
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        return True
+    return True
+
+
+def _merge(total: dict, values: list) -> None:
+    for name, labels, value in values:
+        key = (name, tuple(labels))
+        if isinstance(value, list):
+            current = total.get(key)
+            total[key] = value[:] if current is None else [a + b for a, b in zip(current, value)]
+        else:
+            total[key] = total.get(key, 0) + value
+
+
+def archive_worker(directory: str, pid: int) -> None:
+    """
+    Sonlanan worker'ın ölçümlerini arşiv dosyasına ekler ve dosyasını siler.
+    Sadece gunicorn master'ında çağrılır (gunicorn.conf.py: child_exit).
+
+    Args:
+        directory: Metrik dizini
+        pid: Sonlanan worker'ın süreç kimliği
+    """
+    path = os.path.join(directory, f"metrics_{pid}.json")
+    worker = _read_json(path)
+    if worker is None:
+        return
+    archive_path = os.path.join(directory, ARCHIVE_FILE)
+    merged = {}
+    _merge(merged, (_read_json(archive_path) or {}).get("values", []))
+    _merge(merged, worker["values"])
+    _write_json(archive_path, {"values": [[name, list(labels), value] for (name, labels), value in merged.items()]})
+    os.remove(path)
+
+
+def collect(directory: str | None) -> tuple:
+    """
+    Tüm worker'ların ölçümlerini toplar.
+
+    Args:
+        directory: Metrik dizini (None: sadece bu süreç)
+
+    Returns:
+        tuple: ({(metrik adı, etiketler): değer}, işlenmekte olan istek sayısı)
+    """
+    if not directory:
+        snapshot = _snapshot()
+        total = {}
+        _merge(total, snapshot["values"])
+        return total, snapshot["in_flight"]
+
+    flush(directory)
+    total, in_flight = {}, 0
+    for file_name in os.listdir(directory):
+        if not file_name.endswith(".json"):
+            continue
+        data = _read_json(os.path.join(directory, file_name))
+        if data is None:
+            continue
+        _merge(total, data.get("values", []))
+        # Sonlanmış (henüz arşivlenmemiş) worker'ın anlık istek sayısı sayılmaz
+        if "pid" in data and _pid_alive(data["pid"]):
+            in_flight += data.get("in_flight", 0)
+    return total, in_flight
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def render(directory: str | None) -> str:
+    """
+    Toplanan ölçümleri Prometheus metin formatına dönüştürür.
+
+    Args:
+        directory: Metrik dizini (None: sadece bu süreç)
+
+    Returns:
+        str: text exposition format 0.0.4
+    """
+    total, in_flight = collect(directory)
+    lines = []
+    for name, (kind, description, buckets) in METRICS.items():
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} {kind}")
+        if kind == "gauge":
+            lines.append(f"{name} {in_flight}")
+            continue
+        label_names = ("blueprint", "endpoint", "method", "status") if kind == "counter" else ("blueprint", "endpoint", "method")
+        for (series_name, labels), value in sorted(total.items()):
+            if series_name != name:
+                continue
+            if kind == "counter":
+                lines.append(f"{name}{_format_labels(label_names, labels)} {_format_number(value)}")
+                continue
+            cumulative = 0
+            for bound, count in zip(buckets + ("+Inf",), value):
+                cumulative += count
+                le = 'le="' + (bound if isinstance(bound, str) else _format_number(bound)) + '"'
+                lines.append(f"{name}_bucket{_format_labels(label_names, labels, le)} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(label_names, labels)} {_format_number(value[-2])}")
+            lines.append(f"{name}_count{_format_labels(label_names, labels)} {value[-1]}")
+    return "\n".join(lines) + "\n"
+
+
+def init_metrics(app: Flask) -> None:
+    """
+    İstek ölçümünü kurar ve GET /api/metrics endpoint'ini ekler.
+    METRICS_ENABLED kapalıysa hiçbir şey yapmaz.
+
+    Args:
+        app: Flask uygulama nesnesi
+    """
+    if not app.config.get("METRICS_ENABLED", True):
+        return
+    directory = app.config.get("METRICS_DIR") or None
+    flush_seconds = app.config.get("METRICS_FLUSH_SECONDS", 1)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    # Tüm engine'ler (birincil ve replikalar) için SQL süresi
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _handle_error)
+
+    @app.before_request
+    def start_request_timer():
+        global _in_flight
+        g.metrics_started = time.perf_counter()
+        _request_local.db_seconds = 0.0
+        with _lock:
+            _in_flight += 1
+
+    def record(labels: tuple, status: str, started: float, size: int | None) -> None:
+        duration = time.perf_counter() - started
+        db_seconds = getattr(_request_local, "db_seconds", None) or 0.0
+        blueprint, endpoint, method = labels
+        with _lock:
+            key = ("http_requests_total", (blueprint, endpoint, method, status))
+            _values[key] = _values.get(key, 0) + 1
+            _observe("http_request_duration_seconds", labels, duration)
+            _observe("http_request_db_seconds", labels, db_seconds)
+            _observe("http_request_python_seconds", labels, max(duration - db_seconds, 0.0))
+            if size is not None:
+                _observe("http_response_size_bytes", labels, size)
+        if directory and time.monotonic() - _last_flush >= flush_seconds:
+            flush(directory)
+
+    def end_request() -> None:
+        global _in_flight
+        if getattr(_request_local, "db_seconds", None) is None:
+            return
+        _request_local.db_seconds = None
+        with _lock:
+            _in_flight -= 1
+
+    @app.after_request
+    def record_request(response):
+        started = g.pop("metrics_started", None)
+        if started is None:
+            return response
+        labels = _endpoint_labels()
+        status = str(response.status_code)
+        if not response.is_streamed:
+            record(labels, status, started, response.content_length)
+            return response
+
+        # Akış (streaming) yanıtının gövdesi after_request'ten sonra üretilir: süre ve
+        # gövde üretilirken çalışan SQL süresi, sunucu yanıtı kapatınca (gövdenin tamamı
+        # gönderildiğinde veya istemci bağlantıyı kestiğinde) ölçülür. Boyut önceden
+        # bilinmediği için sadece Content-Length verilmişse kaydedilir.
+        g.metrics_streaming = True
+        size = response.content_length
+
+        def record_stream():
+            try:
+                record(labels, status, started, size)
+            finally:
+                end_request()
+
+        response.call_on_close(record_stream)
+        return response
+
+    @app.teardown_request
+    def finish_request(exception=None):
+        # Akış yanıtında istek, yanıt kapatılınca (record_stream) sonlanır
+        if not g.pop("metrics_streaming", False):
+            end_request()
+
+    @app.get("/api/metrics")
+    def metrics():
+        """
+        Tüm worker'ların istek metriklerini Prometheus formatında döndürür.
+
+        Endpoint: GET /api/metrics
+
+        Returns:
+            200: text/plain (Prometheus text exposition format 0.0.4)
+        """
+        return Response(render(directory), content_type=CONTENT_TYPE)
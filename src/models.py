@@ -22,6 +22,7 @@ class User(db.Model):
     password_hash = db.Column(db.String(255), nullable=False)                     # Şifre hash'i (pbkdf2_sha256)
     role = db.Column(db.Enum("student", "staff", "admin", name="role_enum"), nullable=False)  # Kullanıcı rolü
     is_active = db.Column(db.Boolean, nullable=False, default=True)                 # Hesap aktif mi?
+    blocked_until = db.Column(db.Date)                                              # Etkin ceza bitiş tarihi (cezaların en geçi, bkz. src.eligibility)
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)     # Kayıt tarihi
 
     # İlişkiler
@@ -64,6 +65,12 @@ class Book(db.Model):
     Kütüphanedeki kitapları temsil eder.
     """
     __tablename__ = "books"
+    __table_args__ = (
+        db.Index("idx_books_title", "title"),                                        # Başlığa göre arama ve sayfalama
+        db.Index("idx_books_author_available", "author_id", "available_copies"),     # Yazar filtresi + müsaitlik
+        db.Index("idx_books_category_available", "category_id", "available_copies"),  # Kategori filtresi + müsaitlik
+        db.Index("idx_books_created", "created_at"),                                 # Eklenme tarihine göre sayfalama
+    )
 
     id = db.Column(db.Integer, primary_key=True)                                    # Birincil anahtar
     title = db.Column(db.String(200), nullable=False)                               # Kitap başlığı
@@ -72,6 +79,7 @@ class Book(db.Model):
     category_id = db.Column(db.Integer, db.ForeignKey("categories.id"), nullable=False)  # Kategori ID (yabancı anahtar)
     total_copies = db.Column(db.Integer, nullable=False, default=1)                  # Toplam kopya sayısı
     available_copies = db.Column(db.Integer, nullable=False, default=1)             # Mevcut kopya sayısı
+    stock_stripes = db.Column(db.SmallInteger, nullable=False, default=0)            # Stok parça sayısı (0: parçasız, bkz. src.inventory)
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)     # Kayıt tarihi
 
     # İlişkiler
@@ -80,6 +88,36 @@ class Book(db.Model):
     loans = db.relationship("Loan", back_populates="book", lazy=True)                # Bu kitabın ödünç alma kayıtları
 
 
+class BookSearch(db.Model):
+    """
+    Kitap Arama Modeli
+    Her kitap için başlık + yazar + kategori adlarından oluşan, Türkçe uyumlu
+    katlanmış (src.search.fold_text) arama metnini tutar.
+    MySQL'de search_text üzerinde ngram parser'lı FULLTEXT indeks bulunur.
+    """
+    __tablename__ = "book_search"
+    __table_args__ = (
+        db.Index("ft_book_search_text", "search_text", mysql_prefix="FULLTEXT", mysql_with_parser="ngram"),
+    )
+
+    book_id = db.Column(db.Integer, db.ForeignKey("books.id", ondelete="CASCADE"), primary_key=True)  # Kitap ID
+    search_text = db.Column(db.Text, nullable=False)                                 # Katlanmış arama metni
+
+
+class BookStockStripe(db.Model):
+    """
+    Kitap Stok Parçası Modeli
+    Çok talep gören kitapların müsait kopya sayısını birden fazla satıra böler;
+    eşzamanlı ödünç alma yazmaları tek bir satırda sıraya girmez.
+    Parçalı kitaplarda books.available_copies bu satırların toplamının anlık görüntüsüdür.
+    """
+    __tablename__ = "book_stock_stripes"
+
+    book_id = db.Column(db.Integer, db.ForeignKey("books.id", ondelete="CASCADE"), primary_key=True)  # Kitap ID
+    stripe = db.Column(db.SmallInteger, primary_key=True, autoincrement=False)      # Parça numarası (0..N-1)
+    available = db.Column(db.Integer, nullable=False, default=0)                    # Bu parçadaki müsait kopya
+
+
 class Loan(db.Model):
     """
     Ödünç Alma Modeli
@@ -90,10 +128,17 @@ class Loan(db.Model):
     - approved: İstek onaylandı (admin tarafından)
     - borrowed: Kitap ödünç alındı
     - returned: Kitap iade edildi
-    - late: Gecikmiş iade
+    - late: Gecikmiş (return_date boşsa hâlâ dışarıda, doluysa geç iade edildi; bkz. src.overdue)
     - rejected: İstek reddedildi
     """
     __tablename__ = "loans"
+    __table_args__ = (
+        db.Index("idx_loans_user_created", "user_id", "created_at"),                  # Kullanıcının ödünç listesi (en yeni önce)
+        db.Index("idx_loans_book", "book_id"),
+        db.Index("idx_loans_user_status_book", "user_id", "status", "book_id", "return_date"),  # Kitap listesindeki anti-join (sadece indeksten)
+        db.Index("idx_loans_status_created", "status", "created_at"),                # Admin istek kuyruğu (keyset sayfalama)
+        db.Index("idx_loans_status_due", "status", "due_date"),                      # Gecikmiş ödünç taraması / raporları
+    )
 
     id = db.Column(db.Integer, primary_key=True)                                      # Birincil anahtar
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)      # Kullanıcı ID (yabancı anahtar)
@@ -121,6 +166,9 @@ class Penalty(db.Model):
     Ceza: 1 ay süreyle kitap alamama (penalty_end_date tarihine kadar)
     """
     __tablename__ = "penalties"
+    __table_args__ = (
+        db.Index("idx_penalties_user_end", "user_id", "penalty_end_date"),          # Kullanıcının cezaları / blocked_until hesabı
+    )
 
     id = db.Column(db.Integer, primary_key=True)                                     # Birincil anahtar
     loan_id = db.Column(db.Integer, db.ForeignKey("loans.id"), unique=True, nullable=False)  # Ödünç alma ID (benzersiz, yabancı anahtar)
@@ -133,4 +181,40 @@ class Penalty(db.Model):
     loan = db.relationship("Loan", back_populates="penalty")                         # İlgili ödünç alma kaydı
 
 
+class CacheVersion(db.Model):
+    """
+    Önbellek Sürümü Modeli
+    Liste yanıtlarının ETag'leri için sürüm sayaçlarını tutar.
+
+    Kapsamlar (scope):
+    - catalog: Her kitap/yazar/kategori yazma işleminde ve kopya sayısı değiştiğinde artar
+    - user:<id>: Kullanıcının ödünç ve ceza kayıtları değiştiğinde artar
+    """
+    __tablename__ = "cache_versions"
 
+    scope = db.Column(db.String(64), primary_key=True)                                # Kapsam adı
+    version = db.Column(db.BigInteger, nullable=False, default=0)                    # Sürüm sayacı
+
+
+class OverdueSweepStats(db.Model):
+    """
+    Gecikme Taraması Ölçüm Modeli
+    Gecikmiş ödünç taramasının (src.overdue) ölçümlerini tek satırda (id=1) tutar.
+
+    Tarama hangi süreçte çalışırsa çalışsın (zamanlayıcı worker'ı, admin isteği,
+    cron ile CLI) ölçümler buraya yazılır; her worker aynı değerleri okur.
+    """
+    __tablename__ = "overdue_sweep_stats"
+
+    id = db.Column(db.SmallInteger, primary_key=True, autoincrement=False)          # Her zaman 1
+    runs = db.Column(db.Integer, nullable=False, default=0)                          # Tamamlanan tarama sayısı
+    errors = db.Column(db.Integer, nullable=False, default=0)                        # Hatayla biten tarama sayısı
+    marked_total = db.Column(db.BigInteger, nullable=False, default=0)               # Toplam "late" yapılan ödünç
+    last_run_at = db.Column(db.DateTime)                                             # Son taramanın başlangıcı
+    last_seconds = db.Column(db.Float)                                               # Son taramanın süresi
+    last_marked = db.Column(db.Integer)                                              # Son taramada "late" yapılan ödünç
+    last_chunks = db.Column(db.Integer)                                              # Son taramadaki parça sayısı
+    last_max_chunk_seconds = db.Column(db.Float)                                     # Son taramadaki en uzun parça
+    last_error = db.Column(db.Text)                                                  # Son hata mesajı (başarılı taramada boş)
+    scheduler_pid = db.Column(db.Integer)                                            # Zamanlayıcıyı çalıştıran süreç
+    scheduler_heartbeat_at = db.Column(db.DateTime)                                  # Zamanlayıcının son tur zamanı
@@ -0,0 +1,224 @@
+"""
+Gecikmiş Ödünç Tarama Modülü
+İade tarihi geçmiş ama hâlâ iade edilmemiş ödünçleri "late" durumuna çeker.
+
+Önceden bir ödünç sadece iade edilirken (return_book) "late" olurdu; kitap
+hâlâ dışarıdayken durumu "borrowed" kaldığı için gecikmiş ödünç raporları
+her satırda due_date hesaplamak zorundaydı. Tarama sonrası:
+
+    status = 'late' AND return_date IS NULL  -> Gecikmiş, hâlâ dışarıda
+    status = 'late' AND return_date NOT NULL -> Geç iade edilmiş
+
+Tarama küçük parçalar halinde çalışır: her parçada
+(status, due_date) indeksinden en fazla chunk_size ödünç ID'si okunur ve
+sadece bu satırlar birincil anahtarla güncellenip commit edilir. Böylece
+loans tablosunda uzun süreli / aralık (gap) kilidi tutulmaz. UPDATE
+status='borrowed' koşulunu tekrar kontrol ettiği için eşzamanlı bir iade
+veya başka bir worker'daki tarama ile çakışma zararsızdır.
+
+Çalıştırma:
+    - CLI: python sweep_overdue.py (cron ile günlük çalıştırılabilir)
+    - Uygulama içi: OVERDUE_SWEEP_SECONDS > 0 ise arka plan thread'i bu
+      aralıkla tarama yapar. Tek süreçte (python wsgi.py / app.py) thread
+      create_app içinde başlar. gunicorn altında master'da başlatılmaz
+      (master veritabanı kullanan bir thread çalıştırırken fork etmesin);
+      gunicorn.conf.py tam olarak bir worker'da fork sonrası başlatır, o
+      worker sonlanınca yerine gelen worker devralır
+
+Ölçümler overdue_sweep_stats tablosunda tutulur; taramayı hangi süreç
+çalıştırırsa çalıştırsın her worker aynı değerleri gösterir.
+"""
+
+import os
+import sys
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+from flask import Flask, current_app
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+
+from src.db import db
+from src.etag import bump_versions, user_scope
+from src.models import Loan, OverdueSweepStats
+
+
+# Ölçüm satırının birincil anahtarı (tablo tek satırlıdır)
+STATS_ID = 1
+
+_scheduler = None
+
+
+def _update_stats(**values) -> None:
+    """
+    Ölçüm satırını kendi kısa transaction'ında günceller (satır yoksa oluşturur).
+
+    Args:
+        values: Sütun değerleri (SQL ifadesi olabilir, örn: runs + 1)
+    """
+    if db.session.get(OverdueSweepStats, STATS_ID) is None:
+        try:
+            db.session.add(OverdueSweepStats(id=STATS_ID, runs=0, errors=0, marked_total=0))
+            db.session.commit()
+        except IntegrityError:
+            # Başka bir süreç aynı anda oluşturdu
+            db.session.rollback()
+    db.session.execute(
+        update(OverdueSweepStats).where(OverdueSweepStats.id == STATS_ID).values(**values),
+        execution_options={"synchronize_session": False},
+    )
+    db.session.commit()
+
+
+def sweep_overdue(chunk_size: int = 500, today: date | None = None) -> dict:
+    """
+    İade tarihi geçmiş "borrowed" ödünçleri parça parça "late" yapar.
+    Her parça ayrı bir transaction olarak commit edilir.
+
+    Args:
+        chunk_size: Parça başına en fazla ödünç sayısı
+        today: Referans tarih (varsayılan: bugün)
+
+    Returns:
+        dict: marked, chunks, seconds, max_chunk_seconds
+    """
+    today = today or date.today()
+    started_at = datetime.utcnow()
+    started = time.perf_counter()
+    marked = chunks = 0
+    max_chunk_seconds = 0.0
+    try:
+        while True:
+            chunk_started = time.perf_counter()
+            # idx_loans_status_due: (status, due_date) aralık araması, kilitsiz okuma.
+            # Güncellenen satırlar koşuldan çıktığı için her parça baştan okunur
+            rows = db.session.execute(
+                select(Loan.id, Loan.user_id)
+                .where(Loan.status == "borrowed", Loan.due_date < today)
+                .order_by(Loan.due_date)
+                .limit(chunk_size)
+            ).all()
+            if not rows:
+                break
+            result = db.session.execute(
+                update(Loan)
+                .where(Loan.id.in_([row.id for row in rows]), Loan.status == "borrowed")
+                .values(status="late"),
+                execution_options={"synchronize_session": False},
+            )
+            if result.rowcount:
+                # Kullanıcıların ödünç listesi ETag'leri geçersiz olsun
+                bump_versions(*(user_scope(row.user_id) for row in rows))
+            db.session.commit()
+            marked += result.rowcount
+            chunks += 1
+            max_chunk_seconds = max(max_chunk_seconds, time.perf_counter() - chunk_started)
+            if len(rows) < chunk_size:
+                break
+    except Exception as e:
+        db.session.rollback()
+        try:
+            _update_stats(errors=OverdueSweepStats.errors + 1, last_error=str(e)[:1000])
+        except Exception:
+            # Veritabanına erişilemiyorsa ölçüm yazılamaz; asıl hata yukarı iletilir
+            db.session.rollback()
+        raise
+
+    report = {
+        "marked": marked,
+        "chunks": chunks,
+        "seconds": round(time.perf_counter() - started, 3),
+        "max_chunk_seconds": round(max_chunk_seconds, 3),
+    }
+    _update_stats(
+        runs=OverdueSweepStats.runs + 1,
+        marked_total=OverdueSweepStats.marked_total + marked,
+        last_run_at=started_at,
+        last_seconds=report["seconds"],
+        last_marked=marked,
+        last_chunks=chunks,
+        last_max_chunk_seconds=report["max_chunk_seconds"],
+        last_error=None,
+    )
+    return report
+
+
+def sweep_metrics() -> dict:
+    """
+    Tarama ölçümlerini döndürür (tüm süreçlerde aynı; overdue_sweep_stats tablosundan).
+
+    Zamanlayıcı son iki tur aralığı içinde çalıştıysa scheduler_running true olur.
+
+    Returns:
+        dict: Tarama sayısı, son tarama süresi / etkilenen satır, zamanlayıcı durumu vb.
+    """
+    stats = db.session.get(OverdueSweepStats, STATS_ID)
+    interval = current_app.config.get("OVERDUE_SWEEP_SECONDS", 0)
+    heartbeat = stats.scheduler_heartbeat_at if stats else None
+    return {
+        "runs": stats.runs if stats else 0,
+        "errors": stats.errors if stats else 0,
+        "marked_total": stats.marked_total if stats else 0,
+        "last_run_at": stats.last_run_at.isoformat() if stats and stats.last_run_at else None,
+        "last_seconds": stats.last_seconds if stats else None,
+        "last_marked": stats.last_marked if stats else None,
+        "last_chunks": stats.last_chunks if stats else None,
+        "last_max_chunk_seconds": stats.last_max_chunk_seconds if stats else None,
+        "last_error": stats.last_error if stats else None,
+        "scheduler_pid": stats.scheduler_pid if stats else None,
+        "scheduler_heartbeat_at": heartbeat.isoformat() if heartbeat else None,
+        "scheduler_running": bool(
+            interval > 0 and heartbeat and heartbeat >= datetime.utcnow() - timedelta(seconds=2 * interval + 60)
+        ),
+    }
+
+
+def init_overdue_sweeper(app: Flask) -> None:
+    """
+    create_app içinden çağrılır: tek süreçli sunucularda zamanlayıcıyı başlatır.
+
+    gunicorn altında (preload_app ile bu kod master'da çalışır) başlatmaz;
+    gunicorn.conf.py bir worker'da fork sonrası start_overdue_sweeper çağırır.
+
+    Args:
+        app: Flask uygulama nesnesi
+    """
+    if "gunicorn" in sys.modules:
+        return
+    start_overdue_sweeper(app)
+
+
+def start_overdue_sweeper(app: Flask) -> bool:
+    """
+    OVERDUE_SWEEP_SECONDS > 0 ise taramayı bu aralıkla çalıştıran arka plan
+    thread'ini bu süreçte başlatır (süreç başına en fazla bir thread).
+
+    Args:
+        app: Flask uygulama nesnesi
+
+    Returns:
+        bool: Thread başlatıldıysa True
+    """
+    global _scheduler
+    interval = app.config.get("OVERDUE_SWEEP_SECONDS", 0)
+    if interval <= 0 or (_scheduler is not None and _scheduler.is_alive()):
+        return False
+    chunk_size = app.config.get("OVERDUE_SWEEP_CHUNK_SIZE", 500)
+
+    def run() -> None:
+        while True:
+            try:
+                with app.app_context():
+                    report = sweep_overdue(chunk_size)
+                    _update_stats(scheduler_pid=os.getpid(), scheduler_heartbeat_at=datetime.utcnow())
+                if report["marked"]:
+                    print(f"⏰ Gecikme taraması: {report['marked']} ödünç 'late' yapıldı ({report['seconds']} sn)")
+            except Exception as e:
+                # Veritabanı geçici olarak erişilemezse bir sonraki turda tekrar denenir
+                print(f"⚠️ Gecikme taraması başarısız: {e}")
+            time.sleep(interval)
+
+    _scheduler = threading.Thread(target=run, name="overdue-sweeper", daemon=True)
+    _scheduler.start()
+    return True
@@ -0,0 +1,134 @@
+"""
+Sayfalama Modülü
+Listeleme endpoint'leri için keyset (cursor) sayfalama yardımcılarını içerir.
+
+Keyset sayfalamada bir sonraki sayfa, OFFSET yerine son satırın sıralama
+anahtarından devam eder: "WHERE (sort_col, id) > (:son_deger, :son_id)".
+Böylece N. sayfa da 1. sayfa kadar ucuzdur ve indeks üzerinden okunur.
+"""
+
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from typing import Any, Dict
+
+from sqlalchemy import and_, or_
+
+
+# Varsayılan ve en büyük sayfa boyutu
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class InvalidCursor(ValueError):
+    """Cursor parametresi çözülemediğinde veya istekle uyuşmadığında fırlatılır."""
+
+
+def parse_limit(raw: str | None, default: int = DEFAULT_PAGE_SIZE, maximum: int = MAX_PAGE_SIZE) -> int:
+    """
+    limit query parametresini doğrular.
+
+    Args:
+        raw: İstekten gelen ham değer (None olabilir)
+        default: Parametre yoksa kullanılacak sayfa boyutu
+        maximum: İzin verilen en büyük sayfa boyutu
+
+    Returns:
+        int: 1 ile maximum arasında sayfa boyutu
+
+    Raises:
+        ValueError: Değer tam sayı değilse
+    """
+    if raw is None or raw == "":
+        return default
+    limit = int(raw)
+    return max(1, min(limit, maximum))
+
+
+def _encode_value(value: Any) -> Any:
+    """Tarih/saat değerlerini JSON'a uygun hale getirir."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def encode_cursor(sort: str, value: Any, row_id: int) -> str:
+    """
+    Son satırın sıralama anahtarından opak bir cursor üretir.
+
+    Args:
+        sort: Sıralama anahtarının adı (örn: "title")
+        value: Son satırın sıralama sütunundaki değeri
+        row_id: Son satırın ID'si (eşitlikleri çözmek için)
+
+    Returns:
+        str: URL güvenli base64 cursor
+    """
+    payload = json.dumps({"s": sort, "v": _encode_value(value), "id": row_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str) -> Dict[str, Any]:
+    """
+    encode_cursor ile üretilmiş cursor'ı çözer.
+
+    Args:
+        cursor: İstemciden gelen cursor
+        sort: İstekteki sıralama anahtarı (cursor ile aynı olmalı)
+
+    Returns:
+        Dict[str, Any]: {"v": son değer, "id": son ID}
+
+    Raises:
+        InvalidCursor: Cursor bozuksa veya farklı bir sıralamaya aitse
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (binascii.Error, UnicodeError, ValueError) as e:
+        raise InvalidCursor("Geçersiz cursor") from e
+
+    if not isinstance(data, dict) or data.get("s") != sort or not isinstance(data.get("id"), int):
+        raise InvalidCursor("Cursor bu sıralamaya ait değil")
+    return {"v": data.get("v"), "id": data["id"]}
+
+
+def keyset_filter(column, id_column, value: Any, row_id: int, descending: bool = False):
+    """
+    (column, id) çiftine göre "son satırdan sonrası" koşulunu üretir.
+
+    Args:
+        column: Sıralama sütunu
+        id_column: Eşitlik çözümü için birincil anahtar sütunu
+        value: Son satırın sıralama değeri
+        row_id: Son satırın ID'si
+        descending: Azalan sıralama ise True
+
+    Returns:
+        SQLAlchemy filtre ifadesi
+    """
+    if column is id_column:
+        return id_column < row_id if descending else id_column > row_id
+    if descending:
+        return or_(column < value, and_(column == value, id_column < row_id))
+    return or_(column > value, and_(column == value, id_column > row_id))
+
+
+def keyset_order(column, id_column, descending: bool = False) -> list:
+    """
+    keyset_filter ile uyumlu ORDER BY ifadelerini döndürür.
+
+    Args:
+        column: Sıralama sütunu
+        id_column: Birincil anahtar sütunu
+        descending: Azalan sıralama ise True
+
+    Returns:
+        list: order_by() için ifadeler
+    """
+    if column is id_column:
+        return [id_column.desc() if descending else id_column.asc()]
+    if descending:
+        return [column.desc(), id_column.desc()]
+    return [column.asc(), id_column.asc()]
@@ -0,0 +1,160 @@
+"""
+Şifre Hash Havuzu Modülü
+PBKDF2 şifre hash'leme / doğrulama işlerini ayrı bir süreç (process) havuzunda
+çalıştırır ve aynı anda bekleyebilecek iş sayısını sınırlar.
+
+Kayıt / giriş yoğunluğunda her PBKDF2 hesabı bir istek thread'ini onlarca
+milisaniye meşgul eder; sınırsız kuyrukta tüm thread'ler şifre hesabı
+beklerken katalog okumaları da bekler. Bu modülle:
+
+    - En fazla PASSWORD_HASH_WORKERS süreç aynı anda hash hesaplar
+      (0: havuz yok, hesap istek thread'inde yapılır)
+    - Hesaplanan + bekleyen iş sayısı PASSWORD_HASH_WORKERS +
+      PASSWORD_HASH_QUEUE_LIMIT değerini aşarsa yeni iş hiç kuyruğa alınmaz,
+      PasswordPoolBusy fırlatılır (route'lar 503 + Retry-After döner)
+    - Zaman aşımına uğrayan iş süreçte çalışmaya başlamışsa iptal edilemez;
+      gerçekten bitene kadar sınıra sayılmaya devam eder (aksi halde her
+      zaman aşımı, CPU hâlâ meşgulken yeni bir iş kabul ettirirdi)
+
+Havuz worker başına ve ilk kullanımda kurulur (gunicorn fork'undan sonra).
+Süreçler "spawn" ile başlatılır; çok thread'li bir süreçten fork edilmez
+ve Windows'ta da aynı şekilde çalışır.
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable
+
+from passlib.hash import pbkdf2_sha256
+
+
+class PasswordPoolBusy(Exception):
+    """Şifre işi kuyruğu dolu olduğunda veya iş zaman aşımına uğradığında fırlatılır."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Password hashing queue is full")
+        self.retry_after = retry_after
+
+
+_lock = threading.Lock()
+_executor: ProcessPoolExecutor | None = None
+_executor_pid: int | None = None
+_in_flight = 0
+_stats = {"submitted": 0, "rejected": 0, "timeouts": 0}
+
+
+def hash_with_rounds(password: str, rounds: int) -> str:
+    """Şifreyi verilen tur sayısıyla hash'ler (havuz sürecinde çalışır)."""
+    return pbkdf2_sha256.using(rounds=rounds).hash(password)
+
+
+def verify_hash(password: str, password_hash: str) -> bool:
+    """Şifreyi hash ile karşılaştırır (havuz sürecinde çalışır)."""
+    return pbkdf2_sha256.verify(password, password_hash)
+
+
+def _get_executor(workers: int) -> ProcessPoolExecutor:
+    global _executor, _executor_pid
+    if _executor is None or _executor_pid != os.getpid():
+        _executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        _executor_pid = os.getpid()
+    return _executor
+
+
+def _release(_future=None) -> None:
+    global _in_flight
+    with _lock:
+        _in_flight -= 1
+
+
+def run(fn: Callable[..., Any], *args: Any, config: dict) -> Any:
+    """
+    Şifre işini havuzda (veya havuz kapalıysa bu thread'de) çalıştırır.
+
+    Args:
+        fn: Çalıştırılacak modül seviyesindeki fonksiyon (hash_with_rounds, verify_hash)
+        args: Fonksiyon argümanları
+        config: Uygulama yapılandırması (PASSWORD_HASH_* ayarları)
+
+    Returns:
+        Any: Fonksiyonun sonucu
+
+    Raises:
+        PasswordPoolBusy: Kuyruk doluysa veya iş PASSWORD_HASH_TIMEOUT içinde bitmediyse
+    """
+    global _in_flight
+    workers = config.get("PASSWORD_HASH_WORKERS", 0)
+    limit = max(workers, 1) + config.get("PASSWORD_HASH_QUEUE_LIMIT", 32)
+    retry_after = config.get("PASSWORD_HASH_RETRY_AFTER", 1)
+
+    with _lock:
+        if _in_flight >= limit:
+            _stats["rejected"] += 1
+            raise PasswordPoolBusy(retry_after)
+        _in_flight += 1
+        _stats["submitted"] += 1
+        executor = _get_executor(workers) if workers > 0 else None
+    release = True
+    try:
+        if executor is None:
+            return fn(*args)
+        future = executor.submit(fn, *args)
+        try:
+            return future.result(timeout=config.get("PASSWORD_HASH_TIMEOUT", 10))
+        except FutureTimeoutError:
+            with _lock:
+                _stats["timeouts"] += 1
+            # Kuyrukta bekleyen iş iptal edilir; çalışmaya başlamış iş durdurulamaz,
+            # yeri iş gerçekten bitince boşalır
+            if not future.cancel():
+                release = False
+                future.add_done_callback(_release)
+            raise PasswordPoolBusy(retry_after)
+    finally:
+        if release:
+            _release()
+
+
+def start_pool(config: dict) -> int:
+    """
+    Havuz süreçlerinin hepsini önceden başlatır (ilk girişler spawn maliyetini ödemesin).
+
+    Args:
+        config: Uygulama yapılandırması
+
+    Returns:
+        int: Başlatılan süreç sayısı
+    """
+    workers = config.get("PASSWORD_HASH_WORKERS", 0)
+    if workers <= 0:
+        return 0
+    with _lock:
+        executor = _get_executor(workers)
+    # İşler aynı anda gönderilir; boşta süreç yoksa havuz yeni süreç açar
+    futures = [executor.submit(hash_with_rounds, "warm-up", 1) for _ in range(workers)]
+    for future in futures:
+        future.result()
+    return workers
+
+
+def pool_stats() -> dict:
+    """
+    Bu worker'daki şifre havuzunun sayaçlarını döndürür.
+
+    Returns:
+        dict: in_flight, submitted, rejected, timeouts, pool_started
+    """
+    with _lock:
+        return {"in_flight": _in_flight, **_stats, "pool_started": _executor is not None}
+
+
+def shutdown_pool() -> None:
+    """Havuz süreçlerini kapatır (bir sonraki iş yeni havuz kurar)."""
+    global _executor, _executor_pid
+    with _lock:
+        executor, _executor, _executor_pid = _executor, None, None
+    if executor is not None:
+        executor.shutdown(wait=True)
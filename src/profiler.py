@@ -0,0 +1,289 @@
+"""
+SQL Profil Modülü
+İstek başına çalışan SQL ifadelerini sayar, aynı şekilli ifadenin tekrarını
+(N+1) ve yavaş ifadeleri günlüğe yazar, endpoint sorgu bütçelerini denetler.
+
+Yapılandırma (varsayılan kapalı; geliştirme ortamı için):
+    SQL_PROFILER_ENABLED   : "1" ise profil açılır
+    SQL_PROFILER_HEADERS   : Yanıta X-DB-Queries / X-DB-Time (ms) başlıkları eklenir (varsayılan: 1)
+    SQL_SLOW_QUERY_MS      : Bu süreyi aşan ifade günlüğe yazılır (varsayılan: 100)
+    SQL_NPLUSONE_THRESHOLD : Aynı şekilli ifade bir istekte bu kadar çalışırsa N+1 sayılır (varsayılan: 5)
+    SQL_QUERY_BUDGET       : @query_budget bildirmeyen endpoint'lerin bütçesi (varsayılan: 25)
+
+Günlükte parametre değerleri yazılmaz (sadece tipleri); ifade içindeki
+metin ve sayı sabitleri de "?" ile değiştirilir.
+
+Endpoint bütçesi route üzerinde bildirilir; bütçe aşımı günlüğe yazılır ve
+benchmarks/query_budgets.py ile CI'da hata olarak raporlanır:
+
+    @loan_bp.get("/my")
+    @query_budget(4)
+    @jwt_required()
+    def my_loans(): ...
+
+İstek dışında (script / test) sorgu sayısı denetimi:
+
+    with assert_max_queries(3):
+        client.get("/api/loans/my", headers=...)
+"""
+
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Callable
+
+from flask import Flask, current_app, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+logger = logging.getLogger("smart_library.sql")
+
+QUERIES_HEADER = "X-DB-Queries"
+TIME_HEADER = "X-DB-Time"
+
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|\?|(?<![:\w]):\w+")
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+_WHITESPACE = re.compile(r"\s+")
+
+_local = threading.local()
+_stats_lock = threading.Lock()
+# Endpoint -> {"requests", "queries", "max_queries", "db_ms", "over_budget", "n_plus_one": {şekil: adet}}
+_stats = {}
+
+
+class QueryCollector:
+    """Bir istek veya assert_max_queries bloğunda çalışan ifadeleri toplar."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes = Counter()
+        self.slow = []
+
+    def repeated(self, threshold: int) -> list:
+        """En az threshold kez çalışan ifade şekillerini döndürür: [(şekil, adet)]."""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+
+def query_budget(limit: int) -> Callable:
+    """
+    Route'un istek başına çalıştırabileceği en fazla SQL ifadesi sayısını bildirir.
+
+    Args:
+        limit: İfade sayısı sınırı
+    """
+    def decorator(fn: Callable) -> Callable:
+        fn._query_budget = limit
+        return fn
+    return decorator
+
+
+def endpoint_budget(app: Flask, endpoint: str | None) -> int:
+    """
+    Endpoint'in sorgu bütçesini döndürür (bildirilmemişse SQL_QUERY_BUDGET).
+
+    Args:
+        app: Flask uygulama nesnesi
+        endpoint: Flask endpoint adı (örn: "loans.my_loans")
+
+    Returns:
+        int: İfade sayısı sınırı
+    """
+    view = app.view_functions.get(endpoint) if endpoint else None
+    return getattr(view, "_query_budget", app.config.get("SQL_QUERY_BUDGET", 25))
+
+
+def statement_shape(statement: str) -> str:
+    """
+    İfadeyi parametre ve sabitlerden arındırılmış şekline dönüştürür
+    (IN (?, ?, ?) listeleri tek "?" olarak sayılır).
+
+    Args:
+        statement: SQL ifadesi
+
+    Returns:
+        str: Normalleştirilmiş ifade
+    """
+    shape = _PLACEHOLDER.sub("?", statement)
+    shape = _LITERAL.sub("?", shape)
+    shape = _PLACEHOLDER_LIST.sub("?", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+def redact_parameters(parameters) -> str:
+    """Parametre değerleri yerine tiplerini döndürür (örn: "(int, str)")."""
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{key}: {type(value).__name__}" for key, value in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        return "(" + ", ".join(type(value).__name__ for value in parameters) + ")"
+    return type(parameters).__name__
+
+
+def _collectors() -> list:
+    collectors = getattr(_local, "collectors", None)
+    if collectors is None:
+        collectors = _local.collectors = []
+    return collectors
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _collectors():
+        conn.info.setdefault("profiler_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    collectors = _collectors()
+    started = conn.info.get("profiler_started")
+    if not collectors or not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    shape = statement_shape(statement)
+    for collector in collectors:
+        collector.count += 1
+        collector.seconds += elapsed
+        collector.shapes[shape] += 1
+    slow_ms = getattr(_local, "slow_ms", None)
+    if slow_ms is not None and elapsed * 1000 >= slow_ms:
+        collectors[0].slow.append(shape)
+        logger.warning("Yavaş SQL (%.1f ms): %s params=%s", elapsed * 1000, shape, redact_parameters(parameters))
+
+
+def _handle_error(context):
+    started = context.connection.info.get("profiler_started") if context.connection is not None else None
+    if started:
+        started.pop()
+
+
+def _install_listeners() -> None:
+    # Tüm engine'ler (birincil ve replikalar); bir kez bağlanır
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _handle_error)
+
+
+@contextmanager
+def count_queries():
+    """
+    Blok içinde bu thread'de çalışan SQL ifadelerini sayar.
+
+    Yields:
+        QueryCollector: count, seconds, shapes
+    """
+    _install_listeners()
+    collector = QueryCollector()
+    _collectors().append(collector)
+    try:
+        yield collector
+    finally:
+        _collectors().remove(collector)
+
+
+@contextmanager
+def assert_max_queries(limit: int, n_plus_one_threshold: int | None = None):
+    """
+    Blok en fazla limit SQL ifadesi çalıştırmazsa AssertionError fırlatır.
+    n_plus_one_threshold verilirse aynı şekilli ifadenin bu kadar tekrarı da hatadır.
+
+    Args:
+        limit: İfade sayısı sınırı
+        n_plus_one_threshold: Aynı şekil için tekrar sınırı (None: denetlenmez)
+
+    Raises:
+        AssertionError: Sınır aşıldıysa (mesajda en çok tekrar eden ifadeler yer alır)
+    """
+    with count_queries() as collector:
+        yield collector
+    repeated = collector.repeated(n_plus_one_threshold) if n_plus_one_threshold else []
+    if collector.count > limit or repeated:
+        top = "\n".join(f"  {count}x {shape[:200]}" for shape, count in collector.shapes.most_common(5))
+        raise AssertionError(f"{collector.count} SQL ifadesi çalıştı (sınır: {limit})\n{top}")
+
+
+def profiler_stats() -> dict:
+    """
+    Bu worker'da profil açıkken toplanan endpoint istatistiklerini döndürür.
+
+    Returns:
+        dict: {endpoint: {requests, queries_avg, max_queries, db_ms_avg, over_budget, n_plus_one}}
+    """
+    with _stats_lock:
+        return {
+            endpoint: {
+                "requests": stats["requests"],
+                "queries_avg": round(stats["queries"] / stats["requests"], 2),
+                "max_queries": stats["max_queries"],
+                "db_ms_avg": round(stats["db_ms"] / stats["requests"], 3),
+                "budget": stats["budget"],
+                "over_budget": stats["over_budget"],
+                "n_plus_one": dict(stats["n_plus_one"]),
+            }
+            for endpoint, stats in _stats.items()
+        }
+
+
+def _record(endpoint: str, collector: QueryCollector, budget: int, repeated: list) -> None:
+    with _stats_lock:
+        stats = _stats.setdefault(endpoint, {
+            "requests": 0, "queries": 0, "max_queries": 0, "db_ms": 0.0,
+            "budget": budget, "over_budget": 0, "n_plus_one": Counter(),
+        })
+        stats["requests"] += 1
+        stats["queries"] += collector.count
+        stats["max_queries"] = max(stats["max_queries"], collector.count)
+        stats["db_ms"] += collector.seconds * 1000
+        stats["over_budget"] += collector.count > budget
+        for shape, count in repeated:
+            stats["n_plus_one"][shape[:200]] = max(stats["n_plus_one"][shape[:200]], count)
+
+
+def init_profiler(app: Flask) -> None:
+    """
+    SQL_PROFILER_ENABLED açıksa istek başına SQL profilini kurar.
+
+    Args:
+        app: Flask uygulama nesnesi
+    """
+    if not app.config.get("SQL_PROFILER_ENABLED"):
+        return
+    _install_listeners()
+
+    @app.before_request
+    def start_query_profile():
+        _local.request_collector = QueryCollector()
+        _local.slow_ms = current_app.config.get("SQL_SLOW_QUERY_MS", 100)
+        _collectors().append(_local.request_collector)
+
+    @app.after_request
+    def finish_query_profile(response):
+        collector = getattr(_local, "request_collector", None)
+        if collector is None:
+            return response
+        endpoint = request.endpoint or "unmatched"
+        budget = endpoint_budget(current_app, request.endpoint)
+        repeated = collector.repeated(current_app.config.get("SQL_NPLUSONE_THRESHOLD", 5))
+        for shape, count in repeated:
+            logger.warning("N+1 şüphesi: %s %s aynı ifadeyi %d kez çalıştırdı: %s",
+                           request.method, endpoint, count, shape[:300])
+        if collector.count > budget:
+            logger.warning("Sorgu bütçesi aşıldı: %s %s %d ifade (bütçe: %d)",
+                           request.method, endpoint, collector.count, budget)
+        _record(endpoint, collector, budget, repeated)
+        if current_app.config.get("SQL_PROFILER_HEADERS", True):
+            response.headers[QUERIES_HEADER] = str(collector.count)
+            response.headers[TIME_HEADER] = f"{collector.seconds * 1000:.1f}"
+        return response
+
+    @app.teardown_request
+    def clear_query_profile(exception=None):
+        collector = getattr(_local, "request_collector", None)
+        if collector is not None:
+            _local.request_collector = None
+            _local.slow_ms = None
+            if collector in _collectors():
+                _collectors().remove(collector)
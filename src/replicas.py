@@ -0,0 +1,221 @@
+"""
+Okuma Replikası Yönlendirme Modülü
+Salt okunur endpoint'lerin SELECT sorgularını okuma replikalarına yönlendirir.
+
+Yapılandırma:
+    DATABASE_REPLICA_URLS : Virgülle ayrılmış replika URI'leri (boş: replika yok,
+                            tüm trafik birincil veritabanına gider)
+    REPLICA_RETRY_SECONDS : Hata veren replikanın devre dışı kalma süresi (varsayılan: 30)
+    REPLICA_STICKY_SECONDS: Yazma sonrası istemcinin birincile yönlendirileceği süre (varsayılan: 5)
+
+Yönlendirme route veya blueprint bazında bildirilir:
+
+    replica_reads(book_bp)      # Blueprint'in GET/HEAD istekleri replikaya
+    @use_replica                # Bu route replikaya
+    @use_primary                # Bu route her zaman birincile (read-your-writes)
+
+Replikaya yönlendirilen bir istekte bile sadece SELECT ifadeleri replikaya
+gider; INSERT/UPDATE/DELETE, SELECT ... FOR UPDATE ve flush her zaman
+birincil veritabanına gider. İstek başına tek bir replika seçilir
+(round-robin, hata veren replikalar REPLICA_RETRY_SECONDS boyunca atlanır;
+sağlıklı replika yoksa birincil kullanılır).
+
+Read-your-writes: Başarılı her yazma isteğinin (POST/PUT/PATCH/DELETE)
+yanıtı X-Primary-Until başlığını (epoch ms) döndürür. İstemci bu değeri
+sonraki isteklerinde aynı başlıkla geri gönderirse, süre dolana kadar
+okumalar birincilden yapılır (çok worker'lı kurulumda da çalışır, sunucuda
+durum tutulmaz). static/main.js bunu otomatik yapar.
+
+SELECT'leri replikaya gönderen session src.db.RoutingSession'dır; seçilen
+replika istek başına g.db_replica içinde tutulur.
+
+Yerel test (iki SQLite dosyası):
+    cp library.db replica.db
+    DATABASE_URL=sqlite:///library.db DATABASE_REPLICA_URLS=sqlite:///replica.db python app.py
+"""
+
+import itertools
+import threading
+import time
+from typing import Callable
+
+from flask import Blueprint, Flask, current_app, g, request
+from sqlalchemy import event, text
+
+from src.db import db
+
+
+# Yanıtta ve istekte kullanılan read-your-writes başlığı
+PRIMARY_UNTIL_HEADER = "X-Primary-Until"
+
+# Replika bind adı öneki: SQLALCHEMY_BINDS["replica_0"], ["replica_1"], ...
+REPLICA_BIND_PREFIX = "replica_"
+
+_replica_blueprints = set()
+_counter = itertools.count()
+_state_lock = threading.Lock()
+# Bind adı -> {"down_until": float, "failures": int, "chosen": int}
+_state = {}
+
+
+def use_replica(fn: Callable) -> Callable:
+    """Route'un SELECT sorgularını replikaya yönlendirir."""
+    fn._db_route = "replica"
+    return fn
+
+
+def use_primary(fn: Callable) -> Callable:
+    """Route'u (replikalı blueprint içinde bile) birincil veritabanında tutar."""
+    fn._db_route = "primary"
+    return fn
+
+
+def replica_reads(blueprint: Blueprint) -> Blueprint:
+    """
+    Blueprint'in GET/HEAD isteklerini varsayılan olarak replikaya yönlendirir.
+    Tek tek route'lar @use_primary ile hariç tutulabilir.
+
+    Args:
+        blueprint: Flask blueprint
+
+    Returns:
+        Blueprint: Aynı blueprint
+    """
+    _replica_blueprints.add(blueprint.name)
+    return blueprint
+
+
+def replica_binds(urls: str) -> dict:
+    """
+    DATABASE_REPLICA_URLS değerinden SQLALCHEMY_BINDS sözlüğünü oluşturur.
+
+    Args:
+        urls: Virgülle ayrılmış URI'ler
+
+    Returns:
+        dict: {"replica_0": uri, ...}
+    """
+    uris = [uri.strip() for uri in (urls or "").split(",") if uri.strip()]
+    return {f"{REPLICA_BIND_PREFIX}{index}": uri for index, uri in enumerate(uris)}
+
+
+def _replica_names() -> list:
+    return sorted(bind for bind in db.engines if bind and bind.startswith(REPLICA_BIND_PREFIX))
+
+
+def _mark_down(bind: str) -> None:
+    retry = current_app.config.get("REPLICA_RETRY_SECONDS", 30)
+    with _state_lock:
+        state = _state.setdefault(bind, {"down_until": 0.0, "failures": 0, "chosen": 0})
+        state["down_until"] = time.monotonic() + retry
+        state["failures"] += 1
+
+
+def _probe(bind: str) -> bool:
+    """Replikayı ilk kullanımda / devre dışı kalma süresi dolduktan sonra yoklar."""
+    try:
+        with db.engines[bind].connect() as connection:
+            connection.execute(text("SELECT 1"))
+        return True
+    except Exception:
+        # Bağlantı hataları handle_error dinleyicisinde zaten işaretlenir
+        with _state_lock:
+            marked = _state.get(bind, {}).get("down_until", 0.0) > time.monotonic()
+        if not marked:
+            _mark_down(bind)
+        return False
+
+
+def choose_replica() -> str | None:
+    """
+    Round-robin ile sağlıklı bir replika seçer.
+
+    Returns:
+        str | None: Replika bind adı; sağlıklı replika yoksa None (birincil kullanılır)
+    """
+    names = _replica_names()
+    if not names:
+        return None
+    start = next(_counter)
+    now = time.monotonic()
+    for offset in range(len(names)):
+        bind = names[(start + offset) % len(names)]
+        with _state_lock:
+            state = _state.setdefault(bind, {"down_until": 0.0, "failures": 0, "chosen": 0})
+            down_until, chosen = state["down_until"], state["chosen"]
+        if down_until > now:
+            continue
+        # İlk kullanımda ve devre dışı kalma süresi dolduktan sonra önce yoklanır
+        if (down_until or not chosen) and not _probe(bind):
+            continue
+        with _state_lock:
+            state["down_until"] = 0.0
+            state["chosen"] += 1
+        return bind
+    return None
+
+
+def replica_stats() -> dict:
+    """
+    Bu worker'daki replika durumlarını döndürür.
+
+    Returns:
+        dict: {bind: {healthy, failures, chosen, retry_in_seconds}}
+    """
+    now = time.monotonic()
+    with _state_lock:
+        return {
+            bind: {
+                "healthy": _state.get(bind, {}).get("down_until", 0.0) <= now,
+                "failures": _state.get(bind, {}).get("failures", 0),
+                "chosen": _state.get(bind, {}).get("chosen", 0),
+                "retry_in_seconds": round(max(_state.get(bind, {}).get("down_until", 0.0) - now, 0.0), 1),
+            }
+            for bind in _replica_names()
+        }
+
+
+def _wants_replica() -> bool:
+    view = current_app.view_functions.get(request.endpoint)
+    route = getattr(view, "_db_route", None)
+    if route is None:
+        route = "replica" if request.blueprint in _replica_blueprints and request.method in ("GET", "HEAD") else "primary"
+    if route != "replica":
+        return False
+    # Yakın zamanda yazma yapan istemci: replika gecikmesini görmesin
+    try:
+        return int(request.headers.get(PRIMARY_UNTIL_HEADER, "0")) <= time.time() * 1000
+    except ValueError:
+        return True
+
+
+def init_replicas(app: Flask) -> None:
+    """
+    Replika yönlendirmesini kurar (istek başına replika seçimi, hata izleme,
+    read-your-writes başlığı). Replika tanımlı değilse hiçbir şey yapmaz.
+
+    Args:
+        app: Flask uygulama nesnesi
+    """
+    with app.app_context():
+        names = _replica_names()
+        for bind in names:
+            def on_error(context, bind=bind):
+                # Bağlantı kurulamadı veya koptu: replika bir süre devre dışı
+                if context.is_disconnect or context.connection is None:
+                    _mark_down(bind)
+            event.listen(db.engines[bind], "handle_error", on_error)
+    if not names:
+        return
+
+    @app.before_request
+    def route_to_replica():
+        g.db_replica = choose_replica() if _wants_replica() else None
+
+    @app.after_request
+    def primary_until(response):
+        # Başarılı yazma isteği (POST/PUT/PATCH/DELETE): istemci kısa süre birincilden okusun
+        if request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+            sticky = current_app.config.get("REPLICA_STICKY_SECONDS", 5)
+            response.headers[PRIMARY_UNTIL_HEADER] = str(int((time.time() + sticky) * 1000))
+        return response
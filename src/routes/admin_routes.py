@@ -4,14 +4,27 @@ Yazar, kategori ve kullanıcı yönetimi için CRUD işlemlerini içerir.
 Sadece admin rolüne sahip kullanıcılar erişebilir.
 """
 
-from flask import Blueprint, jsonify, request
+import os
+
+from flask import Blueprint, current_app, jsonify, request
+from sqlalchemy import text
 
 from datetime import date
 
+from src.book_import import FORMATS, BookImporter, read_rows
 from src.decorators import jwt_required
-from src.db import db
-from src.models import Author, Category, User, Penalty, Loan
-from src.security import hash_password
+from src.eligibility import refresh_blocked_until
+from src.db import db, pool_stats as db_pool_stats
+from src.etag import CATALOG_SCOPE, bump_versions, user_scope
+from src.inventory import set_stripes
+from src.models import Author, Book, Category, User, Penalty, Loan
+from src.overdue import sweep_metrics, sweep_overdue
+from src.password_pool import PasswordPoolBusy, pool_stats as password_pool_stats
+from src.profiler import profiler_stats, query_budget
+from src.replicas import replica_stats, use_replica
+from src.search import refresh_book_search
+from src.security import hash_password, token_cache_stats
+from src.trigram_index import book_index
 
 
 # Admin yönetimi blueprint'i
@@ -22,6 +35,8 @@ admin_bp = Blueprint("admin", __name__)
 # ========== YAZAR YÖNETİMİ ==========
 
 @admin_bp.get("/authors")
+@use_replica
+@query_budget(2)
 @jwt_required(role="admin")
 def list_authors():
     """
@@ -34,7 +49,7 @@ def list_authors():
         401: Yetkisiz erişim
         403: Admin yetkisi gerekli
     """
-    authors = Author.query.all()
+    authors = db.session.query(Author.id, Author.name, Author.bio)
     return jsonify([{"id": a.id, "name": a.name, "bio": a.bio} for a in authors])
 
 
@@ -63,7 +78,9 @@ def create_author():
         return jsonify({"message": "name is required"}), 400
     author = Author(name=data["name"], bio=data.get("bio"))
     db.session.add(author)
+    bump_versions(CATALOG_SCOPE)
     db.session.commit()
+    book_index.put_author(author.id, author.name)
     return jsonify({"id": author.id}), 201
 
 
@@ -91,9 +108,14 @@ def update_author(author_id: int):
     data = request.get_json() or {}
     if "name" in data:
         author.name = data["name"]
+        # Yazar adı tüm kitaplarının arama metninde yer alır
+        refresh_book_search(author_id=author.id)
     if "bio" in data:
         author.bio = data["bio"]
+    bump_versions(CATALOG_SCOPE)
     db.session.commit()
+    if "name" in data:
+        book_index.put_author(author.id, author.name)
     return jsonify({"message": "updated"})
 
 
@@ -113,13 +135,17 @@ def delete_author(author_id: int):
     """
     author = Author.query.get_or_404(author_id)
     db.session.delete(author)
+    bump_versions(CATALOG_SCOPE)
     db.session.commit()
+    book_index.remove_author(author_id)
     return jsonify({"message": "deleted"})
 
 
 # ========== KATEGORİ YÖNETİMİ ==========
 
 @admin_bp.get("/categories")
+@use_replica
+@query_budget(2)
 @jwt_required(role="admin")
 def list_categories():
     """
@@ -132,7 +158,7 @@ def list_categories():
         401: Yetkisiz erişim
         403: Admin yetkisi gerekli
     """
-    categories = Category.query.all()
+    categories = db.session.query(Category.id, Category.name, Category.description)
     return jsonify(
         [{"id": c.id, "name": c.name, "description": c.description} for c in categories]
     )
@@ -163,7 +189,9 @@ def create_category():
         return jsonify({"message": "name is required"}), 400
     category = Category(name=data["name"], description=data.get("description"))
     db.session.add(category)
+    bump_versions(CATALOG_SCOPE)
     db.session.commit()
+    book_index.put_category(category.id, category.name)
     return jsonify({"id": category.id}), 201
 
 
@@ -191,9 +219,14 @@ def update_category(category_id: int):
     data = request.get_json() or {}
     if "name" in data:
         category.name = data["name"]
+        # Kategori adı tüm kitaplarının arama metninde yer alır
+        refresh_book_search(category_id=category.id)
     if "description" in data:
         category.description = data["description"]
+    bump_versions(CATALOG_SCOPE)
     db.session.commit()
+    if "name" in data:
+        book_index.put_category(category.id, category.name)
     return jsonify({"message": "updated"})
 
 
@@ -213,10 +246,231 @@ def delete_category(category_id: int):
     """
     category = Category.query.get_or_404(category_id)
     db.session.delete(category)
+    bump_versions(CATALOG_SCOPE)
     db.session.commit()
+    book_index.remove_category(category_id)
     return jsonify({"message": "deleted"})
 
 
+# ========== ARAMA İNDEKSİ ==========
+
+@admin_bp.get("/search-index")
+@jwt_required(role="admin")
+def search_index_stats():
+    """
+    Bu worker'daki bellek içi trigram arama indeksinin boyutunu gösterir.
+    Worker başına bellek ihtiyacını hesaplamak için kullanılır.
+    
+    Endpoint: GET /api/admin/search-index
+    
+    Returns:
+        200: documents, trigrams, postings, approx_bytes, built_seconds_ago
+        401: Yetkisiz erişim
+        403: Admin yetkisi gerekli
+    """
+    return jsonify(book_index.stats())
+
+
+# ========== TOPLU KİTAP İÇE AKTARMA ==========
+
+@admin_bp.post("/books/import")
+@jwt_required(role="admin")
+def import_books():
+    """
+    CSV veya NDJSON dosyasından kitapları toplu olarak içe aktarır.
+    
+    Endpoint: POST /api/admin/books/import?format=csv&chunk_size=1000
+    
+    Query Parameters:
+        format (optional): csv veya ndjson (varsayılan: Content-Type'tan çıkarılır)
+        chunk_size (optional): Her commit'teki satır sayısı
+            (varsayılan: BOOK_IMPORT_CHUNK_SIZE ayarı)
+    
+    Request Body:
+        Ham dosya içeriği veya multipart "file" alanı. Alanlar:
+        title, isbn, author veya author_id, category veya category_id,
+        total_copies (varsayılan 1), available_copies (varsayılan total_copies)
+    
+    Özellikler:
+        - ISBN zaten kayıtlıysa kitap güncellenir (upsert); ödünçteki kopyalar korunur
+        - Yazar/kategori adları toplu çözülür, olmayanlar oluşturulur
+        - Her parça ayrı commit edilir; hatalı satırlar içe aktarmayı durdurmaz
+    
+    Returns:
+        200: {"processed", "inserted", "updated", "duplicates", "failed",
+              "chunks", "errors": [{"row", "isbn", "message"}], "errors_truncated"}
+        400: Geçersiz format veya chunk_size
+        401: Yetkisiz erişim
+        403: Admin yetkisi gerekli
+    """
+    upload = request.files.get("file")
+    mimetype = upload.mimetype if upload else request.mimetype
+    fmt = request.args.get("format") or ("ndjson" if "json" in (mimetype or "") else "csv")
+    if fmt not in FORMATS:
+        return jsonify({"message": f"Geçersiz format: {fmt}"}), 400
+    try:
+        chunk_size = int(request.args.get("chunk_size") or current_app.config["BOOK_IMPORT_CHUNK_SIZE"])
+    except ValueError:
+        return jsonify({"message": "chunk_size bir tam sayı olmalıdır"}), 400
+    if chunk_size < 1:
+        return jsonify({"message": "chunk_size en az 1 olmalıdır"}), 400
+
+    # Gövde belleğe alınmadan akış olarak okunur
+    source = upload.stream if upload else request.stream
+    report = BookImporter(chunk_size=chunk_size).run(read_rows(source, fmt))
+    return jsonify(report)
+
+
+@admin_bp.put("/books/<int:book_id>/stripes")
+@jwt_required(role="admin")
+def update_book_stripes(book_id: int):
+    """
+    Çok talep gören bir kitabın stokunu parçalara böler veya parçalamayı kapatır.
+    
+    Endpoint: PUT /api/admin/books/<book_id>/stripes
+    
+    Request Body:
+        {
+            "stripes": 8    (0: parçalama kapalı, en fazla 64)
+        }
+    
+    Özellikler:
+        - Ödünç alma yazmaları tek satır yerine N satıra dağılır
+        - Kitabın books.available_copies değeri parçaların toplamının anlık görüntüsü olur
+    
+    Returns:
+        200: {"book_id", "stripes", "available_copies"}
+        400: Geçersiz parça sayısı
+        404: Kitap bulunamadı
+        401: Yetkisiz erişim
+        403: Admin yetkisi gerekli
+    """
+    Book.query.get_or_404(book_id)
+    data = request.get_json() or {}
+    try:
+        stripes = int(data.get("stripes", 0))
+        available = set_stripes(book_id, stripes)
+    except (TypeError, ValueError) as e:
+        db.session.rollback()
+        return jsonify({"message": f"Geçersiz stripes: {e}"}), 400
+    bump_versions(CATALOG_SCOPE)
+    db.session.commit()
+    return jsonify({"book_id": book_id, "stripes": stripes, "available_copies": available})
+
+
+@admin_bp.get("/auth-cache")
+@jwt_required(role="admin")
+def auth_cache_stats():
+    """
+    Bu worker'daki doğrulanmış token önbelleğinin ve şifre hash havuzunun
+    sayaçlarını gösterir.
+
+    Endpoint: GET /api/admin/auth-cache
+
+    Returns:
+        200: size, hits, misses, evictions, password_pool (in_flight, submitted, rejected, timeouts)
+        401: Yetkisiz erişim
+        403: Admin yetkisi gerekli
+    """
+    return jsonify({**token_cache_stats(), "password_pool": password_pool_stats()})
+
+
+@admin_bp.get("/db-pool")
+@jwt_required(role="admin")
+def db_pool_telemetry():
+    """
+    Bu worker'daki veritabanı bağlantı havuzunun durumunu ve sayaçlarını gösterir.
+    Havuz boyutunu (DB_POOL_SIZE, DB_MAX_OVERFLOW) MySQL max_connections'a göre
+    ayarlamak için kullanılır: worker sayısı x max_connections_per_worker < max_connections.
+
+    Endpoint: GET /api/admin/db-pool
+
+    Returns:
+        200: pid, pools (size, checked_out, overflow, checkouts, wait_ms_avg/max,
+             peak_checked_out, peak_overflow, timeouts, invalidations, ...), server,
+             replicas (healthy, failures, chosen, retry_in_seconds)
+        401: Yetkisiz erişim
+        403: Admin yetkisi gerekli
+    """
+    pools = db_pool_stats()
+    server = None
+    if db.engine.dialect.name == "mysql":
+        # Sunucu tarafı: toplam bağlantı sınırı ve şu an açık bağlantılar (tüm worker'lar)
+        rows = db.session.execute(text(
+            "SELECT VARIABLE_NAME, VARIABLE_VALUE FROM performance_schema.global_variables "
+            "WHERE VARIABLE_NAME = 'max_connections' "
+            "UNION ALL SELECT VARIABLE_NAME, VARIABLE_VALUE FROM performance_schema.global_status "
+            "WHERE VARIABLE_NAME IN ('Threads_connected', 'Max_used_connections')"
+        )).all()
+        server = {name.lower(): int(value) for name, value in rows}
+    return jsonify({
+        "pid": os.getpid(),
+        "pools": pools,
+        "max_connections_per_worker": {
+            bind: stats["size"] + stats["max_overflow"] for bind, stats in pools.items() if "size" in stats
+        },
+        "server": server,
+        "replicas": replica_stats(),
+    })
+
+
+@admin_bp.get("/sql-profile")
+@jwt_required(role="admin")
+def sql_profile_stats():
+    """
+    Bu worker'da SQL profili açıkken (SQL_PROFILER_ENABLED=1) toplanan endpoint
+    istatistiklerini gösterir: ifade sayısı, veritabanı süresi, bütçe aşımları
+    ve N+1 şüphesi olan ifadeler.
+
+    Endpoint: GET /api/admin/sql-profile
+
+    Returns:
+        200: enabled, endpoints ({endpoint: {requests, queries_avg, max_queries, db_ms_avg,
+             budget, over_budget, n_plus_one}})
+        401: Yetkisiz erişim
+        403: Admin yetkisi gerekli
+    """
+    return jsonify({"enabled": current_app.config.get("SQL_PROFILER_ENABLED", False), "endpoints": profiler_stats()})
+
+
+# ========== GECİKMİŞ ÖDÜNÇ TARAMASI ==========
+
+@admin_bp.get("/overdue-sweep")
+@jwt_required(role="admin")
+def overdue_sweep_stats():
+    """
+    Gecikmiş ödünç taramasının ölçümlerini (tüm süreçlerde ortak) ve dışarıdaki
+    gecikmiş ödünç sayısını gösterir.
+
+    Endpoint: GET /api/admin/overdue-sweep
+
+    Returns:
+        200: runs, errors, marked_total, last_seconds, last_marked, ..., scheduler_running, overdue_out
+        401: Yetkisiz erişim
+        403: Admin yetkisi gerekli
+    """
+    metrics = sweep_metrics()
+    # idx_loans_status_due üzerinden sayılır
+    metrics["overdue_out"] = Loan.query.filter(Loan.status == "late", Loan.return_date.is_(None)).count()
+    return jsonify(metrics)
+
+
+@admin_bp.post("/overdue-sweep")
+@jwt_required(role="admin")
+def run_overdue_sweep():
+    """
+    Gecikmiş ödünç taramasını hemen çalıştırır.
+
+    Endpoint: POST /api/admin/overdue-sweep
+
+    Returns:
+        200: marked, chunks, seconds, max_chunk_seconds
+        401: Yetkisiz erişim
+        403: Admin yetkisi gerekli
+    """
+    return jsonify(sweep_overdue(current_app.config["OVERDUE_SWEEP_CHUNK_SIZE"]))
+
+
 # ========== KULLANICI YÖNETİMİ ==========
 
 @admin_bp.post("/users")
@@ -240,15 +494,20 @@ def create_user():
         400: Eksik alanlar
         401: Yetkisiz erişim
         403: Admin yetkisi gerekli
+        503: Şifre hash kuyruğu dolu (Retry-After)
     """
     data = request.get_json() or {}
     required = ["full_name", "email", "password", "role"]
     if not all(field in data for field in required):
         return jsonify({"message": "Missing fields"}), 400
+    try:
+        password_hash = hash_password(data["password"])
+    except PasswordPoolBusy as e:
+        return jsonify({"message": "Sunucu yoğun, lütfen biraz sonra tekrar deneyin"}), 503, {"Retry-After": str(e.retry_after)}
     user = User(
         full_name=data["full_name"],
         email=data["email"],
-        password_hash=hash_password(data["password"]),
+        password_hash=password_hash,
         role=data["role"],
         is_active=True,
     )
@@ -260,6 +519,8 @@ def create_user():
 # ========== CEZA YÖNETİMİ ==========
 
 @admin_bp.get("/penalties")
+@use_replica
+@query_budget(2)
 @jwt_required(role="admin")
 def list_all_penalties():
     """
@@ -272,24 +533,39 @@ def list_all_penalties():
         401: Yetkisiz erişim
         403: Admin yetkisi gerekli
     """
+    # Kullanıcı ve kitap bilgileri aynı SELECT içinde join ile gelir (ceza başına ek sorgu yapılmaz)
     penalties = (
-        Penalty.query.join(Loan)
-        .join(User)
+        db.session.query(
+            Penalty.id,
+            Penalty.user_id,
+            Penalty.loan_id,
+            Penalty.days_late,
+            Penalty.penalty_end_date,
+            Penalty.created_at,
+            User.full_name.label("user_name"),
+            User.email.label("user_email"),
+            Book.title.label("book_title"),
+        )
+        .select_from(Penalty)
+        .join(Loan, Loan.id == Penalty.loan_id)
+        .join(User, User.id == Loan.user_id)
+        .outerjoin(Book, Book.id == Loan.book_id)
         .order_by(Penalty.created_at.desc())
         .all()
     )
+    today = date.today()
     result = []
     for p in penalties:
-        days_remaining = (p.penalty_end_date - date.today()).days if p.penalty_end_date > date.today() else 0
-        is_active = p.penalty_end_date > date.today()
+        days_remaining = (p.penalty_end_date - today).days if p.penalty_end_date > today else 0
+        is_active = p.penalty_end_date > today
         result.append(
             {
                 "id": p.id,
                 "user_id": p.user_id,
-                "user_name": p.loan.user.full_name if p.loan and p.loan.user else None,
-                "user_email": p.loan.user.email if p.loan and p.loan.user else None,
+                "user_name": p.user_name,
+                "user_email": p.user_email,
                 "loan_id": p.loan_id,
-                "book_title": p.loan.book.title if p.loan and p.loan.book else None,
+                "book_title": p.book_title,
                 "days_late": p.days_late,
                 "penalty_end_date": p.penalty_end_date.isoformat(),
                 "days_remaining": days_remaining,
@@ -318,6 +594,8 @@ def remove_penalty(penalty_id: int):
     
     # Ceza bitiş tarihini bugüne çek (cezayı kaldır)
     penalty.penalty_end_date = date.today()
+    refresh_blocked_until(penalty.user_id)
+    bump_versions(user_scope(penalty.user_id))
     db.session.commit()
     
     return jsonify({
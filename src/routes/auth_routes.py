@@ -7,7 +7,8 @@ from flask import Blueprint, jsonify, request
 
 from src.db import db
 from src.models import User
-from src.security import hash_password, verify_password, create_access_token
+from src.password_pool import PasswordPoolBusy
+from src.security import hash_password, verify_password, password_needs_rehash, create_access_token
 
 
 # Kimlik doğrulama blueprint'i
@@ -34,6 +35,7 @@ def register():
         400: Eksik veya geçersiz veri
         409: E-posta zaten kayıtlı
         500: Sunucu hatası
+        503: Şifre hash kuyruğu dolu (Retry-After başlığı kadar sonra tekrar deneyin)
     """
     try:
         data = request.get_json() or {}
@@ -65,6 +67,9 @@ def register():
         return jsonify(
             {"id": user.id, "full_name": user.full_name, "email": user.email, "role": user.role}
         ), 201
+    except PasswordPoolBusy as e:
+        db.session.rollback()
+        return jsonify({"message": "Sunucu yoğun, lütfen biraz sonra tekrar deneyin"}), 503, {"Retry-After": str(e.retry_after)}
     except Exception as e:
         import traceback
         traceback.print_exc()
@@ -90,6 +95,7 @@ def login():
         400: E-posta veya şifre eksik
         401: Geçersiz e-posta veya şifre
         500: Sunucu hatası
+        503: Şifre doğrulama kuyruğu dolu (Retry-After başlığı kadar sonra tekrar deneyin)
     """
     try:
         data = request.get_json() or {}
@@ -103,6 +109,15 @@ def login():
         if not user or not verify_password(password, user.password_hash):
             return jsonify({"message": "Geçersiz e-posta veya şifre"}), 401
 
+        # Eski tur sayısıyla hash'lenmiş şifreyi güncel ayarla yeniden hash'le
+        if password_needs_rehash(user.password_hash):
+            try:
+                user.password_hash = hash_password(password)
+                db.session.commit()
+            except PasswordPoolBusy:
+                # Kuyruk doluysa giriş engellenmez; bir sonraki girişte tekrar denenir
+                db.session.rollback()
+
         token = create_access_token(user.id, user.role)
         return jsonify(
             {
@@ -115,6 +130,8 @@ def login():
                 },
             }
         )
+    except PasswordPoolBusy as e:
+        return jsonify({"message": "Sunucu yoğun, lütfen biraz sonra tekrar deneyin"}), 503, {"Retry-After": str(e.retry_after)}
     except Exception as e:
         import traceback
         traceback.print_exc()
@@ -3,94 +3,462 @@ Kitap Yönetimi Route'ları
 Kitap listeleme, arama, oluşturma, güncelleme ve silme işlemlerini yönetir.
 """
 
-from flask import Blueprint, jsonify, request
-from sqlalchemy import or_
+import json
+from datetime import datetime
 
-from src.decorators import jwt_required
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
+from sqlalchemy import case, exists, func, literal, or_
+
+from src.decorators import jwt_required, optional_jwt_user_id
 from src.db import db
-from src.models import Book, Author, Category
+from src.etag import CATALOG_SCOPE, bump_versions, compute_etag, etag_matches, not_modified, user_scope, with_etag
+from src.inventory import set_stripes
+from src.models import Book, Author, Category, BookSearch, Loan
+from src.pagination import (
+    InvalidCursor,
+    decode_cursor,
+    encode_cursor,
+    keyset_filter,
+    keyset_order,
+    parse_limit,
+)
+from src.profiler import query_budget
+from src.replicas import replica_reads
+from src.search import (
+    refresh_book_search,
+    relevance_after,
+    remove_book_search,
+    search_condition,
+    search_relevance,
+)
+from src.trigram_index import book_index
 
 
 # Kitap yönetimi blueprint'i
 # URL prefix: /api/books
-book_bp = Blueprint("books", __name__)
+# GET istekleri (katalog) okuma replikasından yapılır (bkz. src.replicas)
+book_bp = replica_reads(Blueprint("books", __name__))
+
+
+def _catalog_query():
+    """
+    Katalog listesi için sadece serileştirilen sütunları seçen sorgu.
+
+    ORM nesnesi oluşturulmaz ve author/category ilişkileri lazy load edilmez;
+    yazar ve kategori adları aynı SELECT içinde join ile gelir.
+
+    Returns:
+        Query: (id, title, isbn, author_id, author, category_id, category,
+                total_copies, available_copies, created_at) satırları döndüren sorgu
+    """
+    return (
+        db.session.query(
+            Book.id,
+            Book.title,
+            Book.isbn,
+            Book.author_id,
+            Author.name.label("author"),
+            Book.category_id,
+            Category.name.label("category"),
+            Book.total_copies,
+            Book.available_copies,
+            Book.created_at,
+        )
+        .select_from(Book)
+        .join(Author, Author.id == Book.author_id)
+        .join(Category, Category.id == Book.category_id)
+    )
+
+
+def _book_row_to_dict(row) -> dict:
+    """
+    _catalog_query satırını API yanıtı sözlüğüne çevirir.
+
+    Args:
+        row: _catalog_query'den gelen satır
+
+    Returns:
+        dict: Kitap bilgileri
+    """
+    return {
+        "id": row.id,
+        "title": row.title,
+        "isbn": row.isbn,
+        "author": row.author,
+        "author_id": row.author_id,
+        "category": row.category,
+        "category_id": row.category_id,
+        "total_copies": row.total_copies,
+        "available_copies": row.available_copies,
+    }
+
+
+# Kullanıcının kitap listesinde görmediği (zaten elinde veya istekte olan) ödünç durumları
+# ("late" sadece return_date boşken, yani kitap hâlâ dışarıdayken aktiftir)
+ACTIVE_LOAN_STATUSES = ("borrowed", "late", "requested", "approved")
+
+# Facet yanıtında gösterilecek en fazla yazar sayısı
+FACET_AUTHOR_LIMIT = 20
+
+# trigram modunda indeksten alınan en fazla aday sayısı
+TRIGRAM_MAX_CANDIDATES = 1000
+
+
+def _is_cursor_for(cursor: str | None, sort: str) -> bool:
+    """Cursor verilmişse ve bu sıralama anahtarına aitse True döndürür."""
+    if not cursor:
+        return False
+    try:
+        decode_cursor(cursor, sort)
+    except InvalidCursor:
+        return False
+    return True
+
+
+def _parse_catalog_filters(args) -> list:
+    """
+    Yapılandırılmış katalog filtrelerini SQL koşullarına çevirir.
+
+    Args:
+        args: request.args
+
+    Returns:
+        list: query.filter() için koşullar
+
+    Raises:
+        ValueError: Parametre değeri geçersizse
+    """
+    conditions = []
+    if args.get("category_id"):
+        conditions.append(Book.category_id == int(args["category_id"]))
+    if args.get("author_id"):
+        conditions.append(Book.author_id == int(args["author_id"]))
+    available = args.get("available", "").lower()
+    if available in ("true", "1"):
+        conditions.append(Book.available_copies > 0)
+    elif available in ("false", "0"):
+        conditions.append(Book.available_copies <= 0)
+    elif available:
+        raise ValueError("available true veya false olmalıdır")
+    if args.get("created_after"):
+        conditions.append(Book.created_at > datetime.fromisoformat(args["created_after"]))
+    return conditions
+
+
+def _catalog_facets(query) -> dict:
+    """
+    Filtrelenmiş sonuç kümesi için facet sayılarını tek sorguda hesaplar.
+
+    Kategori, yazar (en çok kitabı olan FACET_AUTHOR_LIMIT yazar) ve
+    müsaitlik grupları UNION ALL ile tek ifadede birleştirilir; her facet için
+    ayrı sorgu çalıştırılmaz.
+
+    Args:
+        query: Sayfalama uygulanmamış, filtrelenmiş katalog sorgusu
+
+    Returns:
+        dict: {"categories": [...], "authors": [...], "availability": {...}}
+    """
+    count = func.count().label("count")
+    available = case((Book.available_copies > 0, 1), else_=0)
+    by_category = query.with_entities(
+        literal("category").label("facet"), Book.category_id.label("value"), Category.name.label("label"), count
+    ).group_by(Book.category_id, Category.name)
+    top_authors = (
+        query.with_entities(
+            literal("author").label("facet"), Book.author_id.label("value"), Author.name.label("label"), count
+        )
+        .group_by(Book.author_id, Author.name)
+        .order_by(count.desc())
+        .limit(FACET_AUTHOR_LIMIT)
+        .subquery()
+    )
+    by_availability = query.with_entities(
+        literal("available").label("facet"), available.label("value"), literal("").label("label"), count
+    ).group_by(available)
+
+    facets = {"categories": [], "authors": [], "availability": {"available": 0, "unavailable": 0}}
+    rows = by_category.union_all(db.session.query(top_authors), by_availability).all()
+    for facet, value, label, total in rows:
+        if facet == "category":
+            facets["categories"].append({"id": value, "name": label, "count": total})
+        elif facet == "author":
+            facets["authors"].append({"id": value, "name": label, "count": total})
+        else:
+            facets["availability"]["available" if value else "unavailable"] = total
+    facets["categories"].sort(key=lambda item: -item["count"])
+    facets["authors"].sort(key=lambda item: -item["count"])
+    return facets
+
+
+# Akış (NDJSON) modunda veritabanından tek seferde okunan / istemciye yazılan satır sayısı
+STREAM_CHUNK_SIZE = 500
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+
+
+def _wants_stream() -> bool:
+    """İstemci NDJSON akışı istiyorsa (Accept başlığı veya ?stream=1) True döndürür."""
+    if request.args.get("stream") in ("1", "true"):
+        return True
+    # Eşitlikte (örn: */*) ilk sıradaki JSON seçilir; NDJSON sadece açıkça istenirse
+    return request.accept_mimetypes.best_match(["application/json", NDJSON_MIMETYPE]) == NDJSON_MIMETYPE
+
+
+def _stream_catalog(rows):
+    """
+    Katalog satırlarını NDJSON (satır başına bir JSON nesnesi) olarak üretir.
+
+    Satırlar STREAM_CHUNK_SIZE'lık parçalar halinde yazılır; bellekte hiçbir
+    zaman tüm liste tutulmaz.
+
+    Args:
+        rows: _catalog_query satırları üreten iterable
+
+    Yields:
+        str: Bir veya daha fazla NDJSON satırı
+    """
+    buffer = []
+    for row in rows:
+        buffer.append(json.dumps(_book_row_to_dict(row), ensure_ascii=False))
+        if len(buffer) >= STREAM_CHUNK_SIZE:
+            yield "\n".join(buffer) + "\n"
+            buffer = []
+    if buffer:
+        yield "\n".join(buffer) + "\n"
+
+
+def _ranked_rows(query, ranked):
+    """
+    Trigram adaylarını skor sırasıyla, PK ile parça parça okuyarak üretir.
+
+    Args:
+        query: Filtrelenmiş katalog sorgusu
+        ranked: [(kitap_id, skor), ...] skor sırasında
+
+    Yields:
+        _catalog_query satırları
+    """
+    scores = dict(ranked)
+    for start in range(0, len(ranked), STREAM_CHUNK_SIZE):
+        chunk = [book_id for book_id, _ in ranked[start:start + STREAM_CHUNK_SIZE]]
+        rows = query.filter(Book.id.in_(chunk)).all()
+        rows.sort(key=lambda row: (-scores[row.id], row.id))
+        yield from rows
+
+
+# Sayfalamada izin verilen sıralama anahtarları
+# (sütun, cursor değerini sütun tipine çeviren fonksiyon)
+SORT_KEYS = {
+    "id": (Book.id, int),
+    "title": (Book.title, str),
+    "created_at": (Book.created_at, datetime.fromisoformat),
+}
 
 
 @book_bp.get("/")
+@query_budget(6)
 def list_books():
     """
-    Kitapları listeler ve arama yapar.
+    Kitapları sayfa sayfa listeler ve arama yapar.
     
-    Endpoint: GET /api/books?q=arama_terimi
+    Endpoint: GET /api/books?q=arama_terimi&limit=50&cursor=...
     
     Query Parameters:
         q (optional): Arama terimi (kitap adı, yazar adı veya kategori adı)
+        category_id (optional): Sadece bu kategorideki kitaplar
+        author_id (optional): Sadece bu yazarın kitapları
+        available (optional): true ise müsait kopyası olan, false ise olmayan kitaplar
+        created_after (optional): Bu tarihten (ISO 8601) sonra eklenen kitaplar
+        facets (optional): 1 ise yanıta kategori/yazar/müsaitlik sayıları eklenir
+        stream (optional): 1 ise sonuçlar NDJSON olarak akıtılır
+            (Accept: application/x-ndjson başlığı ile aynı)
+        limit (optional): Sayfa boyutu (varsayılan: 50, en fazla: 200)
+        cursor (optional): Önceki yanıttaki next_cursor değeri
+        sort (optional): Sıralama anahtarı: id, title, created_at (varsayılan: id)
+        order (optional): asc veya desc (varsayılan: asc)
+        mode (optional): Arama modu (varsayılan: CATALOG_SEARCH_MODE ayarı)
+            - fulltext: book_search FULLTEXT indeksi, alaka düzeyine göre sıralı
+            - like: Eski '%q%' taraması (başlık, yazar, kategori)
+            - trigram: Bellek içi, yazım hatasına toleranslı trigram indeksi
+              ("orhn pamk" -> Orhan Pamuk), benzerlik skoruna göre sıralı.
+              İndeks henüz kurulmadıysa (kapalı veya ilk kurulum sürüyor)
+              fulltext kullanılır; o aramanın sonraki sayfaları da fulltext'tir
     
     Özellikler:
+        - Keyset sayfalama: Her sayfa indeksli sıralama anahtarından devam eder,
+          OFFSET kullanılmaz; N. sayfa 1. sayfa kadar ucuzdur
+        - fulltext modunda arama Türkçe harf katlamalıdır (İ/ı/I/i, ş/s, ...)
+          ve sonuçlar alaka düzeyine göre sıralanır (sort parametresi yok sayılır)
         - Giriş yapmış kullanıcılar için: Ödünç aldıkları kitaplar listede görünmez
         - Admin kullanıcılar için: Tüm kitaplar görünür
     
+    Akış modu:
+        Cursor'dan (yoksa baştan) itibaren tüm sonuç kümesi, satır başına bir
+        kitap olacak şekilde NDJSON olarak yazılır; limit ve facets yok sayılır.
+        Satırlar sunucu taraflı cursor (yield_per) ile parça parça okunduğu
+        için bellek kullanımı katalog boyutundan bağımsızdır ve istemci ilk
+        satırları hemen işlemeye başlayabilir.
+    
+    Koşullu istek:
+        Yanıt güçlü bir ETag taşır. If-None-Match eşleşirse (katalog ve
+        kullanıcının ödünçleri değişmediyse) liste sorguları çalıştırılmaz.
+    
     Returns:
-        200: Kitap listesi (JSON array)
+        200: {"items": [...], "next_cursor": "..." | null, "facets": {...} (facets=1 ise)}
+             veya akış modunda application/x-ndjson gövdesi
+        304: Değişiklik yok (If-None-Match eşleşti)
+        400: Geçersiz limit, sıralama, arama modu, filtre veya cursor
     """
-    from src.models import Loan
-    import jwt
-    import os
-    
     q = request.args.get("q", "").strip()
-    query = Book.query.join(Author).join(Category)
-    if q:
+    mode = request.args.get("mode") or current_app.config.get("CATALOG_SEARCH_MODE", "fulltext")
+    if mode not in ("fulltext", "like", "trigram"):
+        return jsonify({"message": f"Geçersiz arama modu: {mode}"}), 400
+    sort = request.args.get("sort", "id")
+    descending = request.args.get("order", "asc").lower() == "desc"
+    if sort not in SORT_KEYS:
+        return jsonify({"message": f"Geçersiz sıralama: {sort}"}), 400
+    sort_column, parse_value = SORT_KEYS[sort]
+
+    try:
+        limit = parse_limit(request.args.get("limit"))
+    except ValueError:
+        return jsonify({"message": "limit bir tam sayı olmalıdır"}), 400
+
+    try:
+        filters = _parse_catalog_filters(request.args)
+    except ValueError as e:
+        return jsonify({"message": f"Geçersiz filtre: {e}"}), 400
+
+    if q and mode == "trigram":
+        # İndeks hazır değilse boş sonuç yerine FULLTEXT yoluna düş (kurulum arka planda başlar).
+        # FULLTEXT sayfasının cursor'ı ile gelen istek, indeks arada hazır olsa da aynı yolda devam eder
+        book_index.rebuild_if_stale(current_app._get_current_object())
+        if not book_index.ready or _is_cursor_for(request.args.get("cursor"), "relevance"):
+            mode = "fulltext"
+
+    # Kullanıcı giriş yapmışsa, ödünç aldığı kitaplar listede görünmez
+    user_id = optional_jwt_user_id()
+
+    # Katalog (ve giriş yapmışsa kullanıcının ödünçleri) değişmediyse 304 dön
+    scopes = [CATALOG_SCOPE] + ([user_scope(user_id)] if user_id else [])
+    # Accept başlığı yanıt biçimini değiştirdiği için ETag'e dahil edilir
+    stream = _wants_stream()
+    # Kullanılan arama modu da dahil: indeks hazır olunca FULLTEXT yanıtı 304 ile sürmesin
+    etag = compute_etag(scopes, user_id, stream, mode if q else "")
+    if etag_matches(etag):
+        return not_modified(etag)
+
+    query = _catalog_query().filter(*filters)
+    if user_id:
+        # Anti-join: kullanıcının aktif ödüncü olan kitaplar SQL'de elenir,
+        # böylece sayfalar her zaman tam boyutta döner
+        # (idx_loans_user_status_book tüm koşulları içerir: her kitap için tablo
+        # satırına gitmeyen tek indeks araması)
+        query = query.filter(
+            ~exists().where(
+                Loan.book_id == Book.id,
+                Loan.user_id == user_id,
+                Loan.status.in_(ACTIVE_LOAN_STATUSES),
+                Loan.return_date.is_(None),
+            )
+        )
+    relevance = None
+    ranked = None
+    if q and mode == "trigram":
+        # Adaylar bellek içi indeksten gelir; satırlar sadece PK ile okunur
+        ranked = book_index.search(q, limit=TRIGRAM_MAX_CANDIDATES)
+        sort = "score"
+    elif q and mode == "fulltext":
+        # Katlanınca boş kalan terim (örn: sadece noktalama) aramasız listelenir
+        condition = search_condition(q)
+        if condition is not None:
+            # Eşleşme boolean modla, sıralama alaka düzeyiyle: (relevance azalan, id artan)
+            relevance = search_relevance(q)
+            query = (
+                query.join(BookSearch, BookSearch.book_id == Book.id)
+                .add_columns(relevance.label("relevance"))
+                .filter(condition)
+            )
+            sort = "relevance"
+    elif q:
         like = f"%{q}%"
         query = query.filter(
             or_(Book.title.ilike(like), Author.name.ilike(like), Category.name.ilike(like))
         )
+
+    # Facet'ler sayfaya değil, filtrelenmiş sonuç kümesinin tamamına göre hesaplanır
+    facets = None
+    if request.args.get("facets") in ("1", "true") and not stream:
+        facet_query = query if ranked is None else query.filter(Book.id.in_([book_id for book_id, _ in ranked]))
+        facets = _catalog_facets(facet_query)
+
+    # Cursor varsa son satırın sıralama anahtarından devam et
+    cursor = request.args.get("cursor")
+    if cursor:
+        try:
+            position = decode_cursor(cursor, sort)
+            if ranked is not None:
+                last_score, last_id = float(position["v"]), position["id"]
+                ranked = [
+                    (book_id, score) for book_id, score in ranked
+                    if score < last_score or (score == last_score and book_id > last_id)
+                ]
+            elif relevance is not None:
+                query = query.filter(relevance_after(relevance, float(position["v"]), position["id"]))
+            else:
+                last_value = parse_value(position["v"])
+                query = query.filter(keyset_filter(sort_column, Book.id, last_value, position["id"], descending))
+        except (InvalidCursor, TypeError, ValueError):
+            return jsonify({"message": "Geçersiz cursor"}), 400
     
-    # Kullanıcı giriş yapmışsa, ödünç aldığı kitapları filtrele
-    user_id = None
-    try:
-        auth_header = request.headers.get("Authorization", "")
-        if auth_header.startswith("Bearer "):
-            token = auth_header.split()[1]
-            # Token'ı decode et
-            try:
-                secret_key = os.getenv("SECRET_KEY", "dev-secret-change-me")
-                payload = jwt.decode(token, secret_key, algorithms=["HS256"])
-                user_id = payload.get("user_id") or int(payload.get("sub", 0))
-            except (jwt.InvalidTokenError, jwt.ExpiredSignatureError, ValueError):
-                pass
-    except Exception:
-        pass
-    
-    books = query.all()
-    result = []
-    
-    # Kullanıcının aktif ödünçlerini al (borrowed, requested veya approved)
-    borrowed_book_ids = set()
-    if user_id:
-        active_loans = Loan.query.filter_by(user_id=user_id).filter(
-            Loan.status.in_(["borrowed", "requested", "approved"])
-        ).all()
-        borrowed_book_ids = {loan.book_id for loan in active_loans}
-    
-    for b in books:
-        # Kullanıcı bu kitabı ödünç aldıysa listeye ekleme
-        if b.id in borrowed_book_ids:
-            continue
-            
-        result.append(
-            {
-                "id": b.id,
-                "title": b.title,
-                "isbn": b.isbn,
-                "author": b.author.name,
-                "author_id": b.author_id,
-                "category": b.category.name,
-                "category_id": b.category_id,
-                "total_copies": b.total_copies,
-                "available_copies": b.available_copies,
-            }
-        )
-    return jsonify(result)
+    if stream:
+        if ranked is not None:
+            rows = _ranked_rows(query, ranked)
+        else:
+            if relevance is not None:
+                order = [relevance.desc(), Book.id.asc()]
+            else:
+                order = keyset_order(sort_column, Book.id, descending)
+            # yield_per: sunucu taraflı cursor (stream_results) ile parça parça oku
+            rows = query.order_by(*order).yield_per(STREAM_CHUNK_SIZE)
+        response = Response(stream_with_context(_stream_catalog(rows)), mimetype=NDJSON_MIMETYPE)
+        # Ters vekil sunucunun (nginx) yanıtı tamponlamasını engelle
+        response.headers["X-Accel-Buffering"] = "no"
+        response.vary.add("Accept")
+        return with_etag(response, etag)
+
+    # Bir fazla satır çek: varsa sonraki sayfa mevcuttur
+    if ranked is not None:
+        # Adayları sırayla parça parça oku; anti-join'e takılanlar yüzünden
+        # sayfa eksik kalmasın
+        scores = dict(ranked)
+        rows = []
+        for start in range(0, len(ranked), limit + 1):
+            chunk = [book_id for book_id, _ in ranked[start:start + limit + 1]]
+            rows += query.filter(Book.id.in_(chunk)).all()
+            if len(rows) > limit:
+                break
+        rows.sort(key=lambda row: (-scores[row.id], row.id))
+    elif relevance is not None:
+        rows = query.order_by(relevance.desc(), Book.id.asc()).limit(limit + 1).all()
+    else:
+        rows = query.order_by(*keyset_order(sort_column, Book.id, descending)).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    result = [_book_row_to_dict(row) for row in rows]
+
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        last_value = scores[last.id] if ranked is not None else getattr(last, sort)
+        next_cursor = encode_cursor(sort, last_value, last.id)
+    body = {"items": result, "next_cursor": next_cursor}
+    if facets is not None:
+        body["facets"] = facets
+    response = jsonify(body)
+    response.vary.add("Accept")
+    return with_etag(response, etag)
 
 
 @book_bp.post("/")
@@ -131,7 +499,11 @@ def create_book():
         available_copies=data.get("available_copies", data["total_copies"]),
     )
     db.session.add(book)
+    db.session.flush()  # ID'yi almak için
+    refresh_book_search([book.id])
+    bump_versions(CATALOG_SCOPE)
     db.session.commit()
+    book_index.put_book(book.id, book.title, book.author_id, book.category_id)
     return jsonify({"id": book.id}), 201
 
 
@@ -166,7 +538,20 @@ def update_book(book_id: int):
         if field in data:
             setattr(book, field, data[field])
 
+    # Parçalı stokta yeni müsait kopya sayısı parçalara yeniden dağıtılır
+    if book.stock_stripes and "available_copies" in data:
+        stripes, book.stock_stripes = book.stock_stripes, 0
+        db.session.flush()
+        set_stripes(book.id, stripes)
+
+    # Arama metnini etkileyen alanlar değiştiyse book_search satırını yenile
+    search_changed = any(field in data for field in ("title", "author_id", "category_id"))
+    if search_changed:
+        refresh_book_search([book.id])
+    bump_versions(CATALOG_SCOPE)
     db.session.commit()
+    if search_changed:
+        book_index.put_book(book.id, book.title, book.author_id, book.category_id)
     return jsonify({"message": "updated"})
 
 
@@ -185,8 +570,11 @@ def delete_book(book_id: int):
         403: Admin yetkisi gerekli
     """
     book = Book.query.get_or_404(book_id)
+    remove_book_search(book.id)
     db.session.delete(book)
+    bump_versions(CATALOG_SCOPE)
     db.session.commit()
+    book_index.remove_book(book_id)
     return jsonify({"message": "deleted"})
 
 
@@ -3,14 +3,19 @@
 Kitap ödünç alma, iade, istek onaylama/reddetme işlemlerini yönetir.
 """
 
-from datetime import date, timedelta
+from datetime import date, datetime, timedelta
 
 from flask import Blueprint, jsonify, request, g
-from sqlalchemy import text
+from sqlalchemy import and_, case, or_, select, text, update
 
 from src.decorators import jwt_required
 from src.db import db
-from src.models import Loan, Book, Penalty
+from src.eligibility import active_block, refresh_blocked_until
+from src.etag import CATALOG_SCOPE, bump_versions, compute_etag, etag_matches, not_modified, user_scope, with_etag
+from src.inventory import return_copy, take_copy
+from src.models import Loan, Book, Penalty, User
+from src.pagination import InvalidCursor, decode_cursor, encode_cursor, keyset_filter, keyset_order, parse_limit
+from src.profiler import query_budget
 
 
 # Ödünç alma yönetimi blueprint'i
@@ -19,6 +24,7 @@ loan_bp = Blueprint("loans", __name__)
 
 
 @loan_bp.post("/")
+@query_budget(8)
 @jwt_required()
 def request_loan():
     """
@@ -27,7 +33,7 @@ def request_loan():
     Endpoint: POST /api/loans
     
     İşleyiş:
-        - Admin: Direkt ödünç alır (status="borrowed", kitap sayısı azalır)
+        - Admin: Direkt ödünç alır (status="borrowed", kitap sayısı koşullu UPDATE ile atomik olarak azalır)
         - Öğrenci/Staff: İstek gönderir (status="requested", kitap sayısı azalmaz)
     
     Request Body:
@@ -51,23 +57,26 @@ def request_loan():
             return jsonify({"message": "book_id is required"}), 400
 
         book = Book.query.get_or_404(book_id)
-        if book.available_copies <= 0:
+        # Parçalı stokta available_copies anlık görüntüdür; kesin kontrol take_copy'dedir
+        if book.available_copies <= 0 and not book.stock_stripes:
             return jsonify({"message": "Bu kitaptan müsait kopya yok"}), 400
 
-        # Aktif ceza kontrolü (ceza bitiş tarihi bugünden sonra ise)
-        active_penalty = Penalty.query.filter(
-            Penalty.user_id == g.current_user_id,
-            Penalty.penalty_end_date > date.today()
-        ).first()
+        # Aktif ceza kontrolü (users.blocked_until: birincil anahtar okuması)
+        penalty_end_date = active_block(g.current_user_id)
         
-        if active_penalty:
-            days_remaining = (active_penalty.penalty_end_date - date.today()).days
+        if penalty_end_date:
+            days_remaining = (penalty_end_date - date.today()).days
             return jsonify({
-                "message": f"Ceza nedeniyle kitap alamazsınız. Ceza {days_remaining} gün sonra bitecek. (Bitiş: {active_penalty.penalty_end_date.isoformat()})"
+                "message": f"Ceza nedeniyle kitap alamazsınız. Ceza {days_remaining} gün sonra bitecek. (Bitiş: {penalty_end_date.isoformat()})"
             }), 403
 
         # Admin direkt ödünç alabilir
         if g.current_user_role == "admin":
+            # Kopya koşullu UPDATE ile atomik olarak düşülür; eşzamanlı istekler
+            # son kopyayı iki kez veremez
+            if not take_copy(book.id, book.stock_stripes):
+                db.session.rollback()
+                return jsonify({"message": "Bu kitaptan müsait kopya yok"}), 400
             loan = Loan(
                 user_id=g.current_user_id,
                 book_id=book_id,
@@ -75,8 +84,8 @@ def request_loan():
                 due_date=date.today() + timedelta(days=days),
                 status="borrowed",
             )
-            book.available_copies -= 1
             db.session.add(loan)
+            bump_versions(CATALOG_SCOPE, user_scope(g.current_user_id))
             db.session.commit()
             return jsonify({
                 "id": loan.id,
@@ -103,6 +112,7 @@ def request_loan():
             status="requested",  # İstek durumu
         )
         db.session.add(loan)
+        bump_versions(user_scope(g.current_user_id))
         db.session.commit()
         return jsonify({
             "id": loan.id,
@@ -116,6 +126,7 @@ def request_loan():
 
 
 @loan_bp.post("/<int:loan_id>/return")
+@query_budget(10)
 @jwt_required()
 def return_book(loan_id: int):
     """
@@ -126,7 +137,7 @@ def return_book(loan_id: int):
     İşleyiş:
         - İade tarihi kaydedilir
         - Gecikmiş ise status="late", değilse status="returned"
-        - Kitap mevcut kopya sayısı artırılır
+        - Kitap mevcut kopya sayısı artırılır (atomik UPDATE ile)
         - Gecikme varsa otomatik ceza oluşturulur (trigger ile)
     
     Returns:
@@ -144,9 +155,18 @@ def return_book(loan_id: int):
 
     # Stored procedure alternatifi: CALL sp_return_book(:loan_id)
     return_today = date.today()
-    loan.return_date = return_today
-    if return_today > loan.due_date:
-        loan.status = "late"
+    status = "late" if return_today > loan.due_date else "returned"
+    # Koşullu UPDATE: eşzamanlı iki iade isteğinden sadece biri kopyayı geri ekler
+    claimed = db.session.execute(
+        update(Loan)
+        .where(Loan.id == loan.id, Loan.return_date.is_(None))
+        .values(return_date=return_today, status=status)
+    ).rowcount
+    if not claimed:
+        db.session.rollback()
+        return jsonify({"message": "Already returned"}), 400
+
+    if status == "late":
         # Gecikme varsa ceza oluştur (1 ay kitap alamama)
         # Trigger otomatik oluşturur, ama Python'da da kontrol edelim
         existing_penalty = Penalty.query.filter_by(loan_id=loan.id).first()
@@ -160,99 +180,299 @@ def return_book(loan_id: int):
                 penalty_end_date=penalty_end_date
             )
             db.session.add(penalty)
-    else:
-        loan.status = "returned"
+        # Ceza Python'da veya trigger ile oluşturulmuş olabilir; etkin ceza tarihi yeniden hesaplanır
+        refresh_blocked_until(loan.user_id)
 
-    book = Book.query.get(loan.book_id)
-    if book:
-        book.available_copies += 1
+    stripes = db.session.query(Book.stock_stripes).filter(Book.id == loan.book_id).scalar()
+    if stripes is not None:
+        return_copy(loan.book_id, stripes)
 
+    bump_versions(CATALOG_SCOPE, user_scope(loan.user_id))
     db.session.commit()
     return jsonify({"message": "returned"})
 
 
+# Kitabı hâlâ dışarıda olan veya onay bekleyen ödünçler ("aktif"); gerisi geçmiştir
+# ("late" sadece return_date boşken, yani kitap hâlâ dışarıdayken aktiftir)
+LOAN_OUTSTANDING = or_(
+    Loan.status.in_(("requested", "approved", "borrowed")),
+    and_(Loan.status == "late", Loan.return_date.is_(None)),
+)
+
+# Geçerli ödünç durumları (status filtresi için)
+LOAN_STATUSES = ("requested", "approved", "borrowed", "returned", "late", "rejected")
+
+
+def _borrower_history_query(user_id: int, today: date):
+    """
+    Kullanıcının ödünç ve ceza listeleri için ortak projeksiyon: loans ⨝ books ⟕ penalties.
+
+    Kitap adı ve ceza bilgileri aynı SELECT içinde gelir; ödünç ve cezanın
+    aktif olup olmadığı da SQL'de hesaplanır (bugünün tarihi tek parametredir).
+
+    Args:
+        user_id: Kullanıcı ID
+        today: Cezanın aktifliği için bugünün tarihi
+
+    Returns:
+        Query: Ödünç, kitap adı ve ceza sütunlarını döndüren sorgu
+    """
+    return (
+        db.session.query(
+            Loan.id,
+            Loan.book_id,
+            Book.title.label("book_title"),
+            Loan.loan_date,
+            Loan.due_date,
+            Loan.return_date,
+            Loan.status,
+            Loan.created_at,
+            case((LOAN_OUTSTANDING, True), else_=False).label("is_active"),
+            Penalty.id.label("penalty_id"),
+            Penalty.days_late,
+            Penalty.penalty_end_date,
+            Penalty.created_at.label("penalty_created_at"),
+            case((Penalty.penalty_end_date > today, True), else_=False).label("penalty_active"),
+        )
+        .select_from(Loan)
+        .join(Book, Book.id == Loan.book_id)
+        .outerjoin(Penalty, Penalty.loan_id == Loan.id)
+        .filter(Loan.user_id == user_id)
+    )
+
+
+def _parse_history_filters(args, date_column, active_condition) -> list:
+    """
+    Ödünç/ceza geçmişi filtrelerini SQL koşullarına çevirir.
+
+    Args:
+        args: request.args
+        date_column: from / to tarih aralığının uygulanacağı sütun
+        active_condition: scope=active için koşul (scope=history bunun tersidir)
+
+    Returns:
+        list: query.filter() için koşullar
+
+    Raises:
+        ValueError: Parametre değeri geçersizse
+    """
+    conditions = []
+    scope = args.get("scope", "")
+    if scope == "active":
+        conditions.append(active_condition)
+    elif scope == "history":
+        conditions.append(~active_condition)
+    elif scope:
+        raise ValueError("scope active veya history olmalıdır")
+    try:
+        if args.get("from"):
+            conditions.append(date_column >= date.fromisoformat(args["from"]))
+        if args.get("to"):
+            conditions.append(date_column <= date.fromisoformat(args["to"]))
+    except ValueError:
+        raise ValueError("from / to YYYY-MM-DD biçiminde olmalıdır") from None
+    return conditions
+
+
+def _penalty_to_dict(end_date: date, days_late: int, is_active: bool, today: date) -> dict:
+    """Ceza alanlarını API yanıtı sözlüğüne çevirir (kalan gün sadece aktif cezada hesaplanır)."""
+    return {
+        "days_late": days_late,
+        "penalty_end_date": end_date.isoformat(),
+        "days_remaining": (end_date - today).days if is_active else 0,
+        "is_active": is_active,
+    }
+
+
 @loan_bp.get("/my")
+@query_budget(2)
 @jwt_required()
 def my_loans():
     """
-    Kullanıcının kendi ödünç istekleri ve ödünçlerini listeler.
+    Kullanıcının kendi ödünç istekleri ve ödünçlerini en yeniden başlayarak sayfa sayfa listeler.
+    
+    Endpoint: GET /api/loans/my?limit=50&cursor=...
+    
+    Query Parameters:
+        status (optional): Virgülle ayrılmış durumlar (örn: borrowed,late)
+        scope (optional): active (onay bekleyen / kitabı dışarıda) veya history (kapanmış)
+        from (optional): Bu tarihten (YYYY-MM-DD) itibaren alınan ödünçler (loan_date)
+        to (optional): Bu tarihe kadar alınan ödünçler (loan_date)
+        limit (optional): Sayfa boyutu (varsayılan: 50, en fazla: 200)
+        cursor (optional): Önceki yanıttaki next_cursor değeri
     
-    Endpoint: GET /api/loans/my
+    Özellikler:
+        - Kitap adı ve ceza bilgileri tek SELECT içinde join ile gelir
+        - (created_at, id) üzerinden azalan keyset sayfalama; idx_loans_user_created
+          indeksiyle uzun geçmişi olan kullanıcılarda da her sayfa indeksten okunur
     
     Returns:
-        200: Ödünç listesi (durum, tarihler, ceza bilgileri dahil)
+        200: {"items": [...], "next_cursor": "..." | null} (durum, tarihler, ceza bilgileri dahil)
+        304: Değişiklik yok (If-None-Match eşleşti)
+        400: Geçersiz filtre, limit veya cursor
         401: Yetkisiz erişim
     """
-    loans = (
-        Loan.query.filter_by(user_id=g.current_user_id)
-        .order_by(Loan.created_at.desc())
+    try:
+        limit = parse_limit(request.args.get("limit"))
+    except ValueError:
+        return jsonify({"message": "limit bir tam sayı olmalıdır"}), 400
+    try:
+        conditions = _parse_history_filters(request.args, Loan.loan_date, LOAN_OUTSTANDING)
+    except ValueError as e:
+        return jsonify({"message": f"Geçersiz filtre: {e}"}), 400
+    statuses = [status for status in request.args.get("status", "").split(",") if status]
+    if any(status not in LOAN_STATUSES for status in statuses):
+        return jsonify({"message": f"Geçersiz filtre: status şunlardan biri olmalıdır: {', '.join(LOAN_STATUSES)}"}), 400
+    if statuses:
+        conditions.append(Loan.status.in_(statuses))
+
+    cursor = request.args.get("cursor")
+    if cursor:
+        try:
+            position = decode_cursor(cursor, "created_at")
+            conditions.append(keyset_filter(
+                Loan.created_at, Loan.id, datetime.fromisoformat(position["v"]), position["id"], descending=True
+            ))
+        except (InvalidCursor, TypeError, ValueError):
+            return jsonify({"message": "Geçersiz cursor"}), 400
+
+    # Kullanıcının ödünç/ceza kayıtları değişmediyse liste sorgusu çalıştırılmaz
+    etag = compute_etag([user_scope(g.current_user_id)], g.current_user_id)
+    if etag_matches(etag):
+        return not_modified(etag)
+
+    today = date.today()
+    rows = (
+        _borrower_history_query(g.current_user_id, today)
+        .filter(*conditions)
+        .order_by(*keyset_order(Loan.created_at, Loan.id, descending=True))
+        .limit(limit + 1)
         .all()
     )
-    result = []
-    for l in loans:
-        penalty = None
-        if l.penalty:
-            days_remaining = (l.penalty.penalty_end_date - date.today()).days if l.penalty.penalty_end_date > date.today() else 0
-            is_active = l.penalty.penalty_end_date > date.today()
-            penalty = {
-                "days_late": l.penalty.days_late,
-                "penalty_end_date": l.penalty.penalty_end_date.isoformat(),
-                "days_remaining": days_remaining,
-                "is_active": is_active,
-            }
-        result.append(
-            {
-                "id": l.id,
-                "book_id": l.book_id,
-                "book_title": l.book.title if l.book else None,
-                "loan_date": l.loan_date.isoformat(),
-                "due_date": l.due_date.isoformat(),
-                "return_date": l.return_date.isoformat() if l.return_date else None,
-                "status": l.status,
-                "penalty": penalty,
-            }
-        )
-    return jsonify(result)
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    result = [
+        {
+            "id": row.id,
+            "book_id": row.book_id,
+            "book_title": row.book_title,
+            "loan_date": row.loan_date.isoformat(),
+            "due_date": row.due_date.isoformat(),
+            "return_date": row.return_date.isoformat() if row.return_date else None,
+            "status": row.status,
+            "is_active": bool(row.is_active),
+            "penalty": (
+                _penalty_to_dict(row.penalty_end_date, row.days_late, bool(row.penalty_active), today)
+                if row.penalty_id is not None else None
+            ),
+        }
+        for row in rows
+    ]
+    next_cursor = encode_cursor("created_at", rows[-1].created_at, rows[-1].id) if has_more else None
+    return with_etag(jsonify({"items": result, "next_cursor": next_cursor}), etag)
 
 
 @loan_bp.get("/requests")
+@query_budget(3)
 @jwt_required(role="admin")
 def list_requests():
     """
-    Tüm bekleyen ödünç isteklerini listeler (sadece admin).
+    Bekleyen ödünç isteklerini en eskiden başlayarak sayfa sayfa listeler (sadece admin).
+    
+    Endpoint: GET /api/loans/requests?limit=50&cursor=...
     
-    Endpoint: GET /api/loans/requests
+    Query Parameters:
+        book_id (optional): Sadece bu kitaba ait istekler
+        user_id (optional): Sadece bu kullanıcının istekleri
+        min_age_days (optional): En az bu kadar gündür bekleyen istekler
+        max_age_days (optional): En fazla bu kadar gündür bekleyen istekler
+        limit (optional): Sayfa boyutu (varsayılan: 50, en fazla: 200)
+        cursor (optional): Önceki yanıttaki next_cursor değeri
+    
+    Özellikler:
+        - Kullanıcı ve kitap bilgileri aynı SELECT içinde join ile gelir
+          (istek başına ek sorgu yapılmaz)
+        - (created_at, id) üzerinden keyset sayfalama; idx_loans_status_created
+          indeksiyle büyük kuyruklarda da her sayfa indeksten okunur
     
     Returns:
-        200: Bekleyen istek listesi (kullanıcı, kitap, tarih bilgileri dahil)
+        200: {"items": [...], "next_cursor": "..." | null}
+        400: Geçersiz filtre, limit veya cursor
         401: Yetkisiz erişim
         403: Admin yetkisi gerekli
     """
-    requests = (
-        Loan.query.filter_by(status="requested")
-        .order_by(Loan.created_at.asc())
-        .all()
-    )
-    result = []
-    for req in requests:
-        result.append(
-            {
-                "id": req.id,
-                "user_id": req.user_id,
-                "user_name": req.user.full_name if req.user else None,
-                "user_email": req.user.email if req.user else None,
-                "book_id": req.book_id,
-                "book_title": req.book.title if req.book else None,
-                "book_available": req.book.available_copies if req.book else 0,
-                "request_date": req.loan_date.isoformat(),
-                "due_date": req.due_date.isoformat(),
-                "created_at": req.created_at.isoformat(),
-            }
+    try:
+        limit = parse_limit(request.args.get("limit"))
+        book_id, user_id, min_age, max_age = (
+            int(request.args[name]) if request.args.get(name) else None
+            for name in ("book_id", "user_id", "min_age_days", "max_age_days")
+        )
+    except ValueError:
+        return jsonify({"message": "limit ve filtreler tam sayı olmalıdır"}), 400
+
+    query = (
+        db.session.query(
+            Loan.id,
+            Loan.user_id,
+            User.full_name.label("user_name"),
+            User.email.label("user_email"),
+            Loan.book_id,
+            Book.title.label("book_title"),
+            Book.available_copies.label("book_available"),
+            Loan.loan_date,
+            Loan.due_date,
+            Loan.created_at,
         )
-    return jsonify(result)
+        .select_from(Loan)
+        .outerjoin(User, User.id == Loan.user_id)
+        .outerjoin(Book, Book.id == Loan.book_id)
+        .filter(Loan.status == "requested")
+    )
+    if book_id is not None:
+        query = query.filter(Loan.book_id == book_id)
+    if user_id is not None:
+        query = query.filter(Loan.user_id == user_id)
+    now = datetime.utcnow()
+    if min_age is not None:
+        query = query.filter(Loan.created_at <= now - timedelta(days=min_age))
+    if max_age is not None:
+        query = query.filter(Loan.created_at >= now - timedelta(days=max_age))
+
+    # Cursor varsa son satırın (created_at, id) anahtarından devam et
+    cursor = request.args.get("cursor")
+    if cursor:
+        try:
+            position = decode_cursor(cursor, "created_at")
+            last_value = datetime.fromisoformat(position["v"])
+        except (InvalidCursor, TypeError, ValueError):
+            return jsonify({"message": "Geçersiz cursor"}), 400
+        query = query.filter(keyset_filter(Loan.created_at, Loan.id, last_value, position["id"]))
+
+    # Bir fazla satır çek: varsa sonraki sayfa mevcuttur
+    rows = query.order_by(*keyset_order(Loan.created_at, Loan.id)).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    result = [
+        {
+            "id": row.id,
+            "user_id": row.user_id,
+            "user_name": row.user_name,
+            "user_email": row.user_email,
+            "book_id": row.book_id,
+            "book_title": row.book_title,
+            "book_available": row.book_available or 0,
+            "request_date": row.loan_date.isoformat(),
+            "due_date": row.due_date.isoformat(),
+            "created_at": row.created_at.isoformat(),
+        }
+        for row in rows
+    ]
+    next_cursor = encode_cursor("created_at", rows[-1].created_at, rows[-1].id) if has_more else None
+    return jsonify({"items": result, "next_cursor": next_cursor})
 
 
 @loan_bp.post("/<int:loan_id>/approve")
+@query_budget(8)
 @jwt_required(role="admin")
 def approve_loan(loan_id: int):
     """
@@ -262,7 +482,7 @@ def approve_loan(loan_id: int):
     
     İşleyiş:
         - İstek durumu "requested" -> "borrowed" olur
-        - Kitap mevcut kopya sayısı 1 azalır
+        - Kitap mevcut kopya sayısı 1 azalır (koşullu UPDATE ile atomik)
         - Ödünç alma tarihi güncellenir
     
     Returns:
@@ -281,26 +501,34 @@ def approve_loan(loan_id: int):
     if not book:
         return jsonify({"message": "Kitap bulunamadı"}), 404
     
-    if book.available_copies <= 0:
+    if book.available_copies <= 0 and not book.stock_stripes:
         return jsonify({"message": "Bu kitaptan müsait kopya kalmamış"}), 400
     
     # Aktif ceza kontrolü (kullanıcının cezası varsa kitap alamaz)
-    active_penalty = Penalty.query.filter(
-        Penalty.user_id == loan.user_id,
-        Penalty.penalty_end_date > date.today()
-    ).first()
+    penalty_end_date = active_block(loan.user_id)
     
-    if active_penalty:
-        days_remaining = (active_penalty.penalty_end_date - date.today()).days
+    if penalty_end_date:
+        days_remaining = (penalty_end_date - date.today()).days
         return jsonify({
-            "message": f"Kullanıcının aktif cezası var. {days_remaining} gün sonra kitap alabilir. (Ceza bitiş: {active_penalty.penalty_end_date.isoformat()})"
+            "message": f"Kullanıcının aktif cezası var. {days_remaining} gün sonra kitap alabilir. (Ceza bitiş: {penalty_end_date.isoformat()})"
         }), 403
     
-    # İsteği onayla: kitabı azalt ve durumu güncelle
-    book.available_copies -= 1
-    loan.status = "borrowed"
-    loan.loan_date = date.today()  # Onaylandığı tarih
+    # Kopya atomik olarak düşülür; son kopya iki isteğe birden verilemez
+    if not take_copy(book.id, book.stock_stripes):
+        db.session.rollback()
+        return jsonify({"message": "Bu kitaptan müsait kopya kalmamış"}), 400
+
+    # İsteği onayla: durum koşullu UPDATE ile değişir (aynı istek iki kez onaylanamaz)
+    claimed = db.session.execute(
+        update(Loan)
+        .where(Loan.id == loan.id, Loan.status == "requested")
+        .values(status="borrowed", loan_date=date.today())  # Onaylandığı tarih
+    ).rowcount
+    if not claimed:
+        db.session.rollback()   # Düşülen kopya da geri alınır
+        return jsonify({"message": "Sadece bekleyen istekler onaylanabilir"}), 400
     
+    bump_versions(CATALOG_SCOPE, user_scope(loan.user_id))
     db.session.commit()
     return jsonify({
         "message": "Ödünç alma isteği onaylandı",
@@ -333,6 +561,7 @@ def reject_loan(loan_id: int):
         return jsonify({"message": "Sadece bekleyen istekler reddedilebilir"}), 400
     
     loan.status = "rejected"
+    bump_versions(user_scope(loan.user_id))
     db.session.commit()
     return jsonify({
         "message": "Ödünç alma isteği reddedildi",
@@ -340,41 +569,239 @@ def reject_loan(loan_id: int):
     })
 
 
+# Tek toplu istekte işlenebilecek en fazla ödünç isteği
+MAX_BATCH_SIZE = 1000
+
+
+@loan_bp.post("/requests/batch")
+@query_budget(8)
+@jwt_required(role="admin")
+def batch_requests():
+    """
+    Birden fazla ödünç alma isteğini tek seferde onaylar veya reddeder (sadece admin).
+    
+    Endpoint: POST /api/loans/requests/batch
+    
+    Request Body:
+        {
+            "ids": [1, 2, 3],
+            "action": "approve" | "reject"
+        }
+    
+    İşleyiş:
+        - İstekler, cezalar ve kitap stokları birkaç küme sorgusuyla okunur,
+          stok düşüşleri ve sürüm sayaçları tek UPDATE / upsert ile yazılır
+          (istek başına ayrı sorgu yapılmaz; parçalı stoklu kitaplar hariç)
+        - Stok yetmezse kopyalar en eski istekten başlanarak dağıtılır
+        - Tüm durum değişiklikleri ve stok düşüşleri tek transaction'da commit edilir
+    
+    Returns:
+        200: {"action", "results": [{"id", "outcome", "message"}], "summary": {outcome: sayı}}
+             outcome: approved, rejected, not_found, not_pending, penalty, unavailable
+        400: Geçersiz action veya ids
+        401: Yetkisiz erişim
+        403: Admin yetkisi gerekli
+        409: İstekler eşzamanlı olarak değişti (tekrar deneyin)
+    """
+    data = request.get_json() or {}
+    action = data.get("action")
+    if action not in ("approve", "reject"):
+        return jsonify({"message": "action approve veya reject olmalıdır"}), 400
+    try:
+        ids = list(dict.fromkeys(int(loan_id) for loan_id in data.get("ids") or []))
+    except (TypeError, ValueError):
+        return jsonify({"message": "ids tam sayı listesi olmalıdır"}), 400
+    if not ids:
+        return jsonify({"message": "ids boş olamaz"}), 400
+    if len(ids) > MAX_BATCH_SIZE:
+        return jsonify({"message": f"Tek seferde en fazla {MAX_BATCH_SIZE} istek işlenebilir"}), 400
+
+    outcomes = {}
+
+    # İstekleri kilitleyerek oku: eşzamanlı tekil onay/ret ile yarışmasın
+    loans = db.session.execute(
+        select(Loan.id, Loan.user_id, Loan.book_id, Loan.status)
+        .where(Loan.id.in_(ids))
+        .order_by(Loan.created_at.asc(), Loan.id.asc())
+        .with_for_update()
+    ).all()
+    found = {loan.id for loan in loans}
+    for loan_id in ids:
+        if loan_id not in found:
+            outcomes[loan_id] = ("not_found", "İstek bulunamadı")
+    pending = []
+    for loan in loans:
+        if loan.status != "requested":
+            outcomes[loan.id] = ("not_pending", "Sadece bekleyen istekler işlenebilir")
+        else:
+            pending.append(loan)
+
+    granted = []
+    if action == "approve" and pending:
+        # Aktif cezası olan kullanıcılar tek birincil anahtar sorgusunda bulunur
+        penalized = set(
+            db.session.execute(
+                select(User.id).where(
+                    User.id.in_({loan.user_id for loan in pending}),
+                    User.blocked_until > date.today(),
+                )
+            ).scalars()
+        )
+        eligible = []
+        for loan in pending:
+            if loan.user_id in penalized:
+                outcomes[loan.id] = ("penalty", "Kullanıcının aktif cezası var")
+            else:
+                eligible.append(loan)
+
+        # Kitap başına talep edilen kopya sayısı (en eski istek önce)
+        by_book = {}
+        for loan in eligible:
+            by_book.setdefault(loan.book_id, []).append(loan)
+        books = {
+            row.id: row
+            for row in db.session.execute(
+                select(Book.id, Book.available_copies, Book.stock_stripes)
+                .where(Book.id.in_(by_book))
+                .with_for_update()
+            )
+        }
+        decrements = {}
+        for book_id, book_loans in by_book.items():
+            book = books.get(book_id)
+            if book is None:
+                served = []
+            elif book.stock_stripes:
+                # Parçalı stok: her kopya ayrı atomik düşüşle alınır
+                served = []
+                for loan in book_loans:
+                    if not take_copy(book_id, book.stock_stripes):
+                        break
+                    served.append(loan)
+            else:
+                # Verilebilecek kadar kopya birden düşülür (aşağıdaki tek UPDATE ile)
+                count = min(len(book_loans), max(book.available_copies, 0))
+                served = book_loans[:count]
+                if count:
+                    decrements[book_id] = count
+            granted += served
+            for loan in book_loans[len(served):]:
+                outcomes[loan.id] = ("unavailable", "Bu kitaptan müsait kopya kalmamış")
+
+        # Parçasız kitapların hepsi tek koşullu UPDATE ile düşülür; her kitap kendi düşüşü kadar stok gerektirir
+        if decrements:
+            decrement = case(decrements, value=Book.id)
+            changed = db.session.execute(
+                update(Book)
+                .where(Book.id.in_(decrements), Book.available_copies >= decrement)
+                .values(available_copies=Book.available_copies - decrement),
+                execution_options={"synchronize_session": False},
+            ).rowcount
+            if changed != len(decrements):
+                db.session.rollback()
+                return jsonify({"message": "Stok eşzamanlı olarak değişti, tekrar deneyin"}), 409
+        new_status, outcome, message = "borrowed", "approved", "Ödünç alma isteği onaylandı"
+        values = {"status": new_status, "loan_date": date.today()}   # Onaylandığı tarih
+    else:
+        granted = pending
+        new_status, outcome, message = "rejected", "rejected", "Ödünç alma isteği reddedildi"
+        values = {"status": new_status}
+
+    if granted:
+        granted_ids = [loan.id for loan in granted]
+        changed = db.session.execute(
+            update(Loan).where(Loan.id.in_(granted_ids), Loan.status == "requested").values(**values),
+            execution_options={"synchronize_session": False},
+        ).rowcount
+        if changed != len(granted_ids):
+            db.session.rollback()
+            return jsonify({"message": "İstekler eşzamanlı olarak değişti, tekrar deneyin"}), 409
+        for loan_id in granted_ids:
+            outcomes[loan_id] = (outcome, message)
+        scopes = [user_scope(user_id) for user_id in {loan.user_id for loan in granted}]
+        bump_versions(*([CATALOG_SCOPE] if action == "approve" else []), *scopes)
+    db.session.commit()
+
+    results = [{"id": loan_id, "outcome": outcomes[loan_id][0], "message": outcomes[loan_id][1]} for loan_id in ids]
+    summary = {}
+    for result in results:
+        summary[result["outcome"]] = summary.get(result["outcome"], 0) + 1
+    return jsonify({"action": action, "results": results, "summary": summary})
+
+
 @loan_bp.get("/penalties")
+@query_budget(2)
 @jwt_required()
 def my_penalties():
     """
-    Kullanıcının cezalarını listeler.
+    Kullanıcının cezalarını bitiş tarihi en geç olandan başlayarak sayfa sayfa listeler.
     
-    Endpoint: GET /api/loans/penalties
+    Endpoint: GET /api/loans/penalties?limit=50&cursor=...
+    
+    Query Parameters:
+        scope (optional): active (bitmemiş cezalar) veya history (süresi dolmuş)
+        from (optional): Bu tarihten (YYYY-MM-DD) itibaren biten cezalar (penalty_end_date)
+        to (optional): Bu tarihe kadar biten cezalar (penalty_end_date)
+        limit (optional): Sayfa boyutu (varsayılan: 50, en fazla: 200)
+        cursor (optional): Önceki yanıttaki next_cursor değeri
+    
+    Özellikler:
+        - /api/loans/my ile aynı projeksiyon (loans ⨝ books ⟕ penalties), cezası olan ödünçler
+        - (penalty_end_date, id) üzerinden azalan keyset sayfalama (idx_penalties_user_end);
+          aktif cezalar önce gelir, ilk satır kullanıcının en geç biten cezasıdır
     
     Returns:
-        200: Ceza listesi (gecikme günü, ceza bitiş tarihi, aktif durumu dahil)
+        200: {"items": [...], "next_cursor": "..." | null} (gecikme günü, ceza bitiş tarihi, aktif durumu dahil)
+        304: Değişiklik yok (If-None-Match eşleşti)
+        400: Geçersiz filtre, limit veya cursor
         401: Yetkisiz erişim
     """
-    penalties = (
-        Penalty.query.join(Loan)
-        .filter(Penalty.user_id == g.current_user_id)
-        .order_by(Penalty.created_at.desc())
-        .all()
-    )
-    result = []
-    for p in penalties:
-        days_remaining = (p.penalty_end_date - date.today()).days if p.penalty_end_date > date.today() else 0
-        is_active = p.penalty_end_date > date.today()
-        result.append(
-            {
-                "id": p.id,
-                "loan_id": p.loan_id,
-                "book_title": p.loan.book.title if p.loan and p.loan.book else None,
-                "days_late": p.days_late,
-                "penalty_end_date": p.penalty_end_date.isoformat(),
-                "days_remaining": days_remaining,
-                "is_active": is_active,
-                "created_at": p.created_at.isoformat(),
-            }
-        )
-    return jsonify(result)
+    today = date.today()
+    try:
+        limit = parse_limit(request.args.get("limit"))
+    except ValueError:
+        return jsonify({"message": "limit bir tam sayı olmalıdır"}), 400
+    try:
+        conditions = _parse_history_filters(request.args, Penalty.penalty_end_date, Penalty.penalty_end_date > today)
+    except ValueError as e:
+        return jsonify({"message": f"Geçersiz filtre: {e}"}), 400
 
+    cursor = request.args.get("cursor")
+    if cursor:
+        try:
+            position = decode_cursor(cursor, "penalty_end_date")
+            conditions.append(keyset_filter(
+                Penalty.penalty_end_date, Penalty.id, date.fromisoformat(position["v"]), position["id"],
+                descending=True,
+            ))
+        except (InvalidCursor, TypeError, ValueError):
+            return jsonify({"message": "Geçersiz cursor"}), 400
 
+    etag = compute_etag([user_scope(g.current_user_id)], g.current_user_id)
+    if etag_matches(etag):
+        return not_modified(etag)
 
+    # Penalty.user_id koşulu sorgunun cezalar tablosundaki indeksten başlamasını sağlar
+    rows = (
+        _borrower_history_query(g.current_user_id, today)
+        .filter(Penalty.user_id == g.current_user_id, *conditions)
+        .order_by(*keyset_order(Penalty.penalty_end_date, Penalty.id, descending=True))
+        .limit(limit + 1)
+        .all()
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    result = [
+        {
+            "id": row.penalty_id,
+            "loan_id": row.id,
+            "book_title": row.book_title,
+            **_penalty_to_dict(row.penalty_end_date, row.days_late, bool(row.penalty_active), today),
+            "created_at": row.penalty_created_at.isoformat(),
+        }
+        for row in rows
+    ]
+    next_cursor = (
+        encode_cursor("penalty_end_date", rows[-1].penalty_end_date, rows[-1].penalty_id) if has_more else None
+    )
+    return with_etag(jsonify({"items": result, "next_cursor": next_cursor}), etag)
@@ -0,0 +1,224 @@
+"""
+Katalog Arama Modülü
+Kitap araması için Türkçe uyumlu metin katlama (folding) ve MySQL FULLTEXT
+(ngram parser) tabanlı, alaka düzeyine göre sıralanan arama yardımcılarını içerir.
+
+Arama metni book_search tablosunda kitap başına tek satır olarak tutulur:
+başlık + yazar adı + kategori adı, fold_text ile katlanmış halde. Böylece
+arama tek bir FULLTEXT indeksine gider; üç tabloda '%q%' taraması yapılmaz.
+"""
+
+import re
+import unicodedata
+from typing import Iterable
+
+from sqlalchemy import and_, delete, insert, literal, or_
+from sqlalchemy.dialects.mysql import match
+
+from src.db import db
+from src.models import Author, Book, BookSearch, Category
+
+
+# Türkçe büyük harf -> küçük harf dönüşümü (İ -> i, I -> ı)
+# str.lower() "İ" için "i̇" (i + birleşik nokta) üretir ve "I" için "i" döndürür
+_TURKISH_LOWER = str.maketrans({"I": "ı", "İ": "i"})
+
+# Harf/rakam dışındaki karakterler kelime ayracı sayılır
+_NON_WORD = re.compile(r"[\W_]+", re.UNICODE)
+
+# Tek seferde yenilenen book_search satırı sayısı
+REFRESH_BATCH_SIZE = 1000
+
+# ngram parser'ın en kısa token uzunluğu (MySQL varsayılanı: ngram_token_size=2)
+NGRAM_TOKEN_SIZE = 2
+
+
+def fold_text(text: str | None) -> str:
+    """
+    Metni arama için katlar.
+
+    Adımlar:
+        1. Türkçe kurallara göre küçük harfe çevirir (İ -> i, I -> ı)
+        2. Noktasız ı'yı i'ye eşler (kullanıcı "Isparta", "ısparta" veya
+           "isparta" yazsa da eşleşir)
+        3. Aksanları kaldırır (ş -> s, ç -> c, ğ -> g, ö -> o, ü -> u)
+        4. Noktalama işaretlerini boşluğa çevirir ve boşlukları sadeleştirir
+
+    Args:
+        text: Katlanacak metin
+
+    Returns:
+        str: Katlanmış metin (örn: "İNCE Memed" -> "ince memed")
+    """
+    if not text:
+        return ""
+    text = text.translate(_TURKISH_LOWER).lower().replace("ı", "i")
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return " ".join(_NON_WORD.sub(" ", text).split())
+
+
+def build_search_text(title: str, author: str | None, category: str | None) -> str:
+    """
+    Kitap için book_search.search_text değerini oluşturur.
+
+    Args:
+        title: Kitap başlığı
+        author: Yazar adı
+        category: Kategori adı
+
+    Returns:
+        str: Katlanmış arama metni
+    """
+    return " ".join(part for part in (fold_text(title), fold_text(author), fold_text(category)) if part)
+
+
+def refresh_book_search(
+    book_ids: Iterable[int] | None = None,
+    author_id: int | None = None,
+    category_id: int | None = None,
+) -> int:
+    """
+    book_search satırlarını kitap/yazar/kategori verisinden yeniden oluşturur.
+
+    Çağıran işlemin (transaction) parçası olarak çalışır; commit etmez.
+    Hiçbir filtre verilmezse tüm katalog yeniden oluşturulur.
+
+    Args:
+        book_ids: Yenilenecek kitap ID'leri
+        author_id: Bu yazarın tüm kitaplarını yenile (yazar adı değiştiğinde)
+        category_id: Bu kategorinin tüm kitaplarını yenile (kategori adı değiştiğinde)
+
+    Returns:
+        int: Yenilenen satır sayısı
+    """
+    query = (
+        db.session.query(Book.id, Book.title, Author.name, Category.name)
+        .select_from(Book)
+        .join(Author, Author.id == Book.author_id)
+        .join(Category, Category.id == Book.category_id)
+    )
+    if book_ids is not None:
+        book_ids = list(book_ids)
+        if not book_ids:
+            return 0
+        query = query.filter(Book.id.in_(book_ids))
+    if author_id is not None:
+        query = query.filter(Book.author_id == author_id)
+    if category_id is not None:
+        query = query.filter(Book.category_id == category_id)
+
+    # ID sırasıyla parça parça ilerle; büyük yazar/kategorilerde bellek sınırlı kalır
+    refreshed = 0
+    last_id = 0
+    while True:
+        rows = query.filter(Book.id > last_id).order_by(Book.id).limit(REFRESH_BATCH_SIZE).all()
+        if not rows:
+            break
+        ids = [row[0] for row in rows]
+        db.session.execute(delete(BookSearch).where(BookSearch.book_id.in_(ids)))
+        db.session.execute(
+            insert(BookSearch),
+            [
+                {"book_id": book_id, "search_text": build_search_text(title, author, category)}
+                for book_id, title, author, category in rows
+            ],
+        )
+        refreshed += len(rows)
+        last_id = ids[-1]
+    return refreshed
+
+
+def remove_book_search(book_id: int) -> None:
+    """
+    Silinen kitabın book_search satırını kaldırır (commit etmez).
+
+    Args:
+        book_id: Silinen kitabın ID'si
+    """
+    db.session.execute(delete(BookSearch).where(BookSearch.book_id == book_id))
+
+
+def _uses_fulltext(folded: str) -> bool:
+    """FULLTEXT indeksinin bu sorgu için kullanılıp kullanılamayacağını döndürür."""
+    return db.session.get_bind().dialect.name == "mysql" and bool(boolean_query(folded))
+
+
+def boolean_query(folded: str) -> str:
+    """
+    Katlanmış arama metninden boolean mod FULLTEXT ifadesi üretir.
+
+    Her kelime zorunludur (+kelime). ngram parser boolean modda her kelimeyi
+    ngram'larından oluşan bir öbek (phrase) aramasına çevirir; böylece satır
+    sadece tüm kelimeleri (alt dize olarak) içeriyorsa eşleşir. Doğal dil
+    modunda ise tek bir ortak ikili (bigram) eşleşme için yeterlidir ve
+    katalogun büyük kısmı eşleşip sıralanır. NGRAM_TOKEN_SIZE'dan kısa
+    kelimeler indekste olmadığı için atlanır. fold_text çıktısında boolean
+    operatörü (+ - * " ( ) ~ < >) bulunmaz.
+
+    Args:
+        folded: fold_text ile katlanmış arama metni
+
+    Returns:
+        str: Boolean mod ifadesi (örn: "+ince +memed"; uygun kelime yoksa "")
+    """
+    return " ".join(f"+{term}" for term in folded.split() if len(term) >= NGRAM_TOKEN_SIZE)
+
+
+def search_relevance(q: str):
+    """
+    Arama sorgusu için alaka düzeyi ifadesini döndürür.
+
+    MySQL'de MATCH ... AGAINST (doğal dil modu) skorudur; sadece sıralama
+    için kullanılır, eşleşme search_condition'ın boolean mod koşuluyla
+    belirlenir. FULLTEXT kullanılamadığında (örn: SQLite geliştirme
+    veritabanı) sabit 0 döner ve sonuçlar ID sırasına düşer.
+
+    Args:
+        q: Kullanıcının arama terimi
+
+    Returns:
+        SQLAlchemy ifadesi
+    """
+    folded = fold_text(q)
+    if _uses_fulltext(folded):
+        return match(BookSearch.search_text, against=folded).in_natural_language_mode()
+    return literal(0.0)
+
+
+def search_condition(q: str):
+    """
+    Arama sorgusu için WHERE koşulunu döndürür (book_search join'i gerektirir).
+
+    MySQL'de tüm kelimeleri zorunlu tutan boolean mod MATCH ... AGAINST
+    koşuludur (bkz. boolean_query). FULLTEXT kullanılamadığında her kelime
+    için ayrı '%kelime%' koşulu (hepsi birlikte) kullanılır.
+
+    Args:
+        q: Kullanıcının arama terimi
+
+    Returns:
+        SQLAlchemy filtre ifadesi; katlanmış terim boşsa (örn: sadece
+        noktalama) None (arama yapılmaz)
+    """
+    folded = fold_text(q)
+    if not folded:
+        return None
+    if _uses_fulltext(folded):
+        return match(BookSearch.search_text, against=boolean_query(folded)).in_boolean_mode()
+    return and_(*(BookSearch.search_text.like(f"%{term}%") for term in folded.split()))
+
+
+def relevance_after(relevance, value: float, row_id: int):
+    """
+    (alaka azalan, id artan) sıralamasında son satırdan sonrası koşulu.
+
+    Args:
+        relevance: search_relevance ifadesi
+        value: Son satırın alaka skoru
+        row_id: Son satırın ID'si
+
+    Returns:
+        SQLAlchemy filtre ifadesi
+    """
+    return or_(relevance < value, and_(relevance == value, Book.id > row_id))
@@ -4,30 +4,53 @@ Güvenlik Modülü
 """
 
 import datetime
+import hashlib
 import os
-from typing import Any, Dict
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Tuple
 
 import jwt
 from flask import current_app
 from passlib.hash import pbkdf2_sha256
 
+from src import password_pool
+
+
+def _password_config() -> Dict[str, Any]:
+    """Uygulama yapılandırmasını döndürür (context yoksa boş: havuzsuz, varsayılan tur)."""
+    try:
+        return current_app.config
+    except RuntimeError:
+        return {}
+
 
 def hash_password(password: str) -> str:
     """
     Şifreyi pbkdf2_sha256 algoritması ile hash'ler.
+
+    Hesap şifre havuzunda (src.password_pool) PASSWORD_HASH_ROUNDS turla yapılır.
     
     Args:
         password: Hash'lenecek şifre (düz metin)
     
     Returns:
         str: Hash'lenmiş şifre
+
+    Raises:
+        PasswordPoolBusy: Şifre havuzu kuyruğu doluysa
     """
-    return pbkdf2_sha256.hash(password)
+    config = _password_config()
+    rounds = config.get("PASSWORD_HASH_ROUNDS", pbkdf2_sha256.default_rounds)
+    return password_pool.run(password_pool.hash_with_rounds, password, rounds, config=config)
 
 
 def verify_password(password: str, password_hash: str) -> bool:
     """
     Verilen şifrenin hash ile eşleşip eşleşmediğini kontrol eder.
+
+    Hesap şifre havuzunda (src.password_pool) yapılır.
     
     Args:
         password: Kontrol edilecek şifre (düz metin)
@@ -35,15 +58,36 @@ def verify_password(password: str, password_hash: str) -> bool:
     
     Returns:
         bool: Şifre doğruysa True, yanlışsa False
+
+    Raises:
+        PasswordPoolBusy: Şifre havuzu kuyruğu doluysa
     """
     try:
-        return pbkdf2_sha256.verify(password, password_hash)
+        return password_pool.run(password_pool.verify_hash, password, password_hash, config=_password_config())
     except (ValueError, TypeError) as e:
         # Geçersiz hash formatı durumunda (örn: eski veritabanı kayıtları)
         print(f"Password verification error: {e}")
         return False
 
 
+def password_needs_rehash(password_hash: str) -> bool:
+    """
+    Hash'in tur sayısı PASSWORD_HASH_ROUNDS'tan farklıysa True döndürür
+    (başarılı girişte şifre yeni turla yeniden hash'lenir).
+
+    Args:
+        password_hash: Veritabanındaki hash
+
+    Returns:
+        bool: Yeniden hash'lenmeli mi?
+    """
+    rounds = _password_config().get("PASSWORD_HASH_ROUNDS", pbkdf2_sha256.default_rounds)
+    try:
+        return pbkdf2_sha256.using(rounds=rounds).needs_update(password_hash)
+    except (ValueError, TypeError):
+        return False
+
+
 def create_access_token(user_id: int, role: str) -> str:
     """
     JWT (JSON Web Token) erişim token'ı oluşturur.
@@ -120,4 +164,92 @@ def decode_access_token(token: str) -> Dict[str, Any]:
         raise
 
 
+# Doğrulanmış token önbelleği: token özeti -> (user_id, role, exp)
+# SPA aynı token'ı oturum boyunca yüzlerce kez gönderir; önbellekteki token için
+# HMAC doğrulaması tekrarlanmaz. Girdiler exp anında geçersiz olur, önbellek
+# SECRET_KEY değiştiğinde tamamen temizlenir (worker başına, en fazla JWT_CACHE_SIZE girdi).
+_token_cache: "OrderedDict[bytes, Tuple[int, str | None, float]]" = OrderedDict()
+_token_cache_lock = threading.Lock()
+_token_cache_secret: str | None = None
+_token_cache_stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+
+def _jwt_settings() -> Tuple[str, str, int]:
+    """(secret_key, algoritma, önbellek boyutu) üçlüsünü döndürür."""
+    try:
+        config = current_app.config
+        secret_key = config.get("SECRET_KEY")
+        algorithm = config.get("JWT_ALGORITHM", "HS256")
+        cache_size = config.get("JWT_CACHE_SIZE", 0)
+    except RuntimeError:
+        # Context yoksa env'den al (örn: test ortamında)
+        secret_key, algorithm, cache_size = None, "HS256", 0
+    return secret_key or os.getenv("SECRET_KEY", "dev-secret-change-me"), algorithm, cache_size
+
+
+def verify_access_token(token: str) -> Tuple[int, str | None]:
+    """
+    Token'ı doğrular ve (user_id, role) döndürür.
+
+    Daha önce doğrulanmış ve süresi dolmamış token'lar önbellekten döner
+    (tek sözlük araması); diğerleri decode edilip önbelleğe eklenir.
+
+    Args:
+        token: JWT token
+
+    Returns:
+        Tuple[int, str | None]: Kullanıcı ID ve rol
+
+    Raises:
+        jwt.ExpiredSignatureError: Token süresi dolmuşsa
+        jwt.InvalidTokenError: Token geçersizse
+        ValueError: Token'da kullanıcı ID'si yoksa
+    """
+    global _token_cache_secret
+    secret_key, algorithm, cache_size = _jwt_settings()
+    key = hashlib.sha256(token.encode()).digest()
+
+    if cache_size > 0:
+        with _token_cache_lock:
+            if secret_key != _token_cache_secret:
+                # Anahtar değişti: eski anahtarla doğrulanmış token'lar artık geçersiz
+                _token_cache.clear()
+                _token_cache_secret = secret_key
+            entry = _token_cache.get(key)
+            if entry is not None:
+                if entry[2] > time.time():
+                    _token_cache.move_to_end(key)
+                    _token_cache_stats["hits"] += 1
+                    return entry[0], entry[1]
+                # Süresi dolmuş: decode ExpiredSignatureError fırlatacak
+                del _token_cache[key]
+                _token_cache_stats["evictions"] += 1
+            _token_cache_stats["misses"] += 1
+
+    payload = jwt.decode(token, secret_key, algorithms=[algorithm])
+    # sub string olabilir, user_id integer olarak da saklanabilir
+    user_id = payload.get("user_id") or int(payload.get("sub", 0))
+    if not user_id:
+        raise ValueError("Token does not contain a user id")
+    role = payload.get("role")
+
+    if cache_size > 0:
+        exp = float(payload.get("exp", time.time()))
+        with _token_cache_lock:
+            _token_cache[key] = (user_id, role, exp)
+            _token_cache.move_to_end(key)
+            while len(_token_cache) > cache_size:
+                _token_cache.popitem(last=False)
+                _token_cache_stats["evictions"] += 1
+    return user_id, role
 
+
+def token_cache_stats() -> Dict[str, int]:
+    """
+    Bu worker'daki doğrulanmış token önbelleğinin sayaçlarını döndürür.
+
+    Returns:
+        Dict[str, int]: size, hits, misses, evictions
+    """
+    with _token_cache_lock:
+        return {"size": len(_token_cache), **_token_cache_stats}
@@ -0,0 +1,79 @@
+"""
+Üretim Sunucusu Modülü
+Ön-fork'lu (gunicorn) worker'lar için fork sonrası sıfırlama ve ısınma
+(warm-up) yardımcılarını içerir. Bkz. wsgi.py ve gunicorn.conf.py.
+
+Uygulama master süreçte bir kez oluşturulur (preload_app). Her worker
+fork edildikten sonra ve trafik kabul etmeden önce:
+
+    1. after_fork: Master'dan kopyalanan veritabanı bağlantı havuzu bırakılır
+       (bağlantılar kapatılmaz; aynı soket iki süreçte kullanılmamalıdır)
+    2. warm_up: Bağlantı havuzu doldurulur, şifre hash havuzu başlatılır ve
+       bir sağlık isteği ile Flask/SQLAlchemy'nin tembel kurulumları yapılır
+
+Trigram arama indeksi create_app içinde master'da kurulduğu için worker'lar
+tarafından copy-on-write ile paylaşılır.
+"""
+
+import time
+
+from flask import Flask
+from sqlalchemy import text
+
+from src import password_pool
+from src.db import db, reset_pool_stats
+
+
+def after_fork(app: Flask) -> None:
+    """
+    Fork edilen worker'da master'dan gelen bağlantı havuzlarını bırakır.
+    Worker ilk sorguda kendi bağlantılarını açar.
+
+    Args:
+        app: Flask uygulama nesnesi
+    """
+    with app.app_context():
+        for engine in db.engines.values():
+            # close=False: Master'ın soketleri kapatılmaz, sadece bu süreçte unutulur
+            engine.dispose(close=False)
+        # Havuz sayaçları master'dan kopyalandı; worker kendi sayaçlarıyla başlasın
+        reset_pool_stats()
+
+
+def warm_up(app: Flask, connections: int) -> dict:
+    """
+    Worker trafik kabul etmeden önce bağlantı havuzunu ve önbellekleri ısıtır.
+    Hatalar worker'ı durdurmaz (veritabanı hazır değilse ilk istekte bağlanılır).
+
+    Args:
+        app: Flask uygulama nesnesi
+        connections: Önceden açılacak veritabanı bağlantısı sayısı
+
+    Returns:
+        dict: connections, password_workers, seconds, error
+    """
+    started = time.perf_counter()
+    report = {"connections": 0, "password_workers": 0, "error": None}
+    try:
+        with app.app_context():
+            engine = db.engine
+            pool_size = getattr(engine.pool, "size", lambda: connections)()
+            opened = []
+            try:
+                # Bağlantılar aynı anda tutulur; aksi halde havuz tek bağlantıyı tekrar verir
+                for _ in range(min(connections, pool_size)):
+                    connection = engine.connect()
+                    connection.execute(text("SELECT 1"))
+                    opened.append(connection)
+            finally:
+                for connection in opened:
+                    connection.close()
+            report["connections"] = len(opened)
+
+        report["password_workers"] = password_pool.start_pool(app.config)
+
+        app.test_client().get("/api/health")
+    except Exception as e:
+        report["error"] = str(e)
+    report["seconds"] = round(time.perf_counter() - started, 3)
+    return report
@@ -0,0 +1,408 @@
+"""
+Trigram Arama İndeksi Modülü
+Kitaplar için veritabanından bağımsız, bellek içi, yazım hatalarına toleranslı
+trigram (3-gram) ters indeksi içerir.
+
+Her kitap için belge metni: başlık + yazar adı + kategori adı (src.search.fold_text
+ile katlanmış). Her kelime "  kelime " şeklinde boşlukla doldurulup 3'erli
+parçalara ayrılır; her trigram için o trigramı içeren kitap ID'leri tutulur.
+"orhn pamk" gibi hatalı bir sorgu, "orhan pamuk" ile trigramlarının çoğunu
+paylaştığı için yine üst sıralarda bulunur.
+
+İndeks süreç (worker) başına tutulur. Yazma işlemleri yapan worker indeksi
+anında günceller; diğer worker'lar TRIGRAM_INDEX_REBUILD_SECONDS aralıklarla
+indeksi veritabanından arka planda yeniden kurar.
+
+Kullanım:
+    from src.trigram_index import book_index
+    book_index.search("orhn pamk", limit=20)  # [(book_id, skor), ...]
+"""
+
+import math
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left, insort
+from collections import Counter, defaultdict
+from typing import Dict, List, Set, Tuple
+
+from flask import Flask
+
+from src.search import fold_text
+
+
+# Varsayılan en düşük skor: sorgu trigramlarının en az %30'u eşleşmeli
+DEFAULT_MIN_SCORE = 0.3
+
+# Kitapların bu oranından fazlasında geçen trigramlardan aday üretilmez
+STOP_GRAM_FRACTION = 0.05
+STOP_GRAM_MIN_DOCS = 1000
+# Sorgunun tüm trigramları sık ise aday üretmek için kullanılacak en seyrek trigram sayısı
+STOP_GRAM_FALLBACK = 3
+# Sık trigramlarla yeniden skorlanacak aday sayısı: max(limit * FACTOR, MIN)
+RERANK_FACTOR = 4
+RERANK_MIN = 200
+
+EMPTY = array("i")
+
+
+def trigrams(text: str) -> Set[str]:
+    """
+    Katlanmış metnin trigram kümesini döndürür.
+
+    Args:
+        text: fold_text ile katlanmış metin
+
+    Returns:
+        Set[str]: Trigramlar (örn: "ince" -> {"  i", " in", "inc", "nce", "ce "})
+    """
+    grams = set()
+    for word in text.split():
+        padded = f"  {word} "
+        for i in range(len(padded) - 2):
+            grams.add(padded[i:i + 3])
+    return grams
+
+
+class TrigramIndex:
+    """
+    Kitaplar için bellek içi trigram ters indeksi.
+
+    Trigram listeleri sıralı array('i') olarak tutulur (ID başına 4 bayt);
+    belge başına sadece trigram sayısı saklanır. Tüm public metodlar
+    thread-safe'dir (tek bir kilit ile korunur).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._postings: Dict[str, array] = {}                    # trigram -> sıralı kitap ID'leri
+        self._doc_len: Dict[int, int] = {}                       # kitap ID -> trigram sayısı
+        self._books: Dict[int, Tuple[str, int, int]] = {}        # kitap ID -> (başlık, yazar ID, kategori ID)
+        self._author_names: Dict[int, str] = {}
+        self._category_names: Dict[int, str] = {}
+        self._author_books: Dict[int, Set[int]] = defaultdict(set)
+        self._category_books: Dict[int, Set[int]] = defaultdict(set)
+        self.built_at: float | None = None      # Son tam kurulumun zamanı (time.monotonic)
+        self.ready = False                      # İlk tam kurulum tamamlandı mı (eskimiş olsa da kullanılabilir)
+        self._rebuilding = False
+
+    # ---------- İç yardımcılar (kilit altında çağrılır) ----------
+
+    def _doc_grams(self, book_id: int) -> Set[str]:
+        title, author_id, category_id = self._books[book_id]
+        text = " ".join(
+            (title, self._author_names.get(author_id, ""), self._category_names.get(category_id, ""))
+        )
+        return trigrams(fold_text(text))
+
+    def _unindex(self, book_id: int) -> None:
+        for gram in self._doc_grams(book_id):
+            ids = self._postings.get(gram)
+            if ids is None:
+                continue
+            position = bisect_left(ids, book_id)
+            if position < len(ids) and ids[position] == book_id:
+                del ids[position]
+                if not ids:
+                    del self._postings[gram]
+        self._doc_len.pop(book_id, None)
+
+    def _index(self, book_id: int) -> None:
+        grams = self._doc_grams(book_id)
+        self._doc_len[book_id] = len(grams)
+        for gram in grams:
+            ids = self._postings.get(gram)
+            if ids is None:
+                self._postings[sys.intern(gram)] = array("i", (book_id,))
+            elif ids[-1] < book_id:
+                ids.append(book_id)     # Yeni kitaplar genelde en büyük ID'ye sahiptir
+            else:
+                insort(ids, book_id)
+
+    # ---------- Yazma işlemleri ----------
+
+    def put_book(self, book_id: int, title: str, author_id: int, category_id: int) -> None:
+        """
+        Kitabı indekse ekler veya günceller.
+
+        Args:
+            book_id: Kitap ID
+            title: Kitap başlığı
+            author_id: Yazar ID
+            category_id: Kategori ID
+        """
+        with self._lock:
+            previous = self._books.get(book_id)
+            if previous == (title, author_id, category_id):
+                return
+            if previous is not None:
+                self._unindex(book_id)
+                self._author_books[previous[1]].discard(book_id)
+                self._category_books[previous[2]].discard(book_id)
+            self._books[book_id] = (title, author_id, category_id)
+            self._author_books[author_id].add(book_id)
+            self._category_books[category_id].add(book_id)
+            self._index(book_id)
+
+    def remove_book(self, book_id: int) -> None:
+        """
+        Kitabı indeksten çıkarır.
+
+        Args:
+            book_id: Kitap ID
+        """
+        with self._lock:
+            previous = self._books.get(book_id)
+            if previous is None:
+                return
+            self._unindex(book_id)
+            del self._books[book_id]
+            self._author_books[previous[1]].discard(book_id)
+            self._category_books[previous[2]].discard(book_id)
+
+    def put_author(self, author_id: int, name: str) -> None:
+        """
+        Yazar adını ekler/günceller ve yazarın kitaplarını yeniden indeksler.
+
+        Args:
+            author_id: Yazar ID
+            name: Yazar adı
+        """
+        with self._lock:
+            books = self._author_books.get(author_id, ())
+            for book_id in books:
+                self._unindex(book_id)
+            self._author_names[author_id] = name
+            for book_id in books:
+                self._index(book_id)
+
+    def remove_author(self, author_id: int) -> None:
+        """Yazarı indeksten çıkarır (kitabı olan yazarlar veritabanında silinemez)."""
+        with self._lock:
+            self._author_names.pop(author_id, None)
+
+    def put_category(self, category_id: int, name: str) -> None:
+        """
+        Kategori adını ekler/günceller ve kategorideki kitapları yeniden indeksler.
+
+        Args:
+            category_id: Kategori ID
+            name: Kategori adı
+        """
+        with self._lock:
+            books = self._category_books.get(category_id, ())
+            for book_id in books:
+                self._unindex(book_id)
+            self._category_names[category_id] = name
+            for book_id in books:
+                self._index(book_id)
+
+    def remove_category(self, category_id: int) -> None:
+        """Kategoriyi indeksten çıkarır (kitabı olan kategoriler veritabanında silinemez)."""
+        with self._lock:
+            self._category_names.pop(category_id, None)
+
+    def load(self, authors, categories, books) -> None:
+        """
+        İndeksi verilen satırlardan sıfırdan kurar ve tek seferde yerine koyar.
+
+        Args:
+            authors: (id, name) satırları
+            categories: (id, name) satırları
+            books: (id, title, author_id, category_id) satırları, ID sırasıyla
+        """
+        fresh = TrigramIndex()
+        for author_id, name in authors:
+            fresh._author_names[author_id] = name
+        for category_id, name in categories:
+            fresh._category_names[category_id] = name
+        for book_id, title, author_id, category_id in books:
+            fresh._books[book_id] = (title, author_id, category_id)
+            fresh._author_books[author_id].add(book_id)
+            fresh._category_books[category_id].add(book_id)
+            fresh._index(book_id)
+
+        with self._lock:
+            self._postings = fresh._postings
+            self._doc_len = fresh._doc_len
+            self._books = fresh._books
+            self._author_names = fresh._author_names
+            self._category_names = fresh._category_names
+            self._author_books = fresh._author_books
+            self._category_books = fresh._category_books
+            self.built_at = time.monotonic()
+            self.ready = True
+
+    # ---------- Okuma işlemleri ----------
+
+    def search(self, q: str, limit: int = 50, min_score: float = DEFAULT_MIN_SCORE) -> List[Tuple[int, float]]:
+        """
+        Sorguya en çok benzeyen kitapları skor sırasıyla döndürür.
+
+        Kitapların STOP_GRAM_FRACTION'dan fazlasında geçen trigramlar (örn: "  k",
+        "ar ") ayırt edici değildir; büyük listeleri dolaşılmaz. Adaylar seyrek
+        trigramlardan sayılır, en iyi adaylarda sık trigramlar ikili aramayla
+        eklenir. Sorgu trigramlarının kitapta bulunan oranı (kapsama, 0-1) eleme
+        için kullanılır. Sıralama skoru 0.8 * kapsama + 0.2 * Dice katsayısıdır;
+        böylece eşit kapsamada daha kısa (daha özgül) belgeler öne geçer. Eşit
+        skorlarda küçük ID önce gelir; (skor azalan, id artan) sırası keyset
+        sayfalamaya uygundur.
+
+        Args:
+            q: Arama terimi (yazım hatalı olabilir)
+            limit: En fazla dönecek sonuç sayısı
+            min_score: Bu kapsamanın altındaki adaylar elenir
+
+        Returns:
+            List[Tuple[int, float]]: (kitap ID, skor) listesi, skor azalan sırada
+        """
+        query_grams = trigrams(fold_text(q))
+        if not query_grams:
+            return []
+
+        with self._lock:
+            stop_df = max(STOP_GRAM_MIN_DOCS, STOP_GRAM_FRACTION * len(self._books))
+            lists = sorted((self._postings.get(gram, EMPTY) for gram in query_grams), key=len)
+            split = sum(1 for ids in lists if len(ids) <= stop_df) or min(STOP_GRAM_FALLBACK, len(lists))
+            informative, common = lists[:split], lists[split:]
+            total = len(lists)
+            need = max(1, math.ceil(min_score * total))
+
+            # 1. Adaylar sadece ayırt edici (seyrek) trigramların listelerinden sayılır
+            hits: Counter = Counter()
+            for ids in informative:
+                hits.update(ids)
+
+            # 2. En iyi adaylarda sık trigramlar ikili arama ile sayılır
+            scored = []
+            for book_id, shared in hits.most_common(max(limit * RERANK_FACTOR, RERANK_MIN)):
+                if shared + len(common) < need:
+                    break
+                for ids in common:
+                    position = bisect_left(ids, book_id)
+                    if position < len(ids) and ids[position] == book_id:
+                        shared += 1
+                if shared >= need:
+                    coverage = shared / total
+                    dice = 2 * shared / (total + self._doc_len[book_id])
+                    scored.append((-round(0.8 * coverage + 0.2 * dice, 4), book_id))
+
+        scored.sort()
+        return [(book_id, -score) for score, book_id in scored[:limit]]
+
+    def __len__(self) -> int:
+        return len(self._books)
+
+    def stats(self) -> dict:
+        """
+        İndeks boyutu ve yaklaşık bellek kullanımını döndürür.
+
+        Bellek, sys.getsizeof ile indeksin kendi yapıları için hesaplanır
+        (paylaşılan küçük int nesneleri hariç); worker boyutlandırma için
+        alt sınır olarak kullanılabilir.
+
+        Returns:
+            dict: ready, documents, trigrams, postings, approx_bytes, built_seconds_ago
+        """
+        with self._lock:
+            size = sys.getsizeof(self._postings) + sys.getsizeof(self._doc_len) + sys.getsizeof(self._books)
+            postings = 0
+            for gram, ids in self._postings.items():
+                size += sys.getsizeof(gram) + sys.getsizeof(ids)
+                postings += len(ids)
+            for title, _, _ in self._books.values():
+                size += sys.getsizeof(title) + 64  # tuple başlığı + iki int referansı
+            for books in (*self._author_books.values(), *self._category_books.values()):
+                size += sys.getsizeof(books)
+            for names in (self._author_names, self._category_names):
+                size += sys.getsizeof(names) + sum(sys.getsizeof(name) for name in names.values())
+
+            return {
+                "ready": self.ready,
+                "documents": len(self._books),
+                "trigrams": len(self._postings),
+                "postings": postings,
+                "approx_bytes": size,
+                "built_seconds_ago": None if self.built_at is None else round(time.monotonic() - self.built_at, 1),
+            }
+
+    # ---------- Veritabanından kurulum ----------
+
+    def build_from_db(self) -> None:
+        """
+        İndeksi veritabanından kurar (uygulama context'i içinde çağrılmalı).
+        Sadece gerekli sütunlar okunur; ORM nesnesi oluşturulmaz.
+        """
+        from src.db import db
+        from src.models import Author, Book, Category
+
+        authors = db.session.query(Author.id, Author.name).all()
+        categories = db.session.query(Category.id, Category.name).all()
+        books = db.session.query(Book.id, Book.title, Book.author_id, Book.category_id).yield_per(10000)
+        self.load(authors, categories, books)
+
+    def mark_stale(self) -> None:
+        """
+        İndeksi eskimiş olarak işaretler; bir sonraki aramada arka planda
+        yeniden kurulur. Toplu yazmalardan sonra satır satır güncelleme yerine
+        kullanılır.
+        """
+        self.built_at = None
+
+    def rebuild_if_stale(self, app: Flask) -> None:
+        """
+        Son kurulum TRIGRAM_INDEX_REBUILD_SECONDS'tan eskiyse indeksi arka planda
+        yeniden kurar. Diğer worker'ların yazma işlemleri bu sayede indekse yansır.
+        mark_stale ile işaretlenmiş indeks, aralık ayarından bağımsız olarak
+        yeniden kurulur.
+
+        Args:
+            app: Flask uygulama nesnesi (arka plan thread'i için context)
+        """
+        interval = app.config.get("TRIGRAM_INDEX_REBUILD_SECONDS", 0)
+        if self.built_at is not None and (not interval or time.monotonic() - self.built_at < interval):
+            return
+        with self._lock:
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+
+        def _rebuild() -> None:
+            try:
+                with app.app_context():
+                    self.build_from_db()
+            except Exception as e:
+                print(f"⚠️ Trigram indeksi yeniden kurulamadı: {e}")
+            finally:
+                self._rebuilding = False
+
+        threading.Thread(target=_rebuild, name="trigram-index-rebuild", daemon=True).start()
+
+
+# Uygulama genelinde kullanılan kitap indeksi (worker başına bir tane)
+book_index = TrigramIndex()
+
+
+def init_trigram_index(app: Flask) -> None:
+    """
+    TRIGRAM_INDEX_ENABLED açıksa kitap indeksini uygulama başlarken kurar.
+
+    Args:
+        app: Flask uygulama nesnesi
+    """
+    if not app.config.get("TRIGRAM_INDEX_ENABLED"):
+        return
+    try:
+        with app.app_context():
+            started = time.perf_counter()
+            book_index.build_from_db()
+            stats = book_index.stats()
+            print(
+                f"🔎 Trigram indeksi kuruldu: {stats['documents']} kitap, "
+                f"~{stats['approx_bytes'] / 1024 / 1024:.1f} MB, {time.perf_counter() - started:.2f} sn"
+            )
+    except Exception as e:
+        # Veritabanı hazır değilse uygulama yine de açılsın (trigram araması
+        # indeks ilk aramada arka planda kurulana kadar FULLTEXT yoluna düşer)
+        print(f"⚠️ Trigram indeksi kurulamadı: {e}")
@@ -311,12 +311,22 @@ async function apiFetch(path, options = {}) {
   } else if (!isAuthEndpoint) {
     console.log(`[API] ${options.method || "GET"} ${path} - No token`);
   }
+  // Yakın zamanda yazma yaptıysak okumalar birincil veritabanından yapılsın
+  // (okuma replikası değişikliği henüz almamış olabilir)
+  const primaryUntil = Number(localStorage.getItem("primaryUntil") || 0);
+  if (primaryUntil > Date.now()) {
+    headers["X-Primary-Until"] = String(primaryUntil);
+  }
   
   try {
     const res = await fetch(`${API_BASE}${path}`, {
       ...options,
       headers,
     });
+    const primaryUntilHeader = res.headers.get("X-Primary-Until");
+    if (primaryUntilHeader) {
+      localStorage.setItem("primaryUntil", primaryUntilHeader);
+    }
     const data = await res.json().catch(() => ({}));
     
     if (!res.ok) {
@@ -466,16 +476,28 @@ async function handleRegister(event) {
   }
 }
 
+// Kitap listesinin bir sonraki sayfası için cursor (null: son sayfa)
+let booksNextCursor = null;
+
 /**
- * Kitapları API'den yükler ve tabloda gösterir
+ * Kitapları API'den sayfa sayfa yükler ve tabloda gösterir
  * Admin kullanıcılar için "Ödünç Al", öğrenciler için "İstek Gönder" butonu gösterilir
+ * @param {boolean} append - true ise mevcut listeye bir sonraki sayfayı ekler
  */
-async function loadBooks() {
+async function loadBooks(append = false) {
   const q = document.getElementById("search-query").value || "";
   try {
-    const books = await apiFetch(`/books/?q=${encodeURIComponent(q)}`);
+    let path = `/books/?q=${encodeURIComponent(q)}`;
+    if (append && booksNextCursor) {
+      path += `&cursor=${encodeURIComponent(booksNextCursor)}`;
+    }
+    const page = await apiFetch(path);
+    const books = page.items;
+    booksNextCursor = page.next_cursor;
     const tbody = document.querySelector("#books-table tbody");
-    tbody.innerHTML = "";
+    if (!append) {
+      tbody.innerHTML = "";
+    }
     books.forEach((b) => {
       const tr = document.createElement("tr");
       const isAdmin = currentUser && currentUser.role === "admin";
@@ -493,10 +515,8 @@ async function loadBooks() {
           </button>
         </td>
       `;
-      tbody.appendChild(tr);
-    });
-    tbody.querySelectorAll("button[data-book-id]").forEach((btn) => {
-      btn.addEventListener("click", async () => {
+      tr.querySelector("button[data-book-id]").addEventListener("click", async (event) => {
+        const btn = event.currentTarget;
         if (btn.disabled) return;
         const bookId = parseInt(btn.getAttribute("data-book-id"), 10);
         try {
@@ -520,45 +540,71 @@ async function loadBooks() {
           alert(err.message);
         }
       });
+      tbody.appendChild(tr);
     });
+
+    // Daha fazla sayfa varsa "Daha Fazla" butonunu göster
+    const moreButton = document.getElementById("books-more-button");
+    if (moreButton) {
+      moreButton.classList.toggle("hidden", !booksNextCursor);
+    }
   } catch (err) {
     alert(err.message);
   }
 }
 
+// Ödünç listesinin bir sonraki sayfası için cursor (null: son sayfa)
+let loansNextCursor = null;
+
 /**
- * Kullanıcının ödünç aldığı kitapları yükler ve tabloda gösterir
+ * Kullanıcının ödünç aldığı kitapları sayfa sayfa yükler ve tabloda gösterir
  * İade edilebilir kitaplar için "İade Et" butonu gösterilir
+ * @param {boolean} append - true ise mevcut listeye bir sonraki sayfayı ekler
  */
-async function loadLoans() {
+async function loadLoans(append = false) {
   try {
-    const loans = await apiFetch("/loans/my");
+    let path = "/loans/my";
+    if (append && loansNextCursor) {
+      path += `?cursor=${encodeURIComponent(loansNextCursor)}`;
+    }
+    const page = await apiFetch(path);
+    const loans = page.items;
+    loansNextCursor = page.next_cursor;
     const tbody = document.querySelector("#loans-table tbody");
-    tbody.innerHTML = "";
+    if (!append) {
+      tbody.innerHTML = "";
+    }
+    
+    const moreButton = document.getElementById("loans-more-button");
+    if (moreButton) {
+      moreButton.classList.toggle("hidden", !loansNextCursor);
+    }
     
-    if (loans.length === 0) {
+    if (!append && loans.length === 0) {
       tbody.innerHTML = "<tr><td colspan='5' style='text-align: center;'>Henüz ödünç işleminiz yok</td></tr>";
       return;
     }
     
     loans.forEach((l) => {
       const tr = document.createElement("tr");
-      const canReturn = l.status === "borrowed" && !l.return_date;
+      // Kitap hâlâ dışarıda mı? (onay bekleyen istekler hariç; sunucu is_active ile işaretler)
+      const isOut = l.is_active && l.status !== "requested" && l.status !== "approved";
+      const canReturn = isOut;
       
       // Gecikme kontrolü
       const dueDate = new Date(l.due_date);
       const today = new Date();
       today.setHours(0, 0, 0, 0);
       const daysUntilDue = Math.ceil((dueDate - today) / (1000 * 60 * 60 * 24));
-      const isOverdue = daysUntilDue < 0 && l.status === "borrowed";
-      const isWarning = daysUntilDue <= 3 && daysUntilDue >= 0 && l.status === "borrowed";
+      const isOverdue = daysUntilDue < 0 && isOut;
+      const isWarning = daysUntilDue <= 3 && daysUntilDue >= 0 && isOut;
       
       let statusText = {
         "requested": "Beklemede",
         "approved": "Onaylandı",
         "borrowed": isOverdue ? `⚠️ Geç (${Math.abs(daysUntilDue)} gün)` : isWarning ? `⚠️ Yaklaşıyor (${daysUntilDue} gün)` : "Ödünç Alındı",
         "returned": "İade Edildi",
-        "late": "Geç İade",
+        "late": isOverdue ? `⚠️ Geç (${Math.abs(daysUntilDue)} gün)` : "Geç İade",
         "rejected": "Reddedildi"
       }[l.status] || l.status;
       
@@ -575,41 +621,52 @@ async function loadLoans() {
           ${canReturn ? `<button data-loan-id="${l.id}">İade Et</button>` : ""}
         </td>
       `;
-      tbody.appendChild(tr);
-    });
-    tbody.querySelectorAll("button[data-loan-id]").forEach((btn) => {
-      btn.addEventListener("click", async () => {
-        const loanId = parseInt(btn.getAttribute("data-loan-id"), 10);
-        try {
-          await apiFetch(`/loans/${loanId}/return`, { method: "POST" });
-          alert("Kitap iade edildi!");
-          await loadBooks();
-          await loadLoans();
-          await loadPenalties();
-          if (currentUser && currentUser.role === "admin") {
-            await loadRequests();
-            await loadAdminPenalties();
+      // Buton sadece bu satır için bağlanır (sonraki sayfalar eklenirken tekrar bağlanmaz)
+      const returnButton = tr.querySelector("button[data-loan-id]");
+      if (returnButton) {
+        returnButton.addEventListener("click", async () => {
+          try {
+            await apiFetch(`/loans/${l.id}/return`, { method: "POST" });
+            alert("Kitap iade edildi!");
+            await loadBooks();
+            await loadLoans();
+            await loadPenalties();
+            if (currentUser && currentUser.role === "admin") {
+              await loadRequests();
+              await loadAdminPenalties();
+            }
+          } catch (err) {
+            alert(err.message);
           }
-        } catch (err) {
-          alert(err.message);
-        }
-      });
+        });
+      }
+      tbody.appendChild(tr);
     });
   } catch (err) {
     alert(err.message);
   }
 }
 
+// İstek kuyruğunun bir sonraki sayfası için cursor (null: son sayfa)
+let requestsNextCursor = null;
+
 /**
- * Bekleyen ödünç alma isteklerini yükler (sadece admin)
+ * Bekleyen ödünç alma isteklerini sayfa sayfa yükler (sadece admin)
  * Admin bu istekleri onaylayabilir veya reddedebilir
+ * @param {boolean} append - true ise mevcut listeye bir sonraki sayfayı ekler
  */
-async function loadRequests() {
+async function loadRequests(append = false) {
   // Sadece admin için
   if (!currentUser || currentUser.role !== "admin") return;
   
   try {
-    const requests = await apiFetch("/loans/requests");
+    let path = "/loans/requests";
+    if (append && requestsNextCursor) {
+      path += `?cursor=${encodeURIComponent(requestsNextCursor)}`;
+    }
+    const page = await apiFetch(path);
+    const requests = page.items;
+    requestsNextCursor = page.next_cursor;
     const requestsSection = document.getElementById("requests-section");
     if (!requestsSection) return;
     
@@ -618,34 +675,39 @@ async function loadRequests() {
     const tbody = requestsTable.querySelector("tbody");
     if (!tbody) return;
     
-    tbody.innerHTML = "";
+    if (!append) {
+      tbody.innerHTML = "";
+    }
     
-    if (requests.length === 0) {
-      tbody.innerHTML = "<tr><td colspan='6' style='text-align: center;'>Bekleyen istek yok</td></tr>";
+    const moreButton = document.getElementById("requests-more-button");
+    if (moreButton) {
+      moreButton.classList.toggle("hidden", !requestsNextCursor);
+    }
+    
+    if (!append && requests.length === 0) {
+      tbody.innerHTML = "<tr><td colspan='7' style='text-align: center;'>Bekleyen istek yok</td></tr>";
       return;
     }
     
     requests.forEach((req) => {
       const tr = document.createElement("tr");
       tr.innerHTML = `
+        <td><input type="checkbox" class="request-select" value="${req.id}" /></td>
         <td>${req.user_name || ""}</td>
         <td>${req.user_email || ""}</td>
         <td>${req.book_title || ""}</td>
         <td>${req.book_available}</td>
         <td>${req.request_date}</td>
         <td>
-          <button class="approve-btn" data-request-id="${req.id}">Onayla</button>
-          <button class="reject-btn" data-request-id="${req.id}">Reddet</button>
+          <button class="approve-btn">Onayla</button>
+          <button class="reject-btn">Reddet</button>
         </td>
       `;
-      tbody.appendChild(tr);
-    });
-    
-    tbody.querySelectorAll("button.approve-btn").forEach((btn) => {
-      btn.addEventListener("click", async () => {
-        const requestId = parseInt(btn.getAttribute("data-request-id"), 10);
+      
+      // Butonlar sadece bu satır için bağlanır (sonraki sayfalar eklenirken tekrar bağlanmaz)
+      tr.querySelector("button.approve-btn").addEventListener("click", async () => {
         try {
-          await apiFetch(`/loans/${requestId}/approve`, { method: "POST" });
+          await apiFetch(`/loans/${req.id}/approve`, { method: "POST" });
           alert("İstek onaylandı!");
           await loadBooks();
           await loadRequests();
@@ -654,20 +716,18 @@ async function loadRequests() {
           alert(err.message);
         }
       });
-    });
-    
-    tbody.querySelectorAll("button.reject-btn").forEach((btn) => {
-      btn.addEventListener("click", async () => {
-        const requestId = parseInt(btn.getAttribute("data-request-id"), 10);
+      
+      tr.querySelector("button.reject-btn").addEventListener("click", async () => {
         if (!confirm("Bu isteği reddetmek istediğinize emin misiniz?")) return;
         try {
-          await apiFetch(`/loans/${requestId}/reject`, { method: "POST" });
+          await apiFetch(`/loans/${req.id}/reject`, { method: "POST" });
           alert("İstek reddedildi!");
           await loadRequests();
         } catch (err) {
           alert(err.message);
         }
       });
+      tbody.appendChild(tr);
     });
   } catch (err) {
     console.error("İstekler yüklenirken hata:", err);
@@ -675,32 +735,76 @@ async function loadRequests() {
 }
 
 /**
- * Kullanıcının cezalarını yükler ve gösterir
+ * Seçili ödünç isteklerini tek istekle onaylar veya reddeder (sadece admin)
+ * @param {string} action - "approve" veya "reject"
+ */
+async function batchRequests(action) {
+  const ids = Array.from(document.querySelectorAll("#requests-table input.request-select:checked"))
+    .map((input) => parseInt(input.value, 10));
+  if (ids.length === 0) {
+    alert("Lütfen en az bir istek seçin");
+    return;
+  }
+  if (action === "reject" && !confirm(`${ids.length} isteği reddetmek istediğinize emin misiniz?`)) return;
+  try {
+    const data = await apiFetch("/loans/requests/batch", {
+      method: "POST",
+      body: JSON.stringify({ ids, action }),
+    });
+    const failed = data.results.filter((r) => r.outcome !== "approved" && r.outcome !== "rejected");
+    const done = data.results.length - failed.length;
+    let message = `${done} istek ${action === "approve" ? "onaylandı" : "reddedildi"}.`;
+    if (failed.length > 0) {
+      message += `\n${failed.length} istek işlenemedi:\n` + failed.map((r) => `#${r.id}: ${r.message}`).join("\n");
+    }
+    alert(message);
+    document.getElementById("requests-select-all").checked = false;
+    if (action === "approve") {
+      await loadBooks();
+      await loadAdminPenalties();
+    }
+    await loadRequests();
+  } catch (err) {
+    alert(err.message);
+  }
+}
+
+// Ceza listesinin bir sonraki sayfası için cursor (null: son sayfa)
+let penaltiesNextCursor = null;
+
+/**
+ * Kullanıcının cezalarını sayfa sayfa yükler ve gösterir
+ * Cezalar bitiş tarihi en geç olandan başlar; özet ilk sayfanın ilk satırından hesaplanır
+ * @param {boolean} append - true ise mevcut listeye bir sonraki sayfayı ekler
  */
-async function loadPenalties() {
+async function loadPenalties(append = false) {
   try {
-    const penalties = await apiFetch("/loans/penalties");
+    let path = "/loans/penalties";
+    if (append && penaltiesNextCursor) {
+      path += `?cursor=${encodeURIComponent(penaltiesNextCursor)}`;
+    }
+    const page = await apiFetch(path);
+    const penalties = page.items;
+    penaltiesNextCursor = page.next_cursor;
     const tbody = document.querySelector("#penalties-table tbody");
     if (!tbody) return;
     
-    tbody.innerHTML = "";
+    if (!append) {
+      tbody.innerHTML = "";
+    }
     
-    // Aktif ceza sayısını hesapla
-    let activePenalties = 0;
-    let activePenaltyDays = 0;
+    const moreButton = document.getElementById("penalties-more-button");
+    if (moreButton) {
+      moreButton.classList.toggle("hidden", !penaltiesNextCursor);
+    }
     
-    if (penalties.length === 0) {
+    if (!append && penalties.length === 0) {
       tbody.innerHTML = "<tr><td colspan='5' style='text-align: center;'>Ceza kaydınız bulunmamaktadır</td></tr>";
       document.getElementById("total-penalty-amount").textContent = "Yok";
       return;
     }
     
     penalties.forEach((p) => {
-      if (p.is_active) {
-        activePenalties++;
-        activePenaltyDays = Math.max(activePenaltyDays, p.days_remaining);
-      }
-      
       const statusText = p.is_active 
         ? `<span style="color: red;">⛔ Aktif (${p.days_remaining} gün kaldı)</span>`
         : '<span style="color: green;">✅ Bitti</span>';
@@ -716,11 +820,12 @@ async function loadPenalties() {
       tbody.appendChild(tr);
     });
     
-    // Özet bilgiyi güncelle
+    // Özet bilgiyi güncelle (ilk satır en geç biten cezadır)
     const totalElement = document.getElementById("total-penalty-amount");
-    if (totalElement) {
-      if (activePenalties > 0) {
-        totalElement.textContent = `${activePenaltyDays} gün daha kitap alamazsınız`;
+    if (totalElement && !append) {
+      const latest = penalties[0];
+      if (latest.is_active) {
+        totalElement.textContent = `${latest.days_remaining} gün daha kitap alamazsınız`;
         totalElement.parentElement.style.background = "#fee2e2";
         totalElement.parentElement.style.borderLeftColor = "#ef4444";
       } else {
@@ -794,7 +899,18 @@ async function loadAdminPenalties() {
   }
 }
 
-document.getElementById("search-button").addEventListener("click", loadBooks);
+document.getElementById("search-button").addEventListener("click", () => loadBooks());
+document.getElementById("books-more-button").addEventListener("click", () => loadBooks(true));
+document.getElementById("requests-more-button").addEventListener("click", () => loadRequests(true));
+document.getElementById("loans-more-button").addEventListener("click", () => loadLoans(true));
+document.getElementById("penalties-more-button").addEventListener("click", () => loadPenalties(true));
+document.getElementById("requests-approve-selected").addEventListener("click", () => batchRequests("approve"));
+document.getElementById("requests-reject-selected").addEventListener("click", () => batchRequests("reject"));
+document.getElementById("requests-select-all").addEventListener("change", (e) => {
+  document.querySelectorAll("#requests-table input.request-select").forEach((input) => {
+    input.checked = e.target.checked;
+  });
+});
 
 // Çıkış butonu
 document.getElementById("logout-btn").addEventListener("click", () => {
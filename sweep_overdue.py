@@ -0,0 +1,42 @@
+"""
+Gecikmiş Ödünç Tarama Scripti
+
+İade tarihi geçmiş ve hâlâ iade edilmemiş ("borrowed") ödünçleri parça parça
+"late" durumuna çeker (bkz. src/overdue.py). Günlük cron işi olarak
+çalıştırılabilir; uygulama içi zamanlayıcı için OVERDUE_SWEEP_SECONDS
+ayarına bakın.
+
+Kullanım:
+    python sweep_overdue.py
+    python sweep_overdue.py --chunk-size 1000
+"""
+import argparse
+import sys
+
+from app import create_app
+from src.overdue import sweep_overdue
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gecikmiş ödünçleri 'late' durumuna çeker")
+    parser.add_argument("--chunk-size", type=int, help="Parça (transaction) başına ödünç sayısı")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        try:
+            report = sweep_overdue(args.chunk_size or app.config["OVERDUE_SWEEP_CHUNK_SIZE"])
+        except Exception as e:
+            print(f"[ERROR] Hata: {e}")
+            import traceback
+            traceback.print_exc()
+            sys.exit(1)
+
+    print(
+        f"[SUCCESS] {report['marked']} ödünç 'late' yapıldı "
+        f"({report['chunks']} parça, {report['seconds']} sn, en uzun parça {report['max_chunk_seconds']} sn)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Test Ortamı
+Testler geçici bir SQLite veritabanında, benchmarks.explain_plans ile aynı
+sentetik veri kümesi üzerinde çalışır. Uygulama ve veri kümesi oturum başına
+bir kez kurulur.
+
+Kullanım:
+    python -m pytest -q
+    TEST_DATABASE_URL=mysql+pymysql://.../smart_library_test python -m pytest -q
+"""
+import os
+import random
+import tempfile
+import uuid
+
+# Uygulama import edilmeden önce ortam belirlenmeli (.env değerleri ezilmez, bu yüzden açıkça verilir)
+os.environ["DATABASE_URL"] = os.getenv("TEST_DATABASE_URL") or (
+    "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="smart_library_tests_"), "test.db")
+)
+os.environ["DATABASE_REPLICA_URLS"] = ""
+os.environ["TRIGRAM_INDEX_ENABLED"] = "0"
+os.environ["OVERDUE_SWEEP_SECONDS"] = "0"
+os.environ["PASSWORD_HASH_WORKERS"] = "0"
+
+import pytest
+
+from app import create_app
+from benchmarks.explain_plans import analyze, scenario_ids, seed
+from src.security import create_access_token
+
+
+# Tam tarama kontrolünün anlamlı olması için tablolar SMALL_TABLE_ROWS'tan büyük olmalı
+BOOK_COUNT = 1500
+
+
+@pytest.fixture(scope="session")
+def app():
+    app = create_app()
+    with app.app_context():
+        seed(BOOK_COUNT, random.Random(42))
+        analyze()
+    return app
+
+
+@pytest.fixture(scope="session")
+def dataset(app):
+    """Senaryolarda kullanılan kayıt ID'leri ve rol başına erişim token'ları."""
+    with app.app_context():
+        ids = scenario_ids()
+        return {
+            **ids,
+            "tokens": {
+                "admin": create_access_token(ids["admin_id"], "admin"),
+                "student": create_access_token(ids["student_id"], "student"),
+            },
+        }
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def auth(dataset):
+    """Rol adından Authorization başlığı üretir (None: anonim)."""
+    def headers(role):
+        return {"Authorization": f"Bearer {dataset['tokens'][role]}"} if role else {}
+    return headers
+
+
+@pytest.fixture
+def new_student(app, client, auth):
+    """Admin ile yeni bir öğrenci açar; (kullanıcı ID, Authorization başlığı) döndürür."""
+    def create():
+        response = client.post("/api/admin/users", json={
+            "full_name": "Test Öğrenci",
+            "email": f"{uuid.uuid4().hex}@tests.test",
+            "password": "test-password",
+            "role": "student",
+        }, headers=auth("admin"))
+        assert response.status_code == 201
+        user_id = response.get_json()["id"]
+        with app.app_context():
+            token = create_access_token(user_id, "student")
+        return user_id, {"Authorization": f"Bearer {token}"}
+    return create
+
+
+@pytest.fixture
+def new_book(client, auth):
+    """Admin ile verilen kopya sayısında yeni bir kitap ekler; kitap ID'sini döndürür."""
+    def create(copies):
+        response = client.post("/api/books/", json={
+            "title": "Test Kitabı",
+            "isbn": f"test-{uuid.uuid4().hex[:12]}",
+            "author_id": 1,
+            "category_id": 1,
+            "total_copies": copies,
+        }, headers=auth("admin"))
+        assert response.status_code == 201
+        return response.get_json()["id"]
+    return create
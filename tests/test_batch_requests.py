@@ -0,0 +1,87 @@
+"""
+Toplu İstek İşleme Testleri
+POST /api/loans/requests/batch'in karışık (bekleyen, bekleyen olmayan,
+bulunamayan) ID listesinde her ID için doğru sonucu döndürdüğünü ve stok
+bittiğinde onayların durduğunu doğrular (parçasız ve parçalı stok).
+"""
+import pytest
+from sqlalchemy import func, select
+
+from src.db import db
+from src.models import Book, BookStockStripe, Loan
+
+
+MISSING_ID = 10 ** 9
+
+
+def available(app, book_id):
+    """Kitabın gerçek müsait kopya sayısı (parçalı stokta parçaların toplamı)."""
+    with app.app_context():
+        stripes = db.session.execute(select(Book.stock_stripes).where(Book.id == book_id)).scalar_one()
+        if stripes:
+            return db.session.execute(
+                select(func.sum(BookStockStripe.available)).where(BookStockStripe.book_id == book_id)
+            ).scalar_one()
+        return db.session.execute(select(Book.available_copies).where(Book.id == book_id)).scalar_one()
+
+
+def statuses(app, loan_ids):
+    with app.app_context():
+        return dict(db.session.execute(select(Loan.id, Loan.status).where(Loan.id.in_(loan_ids))).all())
+
+
+def request_book(client, headers, book_id):
+    response = client.post("/api/loans/", json={"book_id": book_id}, headers=headers)
+    assert response.status_code == 201
+    return response.get_json()["id"]
+
+
+def batch(client, auth, ids, action="approve"):
+    response = client.post("/api/loans/requests/batch", json={"ids": ids, "action": action}, headers=auth("admin"))
+    assert response.status_code == 200
+    return response.get_json()
+
+
+@pytest.mark.parametrize("stripes", [0, 4])
+def test_batch_approve_mixed_ids(app, client, auth, new_student, new_book, stripes):
+    book_id = new_book(2)
+    if stripes:
+        response = client.put(f"/api/admin/books/{book_id}/stripes", json={"stripes": stripes}, headers=auth("admin"))
+        assert response.status_code == 200
+
+    # Üç öğrenci 2 kopyalı kitabı ister; en eski iki istek onaylanmalı
+    first, second, third = (request_book(client, new_student()[1], book_id) for _ in range(3))
+    rejected = request_book(client, new_student()[1], new_book(1))
+    assert client.post(f"/api/loans/{rejected}/reject", headers=auth("admin")).status_code == 200
+
+    body = batch(client, auth, [third, rejected, first, MISSING_ID, second, first])
+    assert [(result["id"], result["outcome"]) for result in body["results"]] == [
+        (third, "unavailable"),
+        (rejected, "not_pending"),
+        (first, "approved"),
+        (MISSING_ID, "not_found"),
+        (second, "approved"),
+    ]
+    assert body["summary"] == {"approved": 2, "unavailable": 1, "not_pending": 1, "not_found": 1}
+    assert available(app, book_id) == 0
+    assert statuses(app, [first, second, third, rejected]) == {
+        first: "borrowed", second: "borrowed", third: "requested", rejected: "rejected",
+    }
+
+    # Stok bitmişken tekrar onay denemesi stoku eksiye düşürmez
+    body = batch(client, auth, [third, first])
+    assert [result["outcome"] for result in body["results"]] == ["unavailable", "not_pending"]
+    assert available(app, book_id) == 0
+
+    body = batch(client, auth, [third], action="reject")
+    assert body["results"][0]["outcome"] == "rejected"
+    assert statuses(app, [third]) == {third: "rejected"}
+
+
+def test_batch_approve_rejects_invalid_input(client, auth):
+    response = client.post("/api/loans/requests/batch", json={"ids": [1], "action": "delete"}, headers=auth("admin"))
+    assert response.status_code == 400
+    response = client.post("/api/loans/requests/batch", json={"ids": [], "action": "approve"}, headers=auth("admin"))
+    assert response.status_code == 400
+    response = client.post("/api/loans/requests/batch", json={"ids": [1], "action": "approve"}, headers=auth("student"))
+    assert response.status_code == 403
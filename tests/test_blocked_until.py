@@ -0,0 +1,59 @@
+"""
+Ceza Engeli Testleri
+Gecikmiş iadenin users.blocked_until'i güncelleyip ödünç almayı engellediğini
+ve remove_penalty'nin değeri kullanıcının kalan cezalarından yeniden
+hesapladığını doğrular (engel, son aktif ceza kaldırılınca biter).
+"""
+
+
+def borrow_late(client, auth, headers, book_id):
+    """Öğrenci adına vadesi geçmiş bir ödünç oluşturur (istek + admin onayı)."""
+    response = client.post("/api/loans/", json={"book_id": book_id, "days": -3}, headers=headers)
+    assert response.status_code == 201
+    loan_id = response.get_json()["id"]
+    assert client.post(f"/api/loans/{loan_id}/approve", headers=auth("admin")).status_code == 200
+    return loan_id
+
+
+def penalty_id_for(client, auth, loan_id):
+    penalties = client.get("/api/admin/penalties", headers=auth("admin")).get_json()
+    return next(penalty["id"] for penalty in penalties if penalty["loan_id"] == loan_id)
+
+
+def test_late_return_blocks_until_penalties_removed(client, auth, new_student, new_book):
+    _, headers = new_student()
+    late_loans = [borrow_late(client, auth, headers, new_book(1)) for _ in range(2)]
+    book_id = new_book(1)
+    response = client.post("/api/loans/", json={"book_id": book_id}, headers=headers)
+    assert response.status_code == 201
+    pending_id = response.get_json()["id"]
+
+    for loan_id in late_loans:
+        assert client.post(f"/api/loans/{loan_id}/return", headers=headers).status_code == 200
+
+    # İade sonrası ceza hemen etkili: yeni istek, tekil ve toplu onay engellenir
+    response = client.post("/api/loans/", json={"book_id": new_book(1)}, headers=headers)
+    assert response.status_code == 403
+    assert "Ceza nedeniyle" in response.get_json()["message"]
+    assert client.post(f"/api/loans/{pending_id}/approve", headers=auth("admin")).status_code == 403
+    response = client.post("/api/loans/requests/batch", json={"ids": [pending_id], "action": "approve"}, headers=auth("admin"))
+    assert response.get_json()["results"][0]["outcome"] == "penalty"
+
+    # Bir ceza kaldırılınca diğeri hâlâ sürer
+    response = client.post(f"/api/admin/penalties/{penalty_id_for(client, auth, late_loans[0])}/remove", headers=auth("admin"))
+    assert response.status_code == 200
+    assert client.post(f"/api/loans/{pending_id}/approve", headers=auth("admin")).status_code == 403
+
+    response = client.post(f"/api/admin/penalties/{penalty_id_for(client, auth, late_loans[1])}/remove", headers=auth("admin"))
+    assert response.status_code == 200
+    assert client.post(f"/api/loans/{pending_id}/approve", headers=auth("admin")).status_code == 200
+    assert client.post("/api/loans/", json={"book_id": new_book(1)}, headers=headers).status_code == 201
+
+
+def test_on_time_return_does_not_block(client, auth, new_student, new_book):
+    _, headers = new_student()
+    response = client.post("/api/loans/", json={"book_id": new_book(1)}, headers=headers)
+    loan_id = response.get_json()["id"]
+    assert client.post(f"/api/loans/{loan_id}/approve", headers=auth("admin")).status_code == 200
+    assert client.post(f"/api/loans/{loan_id}/return", headers=headers).status_code == 200
+    assert client.post("/api/loans/", json={"book_id": new_book(1)}, headers=headers).status_code == 201
@@ -0,0 +1,84 @@
+"""
+Toplu Kitap İçe Aktarma Testleri
+Kayıtlı bir ISBN'in yeniden içe aktarılınca çoğaltılmadan güncellendiğini ve
+available_copies'in total_copies'taki değişim kadar kaydığını (ödünçteki
+kopyalar korunarak) doğrular. Upsert ve upsert'süz güncelleme yolları ile
+parçalı stoklu kitaplar ayrı ayrı denenir.
+"""
+import json
+import uuid
+
+import pytest
+from sqlalchemy import func, select
+
+from src.book_import import BookImporter
+from src.db import db
+from src.models import Book, BookStockStripe
+
+
+def import_rows(client, auth, *rows):
+    body = "\n".join(json.dumps(row) for row in rows)
+    response = client.post("/api/admin/books/import?format=ndjson", data=body, headers=auth("admin"))
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def books_with_isbn(app, isbn):
+    """ISBN'li kitap satırları; parçalı stokta müsait kopya parçaların toplamıdır."""
+    with app.app_context():
+        books = db.session.execute(select(Book).where(Book.isbn == isbn)).scalars().all()
+        result = []
+        for book in books:
+            available = book.available_copies
+            if book.stock_stripes:
+                available = db.session.execute(
+                    select(func.sum(BookStockStripe.available)).where(BookStockStripe.book_id == book.id)
+                ).scalar_one()
+            result.append({
+                "id": book.id, "title": book.title, "total_copies": book.total_copies,
+                "available_copies": available, "stock_stripes": book.stock_stripes,
+            })
+        return result
+
+
+@pytest.mark.parametrize("stripes", [0, 4])
+@pytest.mark.parametrize("upsert", [True, False], ids=["upsert", "update"])
+def test_reimport_updates_book_and_shifts_available(app, client, auth, monkeypatch, upsert, stripes):
+    if not upsert:
+        # Upsert desteklemeyen veritabanlarındaki ayrı UPDATE yolu
+        monkeypatch.setattr(BookImporter, "_upsert_statement", lambda self: None)
+    isbn = f"import-{uuid.uuid4().hex[:12]}"
+    row = {"title": "İçe Aktarılan", "isbn": isbn, "author": "Test Yazar", "category": "Test Kategori"}
+
+    report = import_rows(client, auth, {**row, "total_copies": 3})
+    assert (report["inserted"], report["updated"], report["failed"]) == (1, 0, 0)
+    [book] = books_with_isbn(app, isbn)
+    if stripes:
+        response = client.put(f"/api/admin/books/{book['id']}/stripes", json={"stripes": stripes}, headers=auth("admin"))
+        assert response.status_code == 200
+
+    response = client.post("/api/loans/", json={"book_id": book["id"]}, headers=auth("admin"))
+    assert response.status_code == 201
+    loan_id = response.get_json()["id"]
+
+    # Toplam 3 -> 5: ödünçteki 1 kopya korunur, müsait 2 -> 4
+    report = import_rows(client, auth, {**row, "title": "Yeni Başlık", "total_copies": 5})
+    assert (report["inserted"], report["updated"], report["failed"]) == (0, 1, 0)
+    assert books_with_isbn(app, isbn) == [{
+        "id": book["id"], "title": "Yeni Başlık", "total_copies": 5, "available_copies": 4, "stock_stripes": stripes,
+    }]
+
+    # Toplam 5 -> 1: müsait sayı eksiye düşmez, ödünçteki kopya iade edilince 1 olur
+    import_rows(client, auth, {**row, "total_copies": 1})
+    assert books_with_isbn(app, isbn)[0]["available_copies"] == 0
+    assert client.post(f"/api/loans/{loan_id}/return", headers=auth("admin")).status_code == 200
+    assert books_with_isbn(app, isbn)[0]["available_copies"] == 1
+
+
+def test_duplicate_isbn_in_file_keeps_last_row(app, client, auth):
+    isbn = f"import-{uuid.uuid4().hex[:12]}"
+    row = {"isbn": isbn, "author": "Test Yazar", "category": "Test Kategori"}
+    report = import_rows(client, auth, {**row, "title": "İlk", "total_copies": 2}, {**row, "title": "Son", "total_copies": 4})
+    assert (report["inserted"], report["duplicates"]) == (1, 1)
+    [book] = books_with_isbn(app, isbn)
+    assert (book["title"], book["total_copies"], book["available_copies"]) == ("Son", 4, 4)
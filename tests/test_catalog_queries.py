@@ -0,0 +1,66 @@
+"""
+Kitap Listesi Sorgu Sayısı Testleri
+GET /api/books'un sayfa boyutundan, sayfa numarasından, filtrelerden ve
+kullanıcının ödünçlerinden bağımsız olarak sabit sayıda SQL ifadesi
+çalıştırdığını doğrular (N+1 gerilemesi bu testte yakalanır).
+
+Bir istekte çalışan ifadeler:
+    1. ETag için katalog / kullanıcı sürüm sorgusu
+    2. Sayfa sorgusu (yazar ve kategori JOIN, ödünç anti-join dahil)
+    3. facets=1 ise sayılar için tek sorgu
+"""
+import pytest
+
+from src.profiler import assert_max_queries
+
+
+# Aynı şekilli ifadenin bu kadar tekrarı N+1 sayılır
+N_PLUS_ONE = 2
+
+
+@pytest.mark.parametrize("role", [None, "student", "admin"])
+@pytest.mark.parametrize("query, budget", [
+    ("limit=50", 2),
+    ("limit=200", 2),
+    ("limit=50&sort=title", 2),
+    ("limit=50&sort=created_at&order=desc", 2),
+    ("limit=50&category_id=1&available=true", 2),
+    ("limit=50&author_id=1", 2),
+    ("limit=50&q=Kitap", 2),
+    ("limit=50&category_id=1&facets=1", 3),
+])
+def test_list_books_query_count(client, auth, role, query, budget):
+    with assert_max_queries(budget, N_PLUS_ONE):
+        response = client.get(f"/api/books/?{query}", headers=auth(role))
+    assert response.status_code == 200
+    assert response.get_json()["items"]
+
+
+@pytest.mark.parametrize("role", [None, "student"])
+@pytest.mark.parametrize("query", ["limit=20", "limit=20&sort=title", "limit=20&available=true"])
+def test_list_books_later_pages_query_count(client, auth, role, query):
+    # Keyset sayfalama: 5. sayfa da 1. sayfa kadar ifade çalıştırır
+    cursor = None
+    for _ in range(5):
+        path = f"/api/books/?{query}" + (f"&cursor={cursor}" if cursor else "")
+        with assert_max_queries(2, N_PLUS_ONE):
+            response = client.get(path, headers=auth(role))
+        assert response.status_code == 200
+        cursor = response.get_json()["next_cursor"]
+        assert cursor
+
+
+def test_list_books_stream_query_count(client):
+    with assert_max_queries(2, N_PLUS_ONE):
+        with client.get("/api/books/?stream=1") as response:
+            body = response.get_data()
+    assert response.status_code == 200
+    assert body.count(b"\n") > 200
+
+
+@pytest.mark.parametrize("role", [None, "student"])
+def test_list_books_not_modified_skips_list_query(client, auth, role):
+    etag = client.get("/api/books/?limit=50", headers=auth(role)).headers["ETag"]
+    with assert_max_queries(1):
+        response = client.get("/api/books/?limit=50", headers={**auth(role), "If-None-Match": etag})
+    assert response.status_code == 304
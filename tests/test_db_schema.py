@@ -0,0 +1,64 @@
+"""
+Kurulum Şeması Testleri
+db_schema.sql'in modellerle (src/models.py) ve migrations/ klasörüyle aynı
+şemayı kurduğunu doğrular: tablolar, sütunlar, indeks adları ve
+schema_migrations tablosuna yazılan migration sürümleri.
+"""
+import os
+import re
+
+import pytest
+
+from migrate import discover
+from src.db import db
+
+
+SCHEMA_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "db_schema.sql")
+
+CREATE_TABLE = re.compile(r"^CREATE TABLE (\w+) \((.*?)^\)", re.MULTILINE | re.DOTALL)
+CREATE_INDEX = re.compile(r"^CREATE INDEX (\w+) ON (\w+)\(", re.MULTILINE)
+# Sütun adları küçük harflidir; PRIMARY KEY, CONSTRAINT, NOT NULL gibi satırlar eşleşmez
+COLUMN = re.compile(r"^\s*([a-z_]+)\s+[A-Z]")
+
+
+@pytest.fixture(scope="module")
+def schema_sql():
+    with open(SCHEMA_FILE, "r", encoding="utf-8") as f:
+        return "".join(line.split("--")[0] + "\n" for line in f)
+
+
+def schema_tables(schema_sql):
+    tables = {}
+    for name, body in CREATE_TABLE.findall(schema_sql):
+        columns = set()
+        for line in body.splitlines():
+            match = COLUMN.match(line)
+            if match:
+                columns.add(match.group(1))
+        tables[name] = columns
+    return tables
+
+
+def test_tables_and_columns_match_models(schema_sql):
+    tables = schema_tables(schema_sql)
+    for name, table in db.metadata.tables.items():
+        assert name in tables, f"db_schema.sql'de {name} tablosu yok"
+        assert tables[name] == set(table.columns.keys()), name
+    assert set(tables) - set(db.metadata.tables) == {"schema_migrations"}
+
+
+def test_indexes_match_models(schema_sql):
+    indexes = {(table, name) for name, table in CREATE_INDEX.findall(schema_sql)}
+    expected = {
+        (table.name, index.name)
+        for table in db.metadata.tables.values()
+        for index in table.indexes
+        # FULLTEXT indeksi book_search tablosunun içinde tanımlıdır
+        if not index.dialect_options["mysql"]["prefix"]
+    }
+    assert indexes == expected
+
+
+def test_all_migrations_recorded(schema_sql):
+    recorded = re.findall(r"\('(\d{4})', '(\w+)', CURRENT_TIMESTAMP\)", schema_sql)
+    assert recorded == [(version, name) for version, name, _ in discover()]
@@ -0,0 +1,75 @@
+"""
+İstek Metrikleri Testleri
+Akış (streaming) yanıtlarının süresinin gövdenin tamamı gönderilene kadar
+ölçüldüğünü ve isteğin yanıt kapatılınca sonlandığını doğrular.
+"""
+import time
+
+import pytest
+from flask import Flask, Response, stream_with_context
+
+from src import metrics
+
+
+# Akış gövdesinin her satırı arasındaki bekleme (saniye)
+LINE_DELAY = 0.05
+LINES = 4
+
+
+@pytest.fixture
+def metrics_app():
+    app = Flask(__name__)
+    app.config["METRICS_DIR"] = ""
+    metrics.init_metrics(app)
+
+    @app.get("/stream")
+    def slow_stream():
+        def lines():
+            for index in range(LINES):
+                time.sleep(LINE_DELAY)
+                yield f"{index}\n"
+        return Response(stream_with_context(lines()), mimetype="application/x-ndjson")
+
+    @app.get("/plain")
+    def plain():
+        return "ok"
+
+    return app
+
+
+def observed(endpoint: str, name: str = "http_request_duration_seconds") -> list:
+    """Endpoint'in histogramındaki [toplam, adet] değerleri (yoksa [0, 0])."""
+    series = metrics._values.get((name, ("", endpoint, "GET")))
+    return series[-2:] if series else [0, 0]
+
+
+def test_stream_duration_covers_body(metrics_app):
+    before_sum, before_count = observed("slow_stream")
+    client = metrics_app.test_client()
+    with client.get("/stream", buffered=False) as response:
+        # Gövde henüz gönderilmedi: istek devam ediyor, süre kaydedilmedi
+        assert observed("slow_stream")[1] == before_count
+        assert metrics._in_flight >= 1
+        assert response.get_data() == b"0\n1\n2\n3\n"
+    total, count = observed("slow_stream")
+    assert count == before_count + 1
+    assert total - before_sum >= LINE_DELAY * LINES
+    assert metrics._values[("http_requests_total", ("", "slow_stream", "GET", "200"))] >= 1
+
+
+def test_in_flight_released_after_close(metrics_app):
+    client = metrics_app.test_client()
+    with client.get("/plain"):
+        pass
+    in_flight = metrics._in_flight
+    with client.get("/stream", buffered=False) as response:
+        response.get_data()
+        assert metrics._in_flight == in_flight + 1
+    assert metrics._in_flight == in_flight
+
+
+def test_plain_response_recorded_with_size(metrics_app):
+    before = observed("plain", "http_response_size_bytes")[1]
+    with metrics_app.test_client().get("/plain") as response:
+        assert response.status_code == 200
+    assert observed("plain", "http_response_size_bytes")[1] == before + 1
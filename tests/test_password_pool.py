@@ -0,0 +1,58 @@
+"""
+Şifre Hash Havuzu Testleri
+Zaman aşımına uğrayan ama süreçte çalışmaya devam eden işin, bitene kadar
+kuyruk sınırına sayıldığını doğrular.
+"""
+import time
+
+import pytest
+
+from src import password_pool
+from src.password_pool import PasswordPoolBusy
+
+
+# Tek süreç, bekleme kuyruğu yok: aynı anda en fazla 1 iş
+CONFIG = {
+    "PASSWORD_HASH_WORKERS": 1,
+    "PASSWORD_HASH_QUEUE_LIMIT": 0,
+    "PASSWORD_HASH_TIMEOUT": 0.2,
+    "PASSWORD_HASH_RETRY_AFTER": 1,
+}
+
+
+@pytest.fixture
+def pool():
+    password_pool.start_pool(CONFIG)
+    yield
+    password_pool.shutdown_pool()
+
+
+def wait_until_idle(seconds: float = 5.0) -> None:
+    deadline = time.monotonic() + seconds
+    while password_pool.pool_stats()["in_flight"] and time.monotonic() < deadline:
+        time.sleep(0.02)
+
+
+def test_timed_out_job_keeps_its_slot_until_it_finishes(pool):
+    in_flight = password_pool.pool_stats()["in_flight"]
+    with pytest.raises(PasswordPoolBusy):
+        password_pool.run(time.sleep, 1.0, config=CONFIG)
+
+    # İş süreçte hâlâ çalışıyor: yeni iş kabul edilmez
+    assert password_pool.pool_stats()["in_flight"] == in_flight + 1
+    rejected = password_pool.pool_stats()["rejected"]
+    with pytest.raises(PasswordPoolBusy):
+        password_pool.run(password_pool.hash_with_rounds, "secret", 1, config=CONFIG)
+    assert password_pool.pool_stats()["rejected"] == rejected + 1
+
+    # İş bitince yer boşalır
+    wait_until_idle()
+    assert password_pool.pool_stats()["in_flight"] == in_flight
+    assert password_pool.run(password_pool.verify_hash, "secret",
+                             password_pool.hash_with_rounds("secret", 1), config=CONFIG)
+
+
+def test_completed_job_releases_its_slot(pool):
+    in_flight = password_pool.pool_stats()["in_flight"]
+    assert password_pool.run(time.sleep, 0, config=CONFIG) is None
+    assert password_pool.pool_stats()["in_flight"] == in_flight
@@ -0,0 +1,57 @@
+"""
+Sorgu Planı Testleri
+benchmarks.explain_plans senaryolarındaki her endpoint'in çalıştırdığı SQL
+ifadelerini EXPLAIN eder; büyük bir tabloda tam tarama yapan ifade testi
+düşürür. Tam tarama kuralları ve istisnalar check_statement ile aynıdır.
+
+Not: Varsayılan SQLite veritabanında SQLite planları denetlenir; MySQL
+planları için TEST_DATABASE_URL ile MySQL test veritabanı verilmelidir.
+"""
+import re
+
+import pytest
+from sqlalchemy import event
+
+from benchmarks.explain_plans import check_statement, is_successful_write, scenarios, table_sizes
+from src.db import db
+
+
+# Senaryo listesi sadece adlar için kurulur; ID'ler testte dataset'ten gelir
+SCENARIOS = scenarios(0, [0, 0], 0)
+
+
+@pytest.fixture(scope="module")
+def sizes(app):
+    with app.app_context():
+        return table_sizes()
+
+
+@pytest.mark.parametrize("index", range(len(SCENARIOS)),
+                         ids=[f"{method} {path}" for _, method, path, _, _ in SCENARIOS])
+def test_endpoint_has_no_full_scan(app, client, auth, dataset, sizes, index):
+    name, method, path, body, role = scenarios(
+        dataset["student_id"], dataset["loan_ids"], dataset["book_id"]
+    )[index]
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and re.match(r"\s*(SELECT|UPDATE|DELETE)\b", statement, re.IGNORECASE):
+            captured.append((statement, parameters))
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        response = client.open(path, method=method, json=body, headers=auth(role))
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    # Reddedilen yazma isteği başarılı yolun planını denetlemez
+    assert is_successful_write(method, response.status_code), response.get_data(as_text=True)
+    assert captured
+
+    with app.app_context():
+        problems = []
+        for statement, parameters in captured:
+            problems += check_statement(name, statement, parameters, sizes)
+        db.session.rollback()
+    assert not problems, "\n".join(f"{p['table']}: {p['plan']}\n  SQL: {p['sql'][:300]}" for p in problems)
@@ -0,0 +1,58 @@
+"""
+Katalog Arama Testleri
+Türkçe katlama, boolean mod FULLTEXT ifadesi ve boş (katlanınca kaybolan)
+arama terimlerinin davranışını doğrular.
+"""
+import pytest
+from sqlalchemy.dialects import mysql
+
+from src import search
+from src.profiler import count_queries
+
+
+@pytest.mark.parametrize("text, folded", [
+    ("İNCE Memed", "ince memed"),
+    ("Isparta", "isparta"),
+    ("Şeker Portakalı!", "seker portakali"),
+    ("  ---  ", ""),
+])
+def test_fold_text(text, folded):
+    assert search.fold_text(text) == folded
+
+
+@pytest.mark.parametrize("folded, expected", [
+    ("ince memed", "+ince +memed"),
+    ("a ince", "+ince"),
+    ("a", ""),
+])
+def test_boolean_query_requires_every_term(folded, expected):
+    assert search.boolean_query(folded) == expected
+
+
+def test_fulltext_condition_uses_boolean_mode(app, monkeypatch):
+    monkeypatch.setattr(search, "_uses_fulltext", lambda folded: True)
+    with app.app_context():
+        condition = search.search_condition("İnce Memed")
+        relevance = search.search_relevance("İnce Memed")
+    sql = str(condition.compile(dialect=mysql.dialect(), compile_kwargs={"literal_binds": True}))
+    assert "IN BOOLEAN MODE" in sql and "'+ince +memed'" in sql
+    assert "IN NATURAL LANGUAGE MODE" in str(relevance.compile(dialect=mysql.dialect()))
+
+
+def test_like_fallback_matches_terms_in_any_order(client):
+    # SQLite: FULLTEXT yok, her kelime ayrı LIKE koşuludur
+    items = client.get("/api/books/?q=kitap 12&limit=200").get_json()["items"]
+    assert items and all("12" in f"{item['title']} {item['author']} {item['category']}" for item in items)
+    reordered = client.get("/api/books/?q=12 kitap&limit=200").get_json()["items"]
+    assert [item["id"] for item in reordered] == [item["id"] for item in items]
+
+
+def test_empty_folded_query_lists_without_search(app, client):
+    with app.app_context():
+        assert search.search_condition("!!! ...") is None
+    with count_queries() as collector:
+        response = client.get("/api/books/?q=!!!&limit=10")
+    assert response.status_code == 200
+    assert not any("LIKE" in shape.upper() for shape in collector.shapes)
+    plain = client.get("/api/books/?limit=10").get_json()["items"]
+    assert [item["id"] for item in response.get_json()["items"]] == [item["id"] for item in plain]
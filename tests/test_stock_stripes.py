@@ -0,0 +1,44 @@
+"""
+Parçalı Stok Testleri
+Parçalı (striped) bir kitabın books.available_copies anlık görüntüsü ödünçten
+sonra ayrı bir transaction'da güncellenir; bu güncellemenin katalog sürümünü
+de artırdığını (eski sayıyla 304 dönülmediğini) doğrular.
+"""
+from src import inventory
+
+
+def catalog_page(client, headers=None):
+    return client.get("/api/books/?limit=5", headers=headers or {})
+
+
+def test_stripe_sync_invalidates_catalog_etag(app, client, auth, monkeypatch):
+    # Arka plan thread'i testi beklemeden senkronize etmesin; senkronizasyon elle çalıştırılır
+    monkeypatch.setattr(inventory, "STRIPE_SYNC_SECONDS", 3600)
+    book = next(item for item in catalog_page(client).get_json()["items"] if item["available_copies"] >= 2)
+
+    response = client.put(f"/api/admin/books/{book['id']}/stripes", json={"stripes": 4}, headers=auth("admin"))
+    assert response.status_code == 200
+    assert response.get_json()["available_copies"] == book["available_copies"]
+
+    response = client.post("/api/loans/", json={"book_id": book["id"]}, headers=auth("admin"))
+    assert response.status_code == 201
+
+    # Ödünç katalog sürümünü artırdı, ama anlık görüntü henüz eski
+    response = catalog_page(client)
+    etag = response.headers["ETag"]
+    stale = next(item for item in response.get_json()["items"] if item["id"] == book["id"])
+    assert stale["available_copies"] == book["available_copies"]
+    assert catalog_page(client, {"If-None-Match": etag}).status_code == 304
+
+    assert inventory.sync_pending(app) == 1
+
+    response = catalog_page(client, {"If-None-Match": etag})
+    assert response.status_code == 200
+    fresh = next(item for item in response.get_json()["items"] if item["id"] == book["id"])
+    assert fresh["available_copies"] == book["available_copies"] - 1
+
+    # Anlık görüntü değişmediyse sürüm artırılmaz
+    etag = response.headers["ETag"]
+    inventory._pending.add(book["id"])
+    assert inventory.sync_pending(app) == 0
+    assert catalog_page(client, {"If-None-Match": etag}).status_code == 304
@@ -0,0 +1,48 @@
+"""
+Trigram Arama Modu Testleri
+Bellek içi trigram indeksi henüz kurulmamışken mode=trigram'ın boş sonuç
+yerine FULLTEXT yoluna düştüğünü ve indeks hazır olunca ETag'in değiştiğini
+doğrular.
+"""
+import pytest
+
+from src.trigram_index import book_index
+
+
+QUERY = "/api/books/?q=kitap 12&limit=5"
+
+
+@pytest.fixture
+def unbuilt_index(monkeypatch):
+    # İndeks kurulmamış ve arka plan kurulumu başlamıyor
+    monkeypatch.setattr(book_index, "ready", False)
+    monkeypatch.setattr(book_index, "rebuild_if_stale", lambda app: None)
+
+
+def test_trigram_falls_back_while_index_is_not_ready(client, unbuilt_index):
+    response = client.get(f"{QUERY}&mode=trigram")
+    assert response.status_code == 200
+    items = response.get_json()["items"]
+    assert items
+    fulltext = client.get(f"{QUERY}&mode=fulltext").get_json()["items"]
+    assert [item["id"] for item in items] == [item["id"] for item in fulltext]
+
+
+def test_trigram_etag_changes_when_index_becomes_ready(app, client, unbuilt_index):
+    fallback = client.get(f"{QUERY}&mode=trigram")
+    cursor = fallback.get_json()["next_cursor"]
+    assert cursor
+
+    with app.app_context():
+        book_index.build_from_db()
+    assert book_index.ready
+
+    response = client.get(f"{QUERY}&mode=trigram", headers={"If-None-Match": fallback.headers["ETag"]})
+    assert response.status_code == 200
+    assert response.get_json()["items"]
+
+    # Fallback sayfasının cursor'ı ile sayfalama aynı (fulltext) yolda devam eder
+    page = client.get(f"{QUERY}&mode=trigram&cursor={cursor}")
+    assert page.status_code == 200
+    next_fulltext = client.get(f"{QUERY}&mode=fulltext&cursor={cursor}").get_json()["items"]
+    assert [item["id"] for item in page.get_json()["items"]] == [item["id"] for item in next_fulltext]
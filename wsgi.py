@@ -0,0 +1,38 @@
+"""
+Üretim WSGI Giriş Noktası
+
+Linux (ön-fork'lu worker'lar, bkz. gunicorn.conf.py):
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Windows (tek süreç, çok thread):
+    python wsgi.py
+
+Geliştirme sunucusu (python app.py) debug modunda ve otomatik yeniden
+yükleyiciyle çalışır; üretimde kullanılmamalıdır.
+"""
+import os
+import sys
+
+# Şifre havuzu süreçleri "spawn" ile başlatılır ve bu dosyayı __mp_main__ adıyla
+# yeniden import eder (python wsgi.py). O süreçler sadece src.password_pool'daki
+# fonksiyonları çalıştırır; uygulama (trigram indeksi, gecikme taraması,
+# veritabanı bağlantıları) orada kurulmaz.
+if __name__ != "__mp_main__":
+    from app import create_app
+    from src.serving import warm_up
+
+    app = create_app()
+
+    # Isınma gunicorn altında fork sonrası (gunicorn.conf.py: post_fork), python wsgi.py
+    # ile aşağıdaki __main__ bloğunda yapılır; burada sadece başka WSGI sunucuları için
+    if "gunicorn" not in sys.modules and __name__ != "__main__":
+        warm_up(app, int(os.getenv("WEB_THREADS", "8")))
+
+
+if __name__ == "__main__":
+    from waitress import serve
+
+    threads = int(os.getenv("WEB_THREADS", "8"))
+    report = warm_up(app, threads)
+    print(f"🔥 Isınma: {report}")
+    serve(app, host=os.getenv("WEB_HOST", "0.0.0.0"), port=int(os.getenv("WEB_PORT", "5000")), threads=threads)